@@ -0,0 +1,335 @@
+"""
+Benchmarks of the hot paths of the models, of the cross-section evaluations and of the fits.
+
+The results are written in the JSON format, so that the timings of two versions of the code can be compared.
+Run the script from this directory (as the other scripts, it reads the data and the configuration
+from the parent directory), e.g.:
+
+    python run_benchmarks.py --output results_new.json --compare results_old.json
+
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from configparser import ConfigParser
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import scipy
+
+from common.utils import function_cross_section
+from kaon_production.data import read_data as read_kaon_data, KaonDatapoint, DIR_NAME
+from model_parameters import KaonParameters, ModelParameters, NucleonParameters
+from nucleon_production.data import read_data as read_nucleon_data, NucleonDatapoint
+from pipeline.KaonCrossSectionIterativePipeline import KaonCrossSectionIterativePipeline
+from task.kaon_cross_section_tasks import TaskFullFit
+from ua_model.KaonUAModel import KaonUAModel
+from ua_model.MapFromTtoW import MapFromTtoW
+from ua_model.NucleonUAModel import NucleonUAModel
+
+
+KAON_PARAMETERS = [
+    4.104732671275326, 6.945876504806479, 0.77526, 1.465, 1.72, 2.15, 0.1474, 0.4, 0.5220413015662677,
+    0.9262000511188161, 0.5579553419980545, -0.06608398477649186, 0.19847722499260162, 0.78266, 1.0190415494118024,
+    1.41, 1.67, 1.68, 2.159, 0.00868, 0.004249, 0.9228912480513007, 0.315, 0.15, 0.137, 0.20006026821487782,
+    0.3317378089249629, 0.14633274655460118, -0.17367426366140964, -0.010680398179201966,
+]
+
+# name -> (function preparing the benchmarked callable, number of calls in a single measurement)
+BENCHMARKS: Dict[str, Tuple[Callable[['BenchmarkContext'], Callable[[], None]], int]] = {}
+
+
+def benchmark(name: str, number: int = 1) -> Callable:
+    def decorator(set_up: Callable[['BenchmarkContext'], Callable[[], None]]) -> Callable:
+        BENCHMARKS[name] = (set_up, number)
+        return set_up
+    return decorator
+
+
+class BenchmarkContext:
+    """
+    The configuration, the data and the parameters shared by the benchmarks.
+
+    """
+
+    def __init__(self) -> None:
+        config = ConfigParser(inline_comment_prefixes='#')
+        config.read('../configuration.ini')
+        pion_mass = config.getfloat('constants', 'charged_pion_mass')
+        self.t_0_isoscalar = (3 * pion_mass) ** 2
+        self.t_0_isovector = (2 * pion_mass) ** 2
+        self.kaon_mass = config.getfloat('constants', 'charged_kaon_mass')
+        self.proton_mass = config.getfloat('constants', 'proton_mass')
+        self.proton_magnetic_moment = config.getfloat('constants', 'proton_magnetic_moment')
+        self.neutron_magnetic_moment = config.getfloat('constants', 'neutron_magnetic_moment')
+        self.alpha = config.getfloat('constants', 'alpha')
+        self.hc_squared = config.getfloat('constants', 'hc_squared')
+
+        self.charged_data = read_kaon_data('charged_new_data2.csv')
+        self.neutral_data = read_kaon_data('neutral_kaon.csv')
+        self.proton_data = read_nucleon_data('proton_cs.csv')
+        self.reports_dir = tempfile.mkdtemp(prefix='ua_model_benchmarks_')
+        self._counter = 0
+        self._nr_perturbations = 0
+
+    def close(self) -> None:
+        shutil.rmtree(self.reports_dir, ignore_errors=True)
+
+    def make_kaon_parameters(self) -> KaonParameters:
+        return KaonParameters.from_ordered_values(KAON_PARAMETERS, self.t_0_isoscalar, self.t_0_isovector)
+
+    def make_nucleon_parameters(self) -> NucleonParameters:
+        return NucleonParameters(
+            nucleon_mass=self.proton_mass,
+            magnetic_moment_proton=self.proton_magnetic_moment,
+            magnetic_moment_neutron=self.neutron_magnetic_moment,
+            t_0_dirac_isoscalar=self.t_0_isoscalar, t_0_dirac_isovector=self.t_0_isovector,
+            t_0_pauli_isoscalar=self.t_0_isoscalar, t_0_pauli_isovector=self.t_0_isovector,
+            t_in_dirac_isoscalar=1.0, t_in_dirac_isovector=2.0, t_in_pauli_isoscalar=1.0, t_in_pauli_isovector=2.0,
+            a_dirac_omega=1.0, a_pauli_omega=-0.2, mass_omega=0.78266, decay_rate_omega=0.00868,
+            a_dirac_omega_prime=0.2, mass_omega_prime=1.410, decay_rate_omega_prime=0.29,
+            mass_omega_double_prime=1.670, decay_rate_omega_double_prime=0.315,
+            a_dirac_phi=-1.0, a_pauli_phi=0.2, mass_phi=1.019461, decay_rate_phi=0.004249,
+            a_dirac_phi_prime=0.2, a_pauli_phi_prime=0.2, mass_phi_prime=1.680, decay_rate_phi_prime=0.150,
+            mass_phi_double_prime=2.159, decay_rate_phi_double_prime=0.137,
+            a_dirac_rho=0.4, mass_rho=0.77526, decay_rate_rho=0.1474,
+            mass_rho_prime=1.465, decay_rate_rho_prime=0.4,
+            mass_rho_double_prime=1.72, decay_rate_rho_double_prime=0.25,
+        )
+
+    def make_kaon_model(self) -> KaonUAModel:
+        parameters = self.make_kaon_parameters()
+        return KaonUAModel(charged_variant=True, **dict(zip(parameters.get_names(), parameters.get_all_values())))
+
+    def make_nucleon_model(self) -> NucleonUAModel:
+        parameters = self.make_nucleon_parameters()
+        return NucleonUAModel(
+            proton=True, electric=True, **dict(zip(parameters.get_names(), parameters.get_all_values())),
+        )
+
+    def perturb(self, parameters: ModelParameters, values: Dict[str, float]) -> ModelParameters:
+        # New values on each call: the form factor models built from the parameters are cached (see common.utils),
+        # with the same values the benchmark would measure only the cache lookup.
+        self._nr_perturbations += 1
+        for name, value in values.items():
+            parameters.set_value(name, value * (1 + 1e-9 * self._nr_perturbations))
+        return parameters
+
+    def kaon_datapoints(self) -> Tuple[List[KaonDatapoint], List[float], List[float]]:
+        ts = [KaonDatapoint(t, True) for t in self.charged_data[0]]
+        ts += [KaonDatapoint(t, False) for t in self.neutral_data[0]]
+        ys = list(self.charged_data[1]) + list(self.neutral_data[1])
+        errors = list(self.charged_data[2]) + list(self.neutral_data[2])
+        return ts, ys, errors
+
+    def unique_name(self, prefix: str) -> str:
+        # the pipelines require a new reports directory for each run
+        self._counter += 1
+        return f'{prefix}_{self._counter}'
+
+
+@benchmark('KaonUAModel.__call__', number=10)
+def _kaon_model_call(context: BenchmarkContext) -> Callable[[], None]:
+    model = context.make_kaon_model()
+    ts, _, _ = context.kaon_datapoints()
+
+    def run():
+        for datapoint in ts:
+            model.charged_variant = datapoint.is_charged
+            model(datapoint.t)
+    return run
+
+
+@benchmark('KaonUAModel.evaluate_array', number=100)
+def _kaon_model_evaluate_array(context: BenchmarkContext) -> Callable[[], None]:
+    model = context.make_kaon_model()
+    ts = np.array([datapoint.t for datapoint in context.kaon_datapoints()[0]], dtype=complex)
+    return lambda: model.evaluate_array(ts)
+
+
+@benchmark('NucleonUAModel.__call__', number=10)
+def _nucleon_model_call(context: BenchmarkContext) -> Callable[[], None]:
+    model = context.make_nucleon_model()
+    ts = context.proton_data[0]
+
+    def run():
+        for t in ts:
+            model(t)
+    return run
+
+
+@benchmark('MapFromTtoW.__call__', number=10)
+def _map_from_t_to_w_call(context: BenchmarkContext) -> Callable[[], None]:
+    t_to_w = MapFromTtoW(context.t_0_isovector, 1.35)
+    ts = [datapoint.t for datapoint in context.kaon_datapoints()[0]]
+
+    def run():
+        for t in ts:
+            t_to_w(t)
+    return run
+
+
+@benchmark('MapFromTtoW.evaluate_array', number=100)
+def _map_from_t_to_w_evaluate_array(context: BenchmarkContext) -> Callable[[], None]:
+    t_to_w = MapFromTtoW(context.t_0_isovector, 1.35)
+    ts = np.array([datapoint.t for datapoint in context.kaon_datapoints()[0]], dtype=complex)
+    return lambda: t_to_w.evaluate_array(ts)
+
+
+def _register_cross_section_benchmarks() -> None:
+    """
+    Register two benchmarks of function_cross_section for each data file: 'function_cross_section[...]'
+    changes all the free parameters in each call (as a fit of all the parameters does), while
+    'function_cross_section_couplings[...]' changes only the coupling constants (as a fit with fixed resonances
+    does, the components of a kaon model are then not rebuilt, see common.utils._build_kaon_model).
+
+    """
+    for file_name in sorted(os.listdir(DIR_NAME)):
+        if not file_name.endswith('.csv'):
+            continue
+
+        def set_up(
+                context: BenchmarkContext, file_name: str = file_name, only_couplings: bool = False,
+        ) -> Callable[[], None]:
+            if file_name.startswith('proton'):
+                ts = [NucleonDatapoint(t, True, True) for t in read_nucleon_data(file_name)[0]]
+                parameters = context.make_nucleon_parameters()
+                mass = context.proton_mass
+            else:
+                is_charged = not file_name.startswith('neutral')
+                ts = [KaonDatapoint(t, is_charged) for t in read_kaon_data(file_name)[0]]
+                parameters = context.make_kaon_parameters()
+                mass = context.kaon_mass
+            values = {
+                p.name: p.value for p in parameters if not p.is_fixed and (not only_couplings or p.name[:2] == 'a_')
+            }
+            return lambda: function_cross_section(
+                ts, mass, context.alpha, context.hc_squared, context.perturb(parameters, values),
+            )
+
+        BENCHMARKS[f'function_cross_section[{file_name}]'] = (set_up, 10)
+        BENCHMARKS[f'function_cross_section_couplings[{file_name}]'] = (
+            functools.partial(set_up, only_couplings=True), 10,
+        )
+
+
+_register_cross_section_benchmarks()
+
+
+@benchmark('kaon_cross_section_tasks.TaskFullFit.run')
+def _task_full_fit(context: BenchmarkContext) -> Callable[[], None]:
+    ts, css, errors = context.kaon_datapoints()
+
+    def run():
+        task = TaskFullFit(
+            'benchmark', context.make_kaon_parameters(), ts, css, errors,
+            context.kaon_mass, context.alpha, context.hc_squared, plot=False, use_handpicked_bounds=False,
+        )
+        task.run()
+    return run
+
+
+@benchmark('KaonCrossSectionIterativePipeline.run')
+def _iterative_pipeline(context: BenchmarkContext) -> Callable[[], None]:
+
+    def run():
+        random.seed(0)  # the pipeline chooses the free parameters randomly
+        pipeline = KaonCrossSectionIterativePipeline(
+            context.unique_name('pipeline'), context.make_kaon_parameters(),
+            *context.charged_data, *context.neutral_data,
+            context.kaon_mass, context.alpha, context.hc_squared,
+            context.reports_dir, plot=False, use_handpicked_bounds=False,
+            nr_free_params=(3, 5), nr_iterations=(3, 2),
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.run()
+    return run
+
+
+def _get_git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(names: List[str], repeat: int) -> dict:
+    context = BenchmarkContext()
+    results = {}
+    try:
+        for name in names:
+            set_up, number = BENCHMARKS[name]
+            function = set_up(context)
+            function()  # warm up (and fail early)
+            timings = [t / number for t in timeit.repeat(function, repeat=repeat, number=number)]
+            results[name] = {
+                'number': number,
+                'repeat': repeat,
+                'best': min(timings),
+                'median': float(np.median(timings)),
+                'mean': float(np.mean(timings)),
+            }
+            print(f'{name}: {min(timings):.6g} s', file=sys.stderr)
+    finally:
+        context.close()
+
+    return {
+        'metadata': {
+            'date': datetime.now().isoformat(),
+            'revision': _get_git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    lines = [f'{"benchmark":55} {"baseline [s]":>14} {"current [s]":>14} {"ratio":>8}']
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]['best']
+        new = result['best']
+        lines.append(f'{name:55} {old:14.6g} {new:14.6g} {new / old:8.3f}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='the JSON file for the results (printed to stdout if not given)')
+    parser.add_argument('--compare', help='a JSON file with the results of a previous run')
+    parser.add_argument('--filter', default='', help='run only the benchmarks whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5, help='the number of measurements of each benchmark')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    arguments = parser.parse_args()
+
+    if arguments.list:
+        print('\n'.join(BENCHMARKS))
+        sys.exit(0)
+
+    benchmark_results = run_benchmarks([name for name in BENCHMARKS if arguments.filter in name], arguments.repeat)
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(benchmark_results, f, indent=2)
+    else:
+        print(json.dumps(benchmark_results, indent=2))
+
+    if arguments.compare:
+        with open(arguments.compare, 'r') as f:
+            print(compare(benchmark_results, json.load(f)))
@@ -1,15 +1,23 @@
+import copy
 import random
+from collections import OrderedDict
 from configparser import ConfigParser
+from functools import lru_cache
 from typing import Callable, List, Tuple, Union, Optional, TypeVar
 
 import numpy as np
+from scipy.optimize import least_squares
 
 from cross_section.ScalarMesonProductionTotalCrossSection import ScalarMesonProductionTotalCrossSection
 from cross_section.NucleonPairToElectronPositronTotalCrossSection import NucleonPairToElectronPositronTotalCrossSection
 from ua_model.KaonUAModel import KaonUAModel
 from ua_model.KaonUAModelSimplified import KaonUAModelSimplified
 from ua_model.KaonUAModelB import KaonUAModelB
+from ua_model.KaonUAModelBase import KaonUAModelBase
 from ua_model.NucleonUAModel import NucleonUAModel
+from ua_model.MapFromTtoW import MapFromTtoW
+from ua_model.derivatives import eval_kaon_channels_with_jacobian
+from ua_model.functions import asymptotic_factor
 from other_models import ETGMRModel, TwoPolesModel
 from model_parameters import (ModelParameters, KaonParameters, KaonParametersB, KaonParametersSimplified,
                               KaonParametersFixedRhoOmega, KaonParametersFixedSelected, ETGMRModelParameters,
@@ -72,27 +80,76 @@ def perturb_model_parameters(
     return parameters
 
 
+# the number of the most recently used form factor models kept by _get_ff_model
+FF_MODEL_CACHE_SIZE = 64
+
+# the most recently built kaon model of each class, the next model of the class is derived from it
+_last_built_kaon_models = {}
+
+
+def _build_kaon_model(
+        model_class: type,
+        values: dict,
+) -> Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified]:
+    # During a fit, consecutive models typically differ only in a few parameters (e.g. a single one
+    # when curve_fit estimates the Jacobian by finite differences), so we update a copy of the previous model
+    # instead of building all the components anew. The previous model may be cached, hence the copy.
+    last_model = _last_built_kaon_models.get(model_class)
+    if last_model is None:
+        ff_model = model_class(charged_variant=True, **values)
+    else:
+        ff_model = copy.copy(last_model)
+        ff_model.charged_variant = True
+        ff_model.update_parameters(**values)
+    _last_built_kaon_models[model_class] = ff_model
+    return ff_model
+
+
+@lru_cache(maxsize=FF_MODEL_CACHE_SIZE)
+def _build_ff_model(
+        parameters_class: type,
+        parameter_items: Tuple[Tuple[str, float], ...],
+) -> Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified, ETGMRModel, TwoPolesModel, NucleonUAModel]:
+    values = dict(parameter_items)
+    if issubclass(parameters_class, KaonParameters):
+        return _build_kaon_model(KaonUAModel, values)
+    elif issubclass(parameters_class, KaonParametersB):
+        return _build_kaon_model(KaonUAModelB, values)
+    elif issubclass(parameters_class, KaonParametersSimplified):
+        return _build_kaon_model(KaonUAModelSimplified, values)
+    elif issubclass(parameters_class, KaonParametersFixedRhoOmega):
+        return _build_kaon_model(KaonUAModel, values)
+    elif issubclass(parameters_class, KaonParametersFixedSelected):
+        return _build_kaon_model(KaonUAModel, values)
+    elif issubclass(parameters_class, NucleonParameters):
+        return NucleonUAModel(proton=True, electric=True, **values)
+    elif issubclass(parameters_class, ETGMRModelParameters):
+        return ETGMRModel(a=values['a'], m_a=values['m_a'], m_d=values['m_d'])
+    elif issubclass(parameters_class, TwoPolesModelParameters):
+        return TwoPolesModel(a=values['a'], m_1=values['m_1'], m_2=values['m_2'])
+    else:
+        raise TypeError('Unexpected parameters type: ' + parameters_class.__name__)
+
+
 def _get_ff_model(
         parameters: ModelParameters,
 ) -> Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified, ETGMRModel, TwoPolesModel, NucleonUAModel]:
-    if isinstance(parameters, KaonParameters):
-        return KaonUAModel(charged_variant=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, KaonParametersB):
-        return KaonUAModelB(charged_variant=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, KaonParametersSimplified):
-        return KaonUAModelSimplified(charged_variant=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, KaonParametersFixedRhoOmega):
-        return KaonUAModel(charged_variant=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, KaonParametersFixedSelected):
-        return KaonUAModel(charged_variant=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, NucleonParameters):
-        return NucleonUAModel(proton=True, electric=True, **{p.name: p.value for p in parameters})
-    elif isinstance(parameters, ETGMRModelParameters):
-        return ETGMRModel(a=parameters['a'].value, m_a=parameters['m_a'].value, m_d=parameters['m_d'].value)
-    elif isinstance(parameters, TwoPolesModelParameters):
-        return TwoPolesModel(a=parameters['a'].value, m_1=parameters['m_1'].value, m_2=parameters['m_2'].value)
-    else:
-        raise TypeError('Unexpected parameters type: ' + type(parameters).__name__)
+    """
+    Return the form factor model corresponding to the parameters.
+
+    The models are cached (keyed on the type of the parameters and their values), since the same values
+    are evaluated repeatedly during the fits. A cached model is shared by all the callers: its flags
+    (charged_variant, respectively proton and electric) are reset to their initial values here,
+    but the other attributes must not be modified.
+
+    """
+    ff_model = _build_ff_model(type(parameters), tuple(zip(parameters.get_names(), parameters.get_all_values())))
+    if isinstance(ff_model, KaonUAModelBase):
+        ff_model.charged_variant = True
+    elif isinstance(ff_model, NucleonUAModel):
+        ff_model.proton = True
+        ff_model.electric = True
+    return ff_model
 
 
 def _read_datapoint_kaon(datapoint: Union[KaonDatapoint, Tuple[complex, float]]) -> Tuple[complex, bool]:
@@ -112,12 +169,12 @@ def _read_datapoint_nucleon(
 
 
 def _is_kaon_type_model(ff_model: Callable) -> bool:
-    if isinstance(ff_model, (KaonUAModel, KaonUAModelB, KaonUAModelSimplified)):
+    if isinstance(ff_model, KaonUAModelBase):
         return True
     elif isinstance(ff_model, (NucleonUAModel, ETGMRModel, TwoPolesModel)):
         return False
     else:
-        raise f'Unknown model: {type(ff_model)}!'
+        raise TypeError(f'Unknown model: {type(ff_model)}!')
 
 
 def function_form_factor(
@@ -133,20 +190,518 @@ def function_form_factor(
     is_kaon_type = _is_kaon_type_model(ff_model)
     results = []
     if is_kaon_type:
-        for datapoint in ts:
-            t, is_charged = _read_datapoint_kaon(datapoint)
-            ff_model.charged_variant = is_charged
-            results.append(abs(ff_model(t)))
-    else:  # a nucleon form factor model
-        for datapoint in ts:
-            t, is_proton, is_electric = _read_datapoint_nucleon(datapoint)  # type: ignore
-            ff_model.proton = is_proton
-            ff_model.electric = is_electric
-            results.append(abs(ff_model(t)))
+        datapoints = [_read_datapoint_kaon(datapoint) for datapoint in ts]  # type: ignore
+        form_factors = _eval_kaon_ua_form_factors(
+            ff_model,
+            np.array([t for t, _ in datapoints], dtype=complex),
+            np.array([is_charged for _, is_charged in datapoints], dtype=bool),
+        )
+        results = list(np.abs(form_factors))
+    elif isinstance(ff_model, NucleonUAModel):
+        datapoints = [_read_datapoint_nucleon(datapoint) for datapoint in ts]  # type: ignore
+        electric, magnetic = _eval_nucleon_ua_form_factors(
+            ff_model,
+            np.array([t for t, _, _ in datapoints], dtype=complex),
+            np.array([is_proton for _, is_proton, _ in datapoints], dtype=bool),
+        )
+        is_electric = np.array([is_electric for _, _, is_electric in datapoints], dtype=bool)
+        results = list(np.abs(np.where(is_electric, electric, magnetic)))
+    else:  # ETGMRModel or TwoPolesModel, they do not distinguish the nucleons nor the form factors
+        t_values = np.array([_read_datapoint_nucleon(datapoint)[0] for datapoint in ts], dtype=complex)
+        results = list(np.abs(_eval_at_distinct_ts(ff_model, t_values)))
 
     return results
 
 
+def _find_distinct_ts(t_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the distinct values of t and the indices that reconstruct t_values from them (see _eval_at_distinct_ts).
+
+    """
+    return np.unique(np.asarray(t_values, dtype=complex), return_inverse=True)
+
+
+def _scatter_to_datapoints(values, inverse: np.ndarray):
+    # values: an array indexed (along the first axis) by the distinct values of t, or a (nested) tuple of such arrays
+    if isinstance(values, tuple):
+        return tuple(_scatter_to_datapoints(value, inverse) for value in values)
+    return values[inverse]
+
+
+def _eval_at_distinct_ts(
+        evaluate: Callable,
+        t_values: np.ndarray,
+        distinct_ts: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+):
+    """
+    Evaluate a vectorized function of t only once for each distinct value of t and scatter the results
+    back to all the elements of t_values.
+
+    The datasets contain many repeated values of t (several experiments at the same energy, the charged
+    and the neutral kaons, the proton and the neutron), while the model depends on t only.
+
+    Args:
+        evaluate (Callable): takes an array of values of t, returns an array indexed (along the first axis)
+            by them, or a (nested) tuple of such arrays
+        t_values (np.ndarray): the values of t of the datapoints
+        distinct_ts (tuple): the result of _find_distinct_ts(t_values), if it has been prepared already
+
+    Returns:
+        the results of 'evaluate' (of the same structure) at the elements of t_values
+
+    """
+    unique_ts, inverse = _find_distinct_ts(t_values) if distinct_ts is None else distinct_ts
+    return _scatter_to_datapoints(evaluate(unique_ts), inverse)
+
+
+def _eval_nucleon_ua_form_factors(
+        ff_model: NucleonUAModel,
+        t_values: np.ndarray,
+        is_proton: np.ndarray,
+        distinct_ts: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate the electric and the magnetic form factors of the proton or the neutron (according to is_proton)
+    at each element of t_values.
+
+    The contributions of the channels are evaluated (in a vectorized way) only once for each distinct value of t,
+    all the form factors at that t are their combinations.
+
+    """
+    contributions = _eval_at_distinct_ts(ff_model.eval_contributions, t_values, distinct_ts)
+    electric_proton, magnetic_proton = ff_model.combine_contributions(t_values, contributions, proton=True)
+    electric_neutron, magnetic_neutron = ff_model.combine_contributions(t_values, contributions, proton=False)
+    return (
+        np.where(is_proton, electric_proton, electric_neutron),
+        np.where(is_proton, magnetic_proton, magnetic_neutron),
+    )
+
+
+def _eval_kaon_ua_form_factors(
+        ff_model: KaonUAModelBase,
+        t_values: np.ndarray,
+        is_charged: np.ndarray,
+        distinct_ts: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Evaluate the form factor of the charged or the neutral kaons (according to is_charged) at each element
+    of t_values.
+
+    The contributions of the channels are evaluated (in a vectorized way) only once for each distinct value of t,
+    the form factors of both variants are their combinations.
+
+    """
+    isoscalar_contribution, isovector_contribution = _eval_at_distinct_ts(
+        ff_model.eval_contributions, t_values, distinct_ts,
+    )
+    return ff_model.combine_contributions(isoscalar_contribution, isovector_contribution, is_charged)
+
+
+def _eval_kaon_form_factor_with_jacobian(
+        ts: List[Union[KaonDatapoint, Tuple[float, float]]],
+        parameters: ModelParameters,
+        parameter_names: List[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    ff_model = _get_ff_model(parameters)
+    if not _is_kaon_type_model(ff_model):
+        raise TypeError('Analytic derivatives are implemented only for the kaon models!')
+
+    datapoints = [_read_datapoint_kaon(datapoint) for datapoint in ts]
+    t_values = np.array([t for t, _ in datapoints], dtype=complex)
+    is_charged = np.array([charged for _, charged in datapoints], dtype=bool)
+
+    # as in _eval_kaon_ua_form_factors, the channels are evaluated once for each distinct value of t
+    (isoscalar_values, isoscalar_jacobian), (isovector_values, isovector_jacobian) = _eval_at_distinct_ts(
+        lambda unique_ts: ff_model.eval_contributions_with_jacobian(unique_ts, parameter_names), t_values,
+    )
+    return (
+        ff_model.combine_contributions(isoscalar_values, isovector_values, is_charged),
+        ff_model.combine_contributions(isoscalar_jacobian, isovector_jacobian, is_charged),
+    )
+
+
+def function_form_factor_jacobian(
+        ts: List[Union[KaonDatapoint, Tuple[float, float]]],
+        parameters: ModelParameters,
+        ) -> np.ndarray:
+    """
+    The Jacobian of function_form_factor with respect to the free parameters (in their order) for the kaon models.
+
+    """
+    parameter_names = [p.name for p in parameters if not p.is_fixed]
+    form_factors, jacobian = _eval_kaon_form_factor_with_jacobian(ts, parameters, parameter_names)
+    # d|F| = Re(conj(F) * dF) / |F|
+    return np.real(np.conj(form_factors)[:, np.newaxis] * jacobian) / np.abs(form_factors)[:, np.newaxis]
+
+
+def solve_linear_couplings(
+        ts: List[Union[KaonDatapoint, Tuple[float, float]]],
+        ys: List[float],
+        errors: List[float],
+        parameters: ModelParameters,
+        coupling_names: List[str],
+) -> ModelParameters:
+    """
+    Set the coupling constants of a kaon model to the values that minimize the chi-squared of the form factor
+    absolute values |F| with respect to the data (ys, errors), keeping all the other parameters.
+
+    The form factor is an affine function of the couplings, F = c + B a. The vector c and the matrix B
+    are evaluated only once, so the least squares problem for the couplings is cheap even though |F|
+    is not linear in them. It is solved by the Levenberg-Marquardt method starting from the current couplings
+    (the problem may have several local minima, the result depends on the starting point).
+
+    Args:
+        ts (list): the datapoints
+        ys (list): the measured absolute values of the form factor
+        errors (list): the errors of ys
+        parameters (ModelParameters): the parameters of a kaon model; the couplings are updated in place
+        coupling_names (list): the names of the couplings that are solved for
+
+    Returns:
+        ModelParameters: the parameters with the updated couplings
+
+    """
+    _solve_linear_couplings(ts, ys, errors, parameters, coupling_names)
+    return parameters
+
+
+def _solve_linear_couplings(
+        ts: List[Union[KaonDatapoint, Tuple[float, float]]],
+        ys: List[float],
+        errors: List[float],
+        parameters: ModelParameters,
+        coupling_names: List[str],
+) -> Tuple[float, np.ndarray]:
+    """
+    See solve_linear_couplings.
+
+    Returns:
+        tuple: the chi-squared and the form factors at ts with the solved couplings
+
+    """
+    ys = np.asarray(ys, dtype=float)
+    errors = np.asarray(errors, dtype=float)
+    couplings = np.array([parameters[name].value for name in coupling_names], dtype=float)
+
+    # the Jacobian with respect to the couplings does not depend on the couplings
+    form_factors, basis = _eval_kaon_form_factor_with_jacobian(ts, parameters, coupling_names)
+    offset = form_factors - basis @ couplings
+
+    def residuals(a):
+        return (np.abs(offset + basis @ a) - ys) / errors
+
+    def jacobian(a):
+        f = offset + basis @ a
+        return np.real(np.conj(f)[:, np.newaxis] * basis) / (np.abs(f) * errors)[:, np.newaxis]
+
+    result = least_squares(residuals, couplings, jac=jacobian, method='lm')
+
+    for name, value in zip(coupling_names, result.x):
+        parameters.set_value(name, float(value))
+    return 2 * result.cost, offset + basis @ result.x
+
+
+class CrossSectionEvaluationPlan:
+    """
+    The evaluation of the total cross-section on a fixed dataset, prepared for repeated evaluations
+    with different values of the model parameters.
+
+    Everything that does not depend on the model parameters is prepared only once: the configuration,
+    the cross-section calculators and (for the kaon form factor models) the arrays of the values of t,
+    the masks of the charged and neutral datapoints and the kinematic factors of the cross-section formula.
+    The kaon form factor models are then evaluated in a vectorized way: the contributions of both channels are
+    evaluated only once for each distinct value of t and the form factors of the charged and of the neutral kaons
+    are combined from them (see KaonUAModelBase.combine_contributions). The same holds for NucleonUAModel
+    (the arrays of the values of t, the masks of the proton datapoints and the electric and magnetic kinematic
+    factors).
+
+    The images of the (distinct) values of t in the W-plane depend only on the branch points (t_0, t_in)
+    of a channel, which are frequently fixed during a fit. They are cached, keyed on (t_0, t_in), and recomputed
+    only when the branch points move.
+
+    Similarly, the contribution of a component of a kaon model (the asymptotic factor times the resonant factor,
+    without the coupling constant) depends only on the branch points of its channel and on the mass and the decay
+    rate of its resonance. These vectors are cached as well, so with fixed resonances (and branch points)
+    the evaluation of the form factors reduces to the products of the couplings with the matrices of the cached
+    contributions.
+
+    The contribution of a channel of NucleonUAModel is a weighted sum of the products of the resonant factors
+    of its components (see NucleonUAModel.eval_channel_terms). The products depend only on the branch points
+    of the channel and on the masses and the decay rates of its resonances, they are cached, keyed on these,
+    and with fixed resonances only the weights (given by the couplings and the mass terms) are recomputed.
+
+    """
+    # the number of distinct (t_0, t_in) pairs whose W-plane images are kept
+    W_CACHE_SIZE = 8
+    # the number of the contributions of the components (keyed on t_0, t_in, mass and decay rate) that are kept
+    COMPONENT_CACHE_SIZE = 64
+    # the number of the terms of the channels of a nucleon model (keyed on the channel and its parameters) that are kept
+    NUCLEON_CHANNEL_CACHE_SIZE = 16
+
+    def __init__(
+            self,
+            ts: Union[
+                List[Union[KaonDatapoint, Tuple[float, float]]],
+                List[Union[NucleonDatapoint, Tuple[complex, float, float]]],
+            ],
+            product_particle_mass: float,
+            alpha: float,
+            hc_squared: float,
+    ) -> None:
+        self.ts = ts
+        self.product_particle_mass = product_particle_mass
+
+        config = ConfigParser()
+        config['constants'] = {'alpha': str(alpha), 'hc_squared': str(hc_squared)}
+        # the form factor models are set at the time of the evaluation
+        self._kaon_cross_section = ScalarMesonProductionTotalCrossSection(product_particle_mass, None, config)
+        self._nucleon_cross_section = NucleonPairToElectronPositronTotalCrossSection(
+            product_particle_mass, None, config
+        )
+
+        # prepared on the first evaluation with a kaon form factor model
+        self._kaon_ts = None
+        self._kaon_is_charged = None
+        self._kaon_kinematic_factors = None
+        self._kaon_unique_ts = None
+        self._kaon_inverse = None
+        # prepared on the first evaluation with a nucleon model
+        self._nucleon_ts = None
+        self._nucleon_is_proton = None
+        self._nucleon_distinct_ts = None
+        self._nucleon_kinematic_factors = None
+        self._w_cache = OrderedDict()
+        self._w_derivatives_cache = OrderedDict()
+        self._component_cache = OrderedDict()
+        self._nucleon_channel_cache = OrderedDict()
+
+    def evaluate(
+            self,
+            ff_model: Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified, ETGMRModel, TwoPolesModel,
+                            NucleonUAModel],
+    ) -> np.ndarray:
+        if _is_kaon_type_model(ff_model):
+            return self._evaluate_kaon_type_model(ff_model)
+
+        if isinstance(ff_model, NucleonUAModel):
+            return self._evaluate_nucleon_ua_model(ff_model)
+
+        if self._nucleon_ts is None:
+            self._prepare_nucleon_data()
+
+        # ETGMRModel or TwoPolesModel (any other model is rejected by _is_kaon_type_model). In these cases
+        # the model can describe (with suitable parameters) both form factors and cross-sections.
+        # They do not distinguish the proton and the neutron.
+        return np.abs(_eval_at_distinct_ts(ff_model, self._nucleon_ts, self._nucleon_distinct_ts))
+
+    def _evaluate_nucleon_ua_model(self, ff_model: NucleonUAModel) -> np.ndarray:
+        if self._nucleon_ts is None:
+            self._prepare_nucleon_data()
+        if self._nucleon_kinematic_factors is None:
+            self._nucleon_kinematic_factors = self._nucleon_cross_section.eval_kinematic_factors_array(
+                self._nucleon_ts
+            )
+
+        # the contributions of the channels are evaluated once for each distinct value of t, all the form factors
+        # are their combinations
+        contributions = _scatter_to_datapoints(
+            tuple(
+                ff_model.get_channel_weights(channel) @ self._get_nucleon_channel_terms(ff_model, channel)
+                for channel in ['dirac_isoscalar', 'dirac_isovector', 'pauli_isoscalar', 'pauli_isovector']
+            ),
+            self._nucleon_distinct_ts[1],
+        )
+        electric_proton, magnetic_proton = ff_model.combine_contributions(self._nucleon_ts, contributions, proton=True)
+        electric_neutron, magnetic_neutron = ff_model.combine_contributions(
+            self._nucleon_ts, contributions, proton=False,
+        )
+        electric = np.where(self._nucleon_is_proton, electric_proton, electric_neutron)
+        magnetic = np.where(self._nucleon_is_proton, magnetic_proton, magnetic_neutron)
+
+        electric_factors, magnetic_factors = self._nucleon_kinematic_factors
+        return np.abs(electric_factors * np.abs(electric) ** 2 + magnetic_factors * np.abs(magnetic) ** 2)
+
+    def _get_nucleon_channel_terms(self, ff_model: NucleonUAModel, channel: str) -> np.ndarray:
+        """
+        Return the terms of the contribution of a channel of a nucleon model (without their weights)
+        at the distinct values of t of the datapoints.
+
+        """
+        t_0 = getattr(ff_model, 't_0_' + channel)
+        t_in = getattr(ff_model, 't_in_' + channel)
+        resonances = ff_model.ISOSCALAR_RESONANCES if channel.endswith('isoscalar') else ff_model.ISOVECTOR_RESONANCES
+        key = (channel, t_0, t_in) + tuple(
+            (getattr(ff_model, 'mass_' + name), getattr(ff_model, 'decay_rate_' + name)) for name in resonances
+        )
+        if key in self._nucleon_channel_cache:
+            self._nucleon_channel_cache.move_to_end(key)
+            return self._nucleon_channel_cache[key]
+
+        unique_ts, _ = self._nucleon_distinct_ts
+        if np.any(unique_ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+        result = ff_model.eval_channel_terms(channel, MapFromTtoW(t_0, t_in).evaluate_array(unique_ts))
+        self._nucleon_channel_cache[key] = result
+        if len(self._nucleon_channel_cache) > self.NUCLEON_CHANNEL_CACHE_SIZE:
+            self._nucleon_channel_cache.popitem(last=False)
+        return result
+
+    def evaluate_jacobian(
+            self,
+            ff_model: Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified],
+            parameter_names: List[str],
+    ) -> np.ndarray:
+        """
+        Evaluate the derivatives of the cross-section with respect to the given parameters of a kaon model.
+
+        Returns:
+            np.ndarray: the real Jacobian of the shape (number of datapoints, len(parameter_names))
+
+        """
+        if not _is_kaon_type_model(ff_model):
+            raise TypeError('Analytic derivatives are implemented only for the kaon models!')
+        if self._kaon_ts is None:
+            self._prepare_kaon_data()
+
+        ws_isoscalar = self._get_ws(ff_model.t_0_isoscalar, ff_model.t_in_isoscalar)
+        ws_isovector = self._get_ws(ff_model.t_0_isovector, ff_model.t_in_isovector)
+        dws_isoscalar = self._get_w_derivatives(ff_model.t_0_isoscalar, ff_model.t_in_isoscalar)
+        dws_isovector = self._get_w_derivatives(ff_model.t_0_isovector, ff_model.t_in_isovector)
+
+        # the channels are evaluated at the distinct values of t
+        (isoscalar_values, isoscalar_jacobian), (isovector_values, isovector_jacobian) = _scatter_to_datapoints(
+            eval_kaon_channels_with_jacobian(
+                ff_model, ws_isoscalar, ws_isovector, dws_isoscalar, dws_isovector, parameter_names,
+            ),
+            self._kaon_inverse,
+        )
+        form_factors = ff_model.combine_contributions(isoscalar_values, isovector_values, self._kaon_is_charged)
+        form_factor_jacobian = ff_model.combine_contributions(
+            isoscalar_jacobian, isovector_jacobian, self._kaon_is_charged,
+        )
+        # the cross-section is proportional to |F|^2 and d|F|^2 = 2 * Re(conj(F) * dF)
+        return 2 * self._kaon_kinematic_factors[:, np.newaxis] * np.real(
+            np.conj(form_factors)[:, np.newaxis] * form_factor_jacobian
+        )
+
+    def _evaluate_kaon_type_model(
+            self,
+            ff_model: Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified],
+    ) -> np.ndarray:
+        if self._kaon_ts is None:
+            self._prepare_kaon_data()
+
+        # the contributions of the channels are evaluated once for each distinct value of t, the form factors
+        # of the charged and of the neutral kaons are their sums, respectively differences
+        isoscalar_contribution = self._eval_channel(ff_model, 'isoscalar', ff_model.ISOSCALAR_RESONANCES)
+        isovector_contribution = self._eval_channel(ff_model, 'isovector', ff_model.ISOVECTOR_RESONANCES)
+        isoscalar_contribution, isovector_contribution = _scatter_to_datapoints(
+            (isoscalar_contribution, isovector_contribution), self._kaon_inverse,
+        )
+        form_factors = ff_model.combine_contributions(
+            isoscalar_contribution, isovector_contribution, self._kaon_is_charged,
+        )
+
+        return self._kaon_kinematic_factors * np.abs(form_factors) ** 2
+
+    def _eval_channel(
+            self,
+            ff_model: Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified],
+            channel: str,
+            resonances: Tuple[str, ...],
+    ) -> np.ndarray:
+        """
+        Return the contribution of a channel of a kaon model at the distinct values of t of the datapoints.
+
+        """
+        couplings = np.array([getattr(ff_model, 'a_' + name) for name in resonances])
+        return couplings @ np.array([self._get_component_contribution(ff_model, channel, name) for name in resonances])
+
+    def _get_component_contribution(
+            self,
+            ff_model: Union[KaonUAModel, KaonUAModelB, KaonUAModelSimplified],
+            channel: str,
+            resonance_name: str,
+    ) -> np.ndarray:
+        """
+        Return the contribution of a component of a kaon model (without its coupling constant)
+        at the distinct values of t of the datapoints.
+
+        """
+        t_0 = getattr(ff_model, 't_0_' + channel)
+        t_in = getattr(ff_model, 't_in_' + channel)
+        mass = getattr(ff_model, 'mass_' + resonance_name)
+        decay_rate = getattr(ff_model, 'decay_rate_' + resonance_name)
+        key = (t_0, t_in, mass, decay_rate)
+        if key in self._component_cache:
+            self._component_cache.move_to_end(key)
+            return self._component_cache[key]
+
+        component = getattr(ff_model, '_component_' + resonance_name)
+        normalization = getattr(ff_model, '_asymptotic_factor_denominator_' + channel)
+        ws = self._get_ws(t_0, t_in)
+        result = asymptotic_factor(ws) / normalization * component.eval_resonant_factor(ws)
+        self._component_cache[key] = result
+        if len(self._component_cache) > self.COMPONENT_CACHE_SIZE:
+            self._component_cache.popitem(last=False)
+        return result
+
+    def _prepare_kaon_data(self) -> None:
+        ts = []
+        is_charged = []
+        for datapoint in self.ts:
+            t, charged = _read_datapoint_kaon(datapoint)
+            ts.append(t)
+            is_charged.append(charged)
+        self._kaon_ts = np.array(ts, dtype=complex)
+        if np.any(self._kaon_ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+        self._kaon_is_charged = np.array(is_charged, dtype=bool)
+        self._kaon_unique_ts, self._kaon_inverse = _find_distinct_ts(self._kaon_ts)
+        self._kaon_kinematic_factors = np.abs(self._kaon_cross_section.eval_kinematic_factor_array(self._kaon_ts))
+
+    def _prepare_nucleon_data(self) -> None:
+        datapoints = [_read_datapoint_nucleon(datapoint) for datapoint in self.ts]  # type: ignore
+        self._nucleon_ts = np.array([t for t, _, _ in datapoints], dtype=complex)
+        self._nucleon_is_proton = np.array([is_proton for _, is_proton, _ in datapoints], dtype=bool)
+        self._nucleon_distinct_ts = _find_distinct_ts(self._nucleon_ts)
+
+    def _get_ws(self, t_0: float, t_in: float) -> np.ndarray:
+        """
+        Return the images of the distinct values of t of the datapoints in the W-plane given by t_0 and t_in.
+
+        """
+        key = (t_0, t_in)
+        if key in self._w_cache:
+            self._w_cache.move_to_end(key)
+            return self._w_cache[key]
+
+        result = MapFromTtoW(t_0, t_in).evaluate_array(self._kaon_unique_ts)
+        self._w_cache[key] = result
+        if len(self._w_cache) > self.W_CACHE_SIZE:
+            self._w_cache.popitem(last=False)
+        return result
+
+    def _get_w_derivatives(
+            self, t_0: float, t_in: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the derivatives dW/dt_0, dW/dt_in at the distinct values of t of the datapoints (cached as in '_get_ws').
+
+        """
+        key = (t_0, t_in)
+        if key in self._w_derivatives_cache:
+            self._w_derivatives_cache.move_to_end(key)
+            return self._w_derivatives_cache[key]
+
+        _, dws_dt_0, dws_dt_in = MapFromTtoW(t_0, t_in).evaluate_derivatives_array(self._kaon_unique_ts)
+        result = (dws_dt_0, dws_dt_in)
+        self._w_derivatives_cache[key] = result
+        if len(self._w_derivatives_cache) > self.W_CACHE_SIZE:
+            self._w_derivatives_cache.popitem(last=False)
+        return result
+
+
 def function_cross_section(
         ts: Union[
             List[Union[KaonDatapoint, Tuple[float, float]]],
@@ -156,38 +711,12 @@ def function_cross_section(
         alpha: float,
         hc_squared: float,
         parameters: ModelParameters,
-        ) -> List[complex]:
+        ) -> np.ndarray:
 
-    ff_model = _get_ff_model(parameters)
-
-    config = ConfigParser()
-    config['constants'] = {'alpha': str(alpha), 'hc_squared': str(hc_squared)}
-    if _is_kaon_type_model(ff_model):
-        cross_section_model = ScalarMesonProductionTotalCrossSection(
-            product_particle_mass, ff_model, config)
-    elif isinstance(ff_model, (ETGMRModel, TwoPolesModel)):
-        # In these cases the model can describe (with suitable parameters)
-        # both form factors and cross-sections
-        cross_section_model = ff_model
-    else:
-        cross_section_model = NucleonPairToElectronPositronTotalCrossSection(
-            product_particle_mass, ff_model, config
-        )
-
-    results = []
-    # TODO: refactor
-    if _is_kaon_type_model(ff_model):
-        for datapoint in ts:
-            t, is_charged = _read_datapoint_kaon(datapoint)
-            cross_section_model.form_factor.charged_variant = is_charged
-            results.append(abs(cross_section_model(t)))
-    else:  # a nucleon form factor model
-        for datapoint in ts:
-            t, is_proton, _ = _read_datapoint_nucleon(datapoint)  # type: ignore
-            cross_section_model.form_factor.proton = is_proton
-            results.append(abs(cross_section_model(t)))
-
-    return results
+    # Note: When evaluating the cross-section repeatedly on the same dataset, create the plan only once
+    # (see make_partial_cross_section_for_parameters).
+    plan = CrossSectionEvaluationPlan(ts, product_particle_mass, alpha, hc_squared)
+    return plan.evaluate(_get_ff_model(parameters))
 
 
 def make_partial_form_factor_for_parameters(
@@ -203,14 +732,140 @@ def make_partial_form_factor_for_parameters(
     return partial_f
 
 
+def make_partial_form_factor_jacobian_for_parameters(
+        parameters: ModelParameters,
+) -> Callable:
+    """
+    The Jacobian matching make_partial_form_factor_for_parameters (e.g. for the argument 'jac' of curve_fit).
+
+    """
+    parameters = parameters.copy()
+
+    def partial_jac(ts, *args):
+        parameters.update_free_values(list(args))
+        return function_form_factor_jacobian(ts, parameters)
+
+    return partial_jac
+
+
+def make_partial_form_factor_with_linear_couplings_for_parameters(
+        parameters: ModelParameters,
+        coupling_names: List[str],
+        ts_fit: List[Union[KaonDatapoint, Tuple[float, float]]],
+        ys_fit: List[float],
+        errors_fit: List[float],
+) -> Tuple[Callable, Callable]:
+    """
+    The form factor as a function of the free parameters other than the couplings (variable projection),
+    together with its Jacobian.
+
+    The couplings (which should be fixed in the parameters) are solved for in each evaluation,
+    so that they are optimal for the data (ts_fit, ys_fit, errors_fit); see solve_linear_couplings.
+    The least squares problem for |F| may have several local minima, hence the search starts from the couplings
+    of the best evaluation so far (the current point of the fit), not from those of the previous evaluation:
+    a trial step rejected by curve_fit would move the couplings into another minimum, which is then found
+    even at the current point.
+    The Jacobian is the Jacobian with respect to the free parameters projected onto the orthogonal complement
+    of the (weighted) Jacobian with respect to the couplings (the approximation of Kaufman).
+
+    The couplings solved for the most recent values of the free parameters are kept, together with the form
+    factors at ts_fit, so that the Jacobian at the point just evaluated by curve_fit (and the form factor
+    at the data of the fit) does not repeat the solution.
+
+    """
+    parameters = parameters.copy()
+    weights = 1 / np.asarray(errors_fit, dtype=float)
+
+    def _read_datapoints(ts):
+        return np.array([_read_datapoint_kaon(datapoint) for datapoint in ts], dtype=complex)
+
+    fit_datapoints = _read_datapoints(ts_fit)
+    best_chi_squared = np.inf
+    best_couplings = [parameters[name].value for name in coupling_names]
+    # (the values of the free parameters, the solved couplings, the form factors at ts_fit)
+    last_solution = None
+
+    def _update_parameters(args):
+        nonlocal best_chi_squared, best_couplings, last_solution
+        args = tuple(float(arg) for arg in args)
+        parameters.update_free_values(list(args))
+        if last_solution is not None and last_solution[0] == args:
+            for name, value in zip(coupling_names, last_solution[1]):
+                parameters.set_value(name, value)
+            return last_solution[2]
+
+        for name, value in zip(coupling_names, best_couplings):
+            parameters.set_value(name, value)
+        chi_squared, form_factors = _solve_linear_couplings(ts_fit, ys_fit, errors_fit, parameters, coupling_names)
+        couplings = [parameters[name].value for name in coupling_names]
+        if chi_squared < best_chi_squared:
+            best_chi_squared = chi_squared
+            best_couplings = couplings
+        last_solution = (args, couplings, form_factors)
+        return form_factors
+
+    def _is_fit_data(ts):
+        return len(ts) == len(fit_datapoints) and np.array_equal(_read_datapoints(ts), fit_datapoints)
+
+    def partial_f(ts, *args):
+        form_factors = _update_parameters(args)
+        if not _is_fit_data(ts):
+            form_factors, _ = _eval_kaon_form_factor_with_jacobian(ts, parameters, [])
+        return np.abs(form_factors)
+
+    def partial_jac(ts, *args):
+        _update_parameters(args)
+        parameter_names = [p.name for p in parameters if not p.is_fixed]
+        form_factors, jacobian = _eval_kaon_form_factor_with_jacobian(
+            ts, parameters, parameter_names + coupling_names,
+        )
+        jacobian = np.real(np.conj(form_factors)[:, np.newaxis] * jacobian) / np.abs(form_factors)[:, np.newaxis]
+
+        weighted_jacobian = weights[:, np.newaxis] * jacobian[:, :len(parameter_names)]
+        weighted_coupling_jacobian = weights[:, np.newaxis] * jacobian[:, len(parameter_names):]
+        projection, *_ = np.linalg.lstsq(weighted_coupling_jacobian, weighted_jacobian, rcond=None)
+        return (weighted_jacobian - weighted_coupling_jacobian @ projection) / weights[:, np.newaxis]
+
+    return partial_f, partial_jac
+
+
 def make_partial_cross_section_for_parameters(
         product_particle_mass: float, alpha: float, hc_squared: float,
         parameters: ModelParameters,
 ) -> Callable:
     parameters = parameters.copy()
+    # The dataset is fixed during a fit (curve_fit passes the same object in every call),
+    # hence we keep the plan prepared for the most recently used dataset.
+    last_plan = None
 
     def partial_f(ts, *args):
+        nonlocal last_plan
         parameters.update_free_values(list(args))
-        return function_cross_section(ts, product_particle_mass, alpha, hc_squared, parameters)
+        if last_plan is None or last_plan.ts is not ts:
+            last_plan = CrossSectionEvaluationPlan(ts, product_particle_mass, alpha, hc_squared)
+        return last_plan.evaluate(_get_ff_model(parameters))
 
     return partial_f
+
+
+def make_partial_cross_section_jacobian_for_parameters(
+        product_particle_mass: float, alpha: float, hc_squared: float,
+        parameters: ModelParameters,
+) -> Callable:
+    """
+    The Jacobian matching make_partial_cross_section_for_parameters (e.g. for the argument 'jac' of curve_fit).
+    Only for the kaon models.
+
+    """
+    parameters = parameters.copy()
+    parameter_names = [p.name for p in parameters if not p.is_fixed]
+    last_plan = None
+
+    def partial_jac(ts, *args):
+        nonlocal last_plan
+        parameters.update_free_values(list(args))
+        if last_plan is None or last_plan.ts is not ts:
+            last_plan = CrossSectionEvaluationPlan(ts, product_particle_mass, alpha, hc_squared)
+        return last_plan.evaluate_jacobian(_get_ff_model(parameters), parameter_names)
+
+    return partial_jac
@@ -1,7 +1,9 @@
-from typing import Callable
+from typing import Callable, Tuple
 from configparser import ConfigParser
 import math
 
+import numpy as np
+
 
 class NucleonPairToElectronPositronTotalCrossSection:
 
@@ -48,13 +50,55 @@ class NucleonPairToElectronPositronTotalCrossSection:
             complex: the value of the total cross-section in nanobarns
 
         """
-        self.form_factor.electric = True
-        electric_form_factor_modulus = abs(self.form_factor(t))
-        self.form_factor.electric = False
-        magnetic_form_factor_modulus = abs(self.form_factor(t))
+        electric_form_factor, magnetic_form_factor = self._eval_form_factors(t)
+        return self.eval_from_form_factors(t, electric_form_factor, magnetic_form_factor)
+
+    def eval_from_form_factors(
+            self,
+            t: complex,
+            electric_form_factor: complex,
+            magnetic_form_factor: complex,
+    ) -> complex:
+        """
+        Evaluate the total cross-section for the given values of the electric and magnetic form factor at t.
 
+        """
         beta = math.sqrt(1.0 - self._four_mass_squared / abs(t))
         return (
             (self._precalculated_coefficient_1 * beta / t) *
-            (magnetic_form_factor_modulus ** 2 + self._four_mass_squared * electric_form_factor_modulus**2 / (2 * t))
+            (abs(magnetic_form_factor) ** 2 + self._four_mass_squared * abs(electric_form_factor)**2 / (2 * t))
         )
+
+    def eval_kinematic_factors_array(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the factors multiplying |G_E(t)|^2 and |G_M(t)|^2 in the formula for the cross-section
+        at each element of an array of values of t (see eval_from_form_factors).
+
+        The factors do not depend on the form factor model. Hence, they can be evaluated once for a fixed dataset.
+
+        Returns:
+            tuple: the complex arrays of the electric and of the magnetic factors, of the same shape as ts
+
+        Raises:
+            ValueError: if |t| is below the threshold 4 * nucleon_mass^2 for an element of ts
+                        (as eval_from_form_factors does)
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        if np.any(np.abs(ts) < self._four_mass_squared):
+            raise ValueError('The cross-section is not defined below the threshold |t| < 4 * nucleon_mass^2')
+        magnetic_factor = self._precalculated_coefficient_1 * np.sqrt(1.0 - self._four_mass_squared / np.abs(ts)) / ts
+        electric_factor = magnetic_factor * self._four_mass_squared / (2 * ts)
+        return electric_factor, magnetic_factor
+
+    def _eval_form_factors(self, t: complex) -> Tuple[complex, complex]:
+        # the U&A model evaluates both form factors in a single pass (see NucleonUAModel.eval_electric_and_magnetic)
+        eval_electric_and_magnetic = getattr(self.form_factor, 'eval_electric_and_magnetic', None)
+        if eval_electric_and_magnetic is not None:
+            return eval_electric_and_magnetic(t)
+
+        self.form_factor.electric = True
+        electric_form_factor = self.form_factor(t)
+        self.form_factor.electric = False
+        magnetic_form_factor = self.form_factor(t)
+        return electric_form_factor, magnetic_form_factor
@@ -9,6 +9,8 @@ from typing import Callable
 from configparser import ConfigParser
 import math
 
+import numpy as np
+
 
 class ScalarMesonProductionTotalCrossSection:
 
@@ -59,3 +61,21 @@ class ScalarMesonProductionTotalCrossSection:
         return ((self._precalculated_coefficient_1 / t) *
                 ((1.0 - self._four_mass_squared / t) ** (3/2)) *
                 form_factor_modulus ** 2)
+
+    def eval_kinematic_factor_array(self, ts: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the factor multiplying |F(t)|^2 in the formula for the cross-section:
+            [(pi * alpha^2) / (3 * t)] * [1 - 4 * meson_mass^2 / t]^(3/2)
+        at each element of an array of values of t. (In nanobarns.)
+
+        The factor does not depend on the form factor model. Hence, it can be evaluated once for a fixed dataset.
+
+        Args:
+            ts (np.ndarray): an array of the squares of the four-momenta of the collisions
+
+        Returns:
+            np.ndarray: a complex array of the same shape as ts
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        return (self._precalculated_coefficient_1 / ts) * ((1.0 - self._four_mass_squared / ts) ** (3/2))
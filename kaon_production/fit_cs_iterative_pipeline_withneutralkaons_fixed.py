@@ -1,11 +1,10 @@
 from configparser import ConfigParser
-
-from multiprocessing import Pool
+from functools import partial
 
 from kaon_production.data import read_data
 from model_parameters import KaonParametersFixedSelected
-from pipeline.KaonCrossSectionIterativePipeline import CrossSectionIterativePipeline
-from common.utils import perturb_model_parameters
+from pipeline.KaonCrossSectionIterativePipeline import KaonCrossSectionIterativePipeline
+from pipeline.MultiStartRunner import MultiStartRunner
 
 
 def make_initial_parameters(t_0_isoscalar, t_0_isovector):
@@ -45,6 +44,25 @@ def make_initial_parameters(t_0_isoscalar, t_0_isovector):
     )
 
 
+def make_pipeline(
+        name, initial_parameters,
+        charged_ts, charged_cross_sections_values, charged_errors,
+        neutral_ts, neutral_cross_sections_values, neutral_errors,
+        kaon_mass, alpha, hc_squared, path_to_reports,
+):
+    numbers = (5, 3, 5, 2, 7, 5, 10, 15)
+    repetitions = (10, 40, 20, 5, 25, 20, 30, 20)
+    return KaonCrossSectionIterativePipeline(
+        name, initial_parameters,
+        charged_ts, charged_cross_sections_values, charged_errors,
+        neutral_ts, neutral_cross_sections_values, neutral_errors,
+        kaon_mass, alpha, hc_squared,
+        path_to_reports, plot=False, use_handpicked_bounds=False,
+        nr_free_params=numbers, nr_iterations=repetitions,
+        nr_initial_rounds_with_fixed_resonances=10,
+    )
+
+
 if __name__ == '__main__':
     config = ConfigParser(inline_comment_prefixes='#')
     config.read('../configuration.ini')
@@ -64,43 +82,24 @@ if __name__ == '__main__':
         'neutral_kaon.csv')
     neutral_errors = [err * 4 for err in neutral_errors]
 
-    def f(name):
-        initial_parameters = make_initial_parameters(t_0_isoscalar, t_0_isovector)
-
-        initial_parameters = perturb_model_parameters(
-            initial_parameters,
-            perturbation_size=1.0, perturbation_size_resonances=0.1,
-            use_handpicked_bounds=False,
-        )
-        numbers = (5, 3, 5, 2, 7, 5, 10, 15)
-        repetitions = (10, 40, 20, 5, 25, 20, 30, 20)
-        pipeline = CrossSectionIterativePipeline(
-            name, initial_parameters,
-            charged_ts, charged_cross_sections_values, charged_errors,
-            neutral_ts, neutral_cross_sections_values, neutral_errors,
-            kaon_mass, alpha, hc_squared,
-            path_to_reports, plot=False, use_handpicked_bounds=False,
-            nr_free_params=numbers, nr_iterations=repetitions,
-            nr_initial_rounds_with_fixed_resonances=10,
-        )
-        return pipeline.run()
-
-    final_results = []
-    with Pool(processes=7) as pool:
-        results = [pool.apply_async(f, (f'newdata12_{i}',)) for i in range(10)]
-        pool.close()
-        pool.join()
-        best_fit = {'chi_squared': None, 'name': None, 'parameters': None}
-        for result in results:
-            r = result.get()
-            print(r)
-            if r and r.get('chi_squared', None) is not None:
-                final_results.append(r)
-                if best_fit['chi_squared'] is None:
-                    best_fit = r
-                elif r['chi_squared'] < best_fit['chi_squared']:
-                    best_fit = r
-        print('Best fit: ', best_fit)
+    runner = MultiStartRunner(
+        partial(
+            make_pipeline,
+            charged_ts=charged_ts, charged_cross_sections_values=charged_cross_sections_values,
+            charged_errors=charged_errors,
+            neutral_ts=neutral_ts, neutral_cross_sections_values=neutral_cross_sections_values,
+            neutral_errors=neutral_errors,
+            kaon_mass=kaon_mass, alpha=alpha, hc_squared=hc_squared, path_to_reports=path_to_reports,
+        ),
+        make_initial_parameters(t_0_isoscalar, t_0_isovector),
+        nr_starts=10,
+        name='newdata12',
+        perturbation_size=1.0, perturbation_size_resonances=0.1,
+        use_handpicked_bounds=False,
+        nr_workers=7,
+    )
+    final_results = runner.run()
+    print('Best fit: ', final_results[0] if final_results else None)
 
-    for final_result in sorted(final_results, key=lambda fr: fr['chi_squared'])[:3]:
+    for final_result in final_results[:3]:
         print(final_result)
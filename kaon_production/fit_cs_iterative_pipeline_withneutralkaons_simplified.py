@@ -1,11 +1,10 @@
 from configparser import ConfigParser
-
-from multiprocessing import Pool
+from functools import partial
 
 from kaon_production.data import read_data
 from model_parameters.KaonParametersSimplified import KaonParametersSimplified
-from pipeline.KaonCrossSectionIterativePipeline import CrossSectionIterativePipeline
-from common.utils import perturb_model_parameters
+from pipeline.KaonCrossSectionIterativePipeline import KaonCrossSectionIterativePipeline
+from pipeline.MultiStartRunner import MultiStartRunner
 
 
 def make_initial_parameters(t_0_isoscalar, t_0_isovector):
@@ -39,6 +38,25 @@ def make_initial_parameters(t_0_isoscalar, t_0_isovector):
     )
 
 
+def make_pipeline(
+        name, initial_parameters,
+        charged_ts, charged_cross_sections_values, charged_errors,
+        neutral_ts, neutral_cross_sections_values, neutral_errors,
+        kaon_mass, alpha, hc_squared, path_to_reports,
+):
+    numbers = (5, 4, 6, 2, 8, 4, 10, 17, 5)
+    repetitions = (5, 20, 20, 10, 40, 10, 20, 20, 10)
+    return KaonCrossSectionIterativePipeline(
+        name, initial_parameters,
+        charged_ts, charged_cross_sections_values, charged_errors,
+        neutral_ts, neutral_cross_sections_values, neutral_errors,
+        kaon_mass, alpha, hc_squared,
+        path_to_reports, plot=False, use_handpicked_bounds=True,
+        nr_free_params=numbers, nr_iterations=repetitions,
+        nr_initial_rounds_with_fixed_resonances=5,
+    )
+
+
 if __name__ == '__main__':
     config = ConfigParser(inline_comment_prefixes='#')
     config.read('../configuration.ini')
@@ -55,43 +73,24 @@ if __name__ == '__main__':
     charged_ts, charged_cross_sections_values, charged_errors = read_data('charged_kaon.csv')
     neutral_ts, neutral_cross_sections_values, neutral_errors = read_data('neutral_kaon.csv')
 
-    def f(name):
-        initial_parameters = make_initial_parameters(t_0_isoscalar, t_0_isovector)
-
-        initial_parameters = perturb_model_parameters(
-            initial_parameters,
-            perturbation_size=0.5, perturbation_size_resonances=0.2,
-            use_handpicked_bounds=True,
-        )
-        numbers = (5, 4, 6, 2, 8, 4, 10, 17, 5)
-        repetitions = (5, 20, 20, 10, 40, 10, 20, 20, 10)
-        pipeline = CrossSectionIterativePipeline(
-            name, initial_parameters,
-            charged_ts, charged_cross_sections_values, charged_errors,
-            neutral_ts, neutral_cross_sections_values, neutral_errors,
-            kaon_mass, alpha, hc_squared,
-            path_to_reports, plot=False, use_handpicked_bounds=True,
-            nr_free_params=numbers, nr_iterations=repetitions,
-            nr_initial_rounds_with_fixed_resonances=5,
-        )
-        return pipeline.run()
-
-    final_results = []
-    with Pool(processes=6) as pool:
-        results = [pool.apply_async(f, (f'iterative10_{i}',)) for i in range(7)]
-        pool.close()
-        pool.join()
-        best_fit = {'chi_squared': None, 'name': None, 'parameters': None}
-        for result in results:
-            r = result.get()
-            print(r)
-            if r and r.get('chi_squared', None) is not None:
-                final_results.append(r)
-                if best_fit['chi_squared'] is None:
-                    best_fit = r
-                elif r['chi_squared'] < best_fit['chi_squared']:
-                    best_fit = r
-        print('Best fit: ', best_fit)
+    runner = MultiStartRunner(
+        partial(
+            make_pipeline,
+            charged_ts=charged_ts, charged_cross_sections_values=charged_cross_sections_values,
+            charged_errors=charged_errors,
+            neutral_ts=neutral_ts, neutral_cross_sections_values=neutral_cross_sections_values,
+            neutral_errors=neutral_errors,
+            kaon_mass=kaon_mass, alpha=alpha, hc_squared=hc_squared, path_to_reports=path_to_reports,
+        ),
+        make_initial_parameters(t_0_isoscalar, t_0_isovector),
+        nr_starts=7,
+        name='iterative10',
+        perturbation_size=0.5, perturbation_size_resonances=0.2,
+        use_handpicked_bounds=True,
+        nr_workers=6,
+    )
+    final_results = runner.run()
+    print('Best fit: ', final_results[0] if final_results else None)
 
-    for final_result in sorted(final_results, key=lambda fr: fr['chi_squared'])[:3]:
+    for final_result in final_results[:3]:
         print(final_result)
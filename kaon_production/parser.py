@@ -1,17 +1,22 @@
-import os.path
+from pipeline.ReportStore import read_reports
 
 
-def report(directory, filename='grep.txt'):
-    results = {}
-    with open(os.path.join(directory, filename), 'r') as f:
-        for line in f:
-            parts = line.split(':')
-            name = ':'.join(parts[:2])
-            data = ':'.join(parts[2:]).strip(' \n')
-            results[name] = eval(data)
+def report(directory):
+    """
+    Return the best fit of each pipeline whose reports directory is in 'directory',
+    as pairs (name of the pipeline, chi-squared) ordered by chi-squared.
 
-    chi_data = [(key, val['chi_squared']) for key, val in results.items()]
-    chi_data = sorted(chi_data, key=lambda p: p[1])
+    """
+    best_fits = {}
+    for record in read_reports(directory):
+        chi_squared = record['chi_squared']
+        if chi_squared is None:
+            continue
+        name = record['pipeline']
+        if name not in best_fits or chi_squared < best_fits[name]:
+            best_fits[name] = chi_squared
+
+    chi_data = sorted(best_fits.items(), key=lambda p: p[1])
     print(len(chi_data))
 
     return chi_data
@@ -19,4 +24,4 @@ def report(directory, filename='grep.txt'):
 
 if __name__ == '__main__':
     directory = '/home/lukas/reports/pool5'
-    print(report(directory))
\ No newline at end of file
+    print(report(directory))
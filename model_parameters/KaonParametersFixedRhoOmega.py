@@ -1,6 +1,6 @@
 import math
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List
 
 from model_parameters.ModelParameters import Parameter, ModelParameters
 
@@ -136,20 +136,6 @@ class KaonParametersFixedRhoOmega(ModelParameters):
         instance.fix_parameters(parameters_to_fix)
         return instance
 
-    def get_bounds_for_free_parameters(self, handpicked: bool = True) -> Tuple[List[float], List[float]]:
-        if handpicked:
-            full_bounds = self.get_model_parameters_bounds_handpicked()
-        else:
-            full_bounds = self.get_model_parameters_bounds_maximal()
-        lower_bounds = []
-        upper_bounds = []
-        for parameter in self._data:
-            if not parameter.is_fixed:
-                bounds = full_bounds[parameter.name]
-                lower_bounds.append(bounds['lower'])
-                upper_bounds.append(bounds['upper'])
-        return lower_bounds, upper_bounds
-
     def get_model_parameters_bounds_handpicked(self) -> Dict:
         """
         Returns a handpicked set of bounds.
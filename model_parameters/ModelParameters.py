@@ -1,16 +1,35 @@
 from abc import ABC, abstractmethod
 from collections import namedtuple
-from typing import Iterator, List, Tuple
+import copy
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
 
 
 Parameter = namedtuple('Parameter', 'name value is_fixed')
 
+# the arrays of the bounds, see ModelParameters._get_bounds_arrays
+_bounds_cache = {}
+
 
 class ModelParameters(ABC):
+    """
+    The parameters of a model, each with a name, a value and a flag telling whether it is fixed during a fit.
+
+    Internally, the names are mapped to indices into an array of the values and into a boolean array
+    of the 'fixed' flags (the ordering given by '_setup_data'). This makes the lookups by name cheap
+    and the free values (which curve_fit updates on every evaluation) are set by a single masked assignment.
+    The values are returned as python floats.
+
+    """
 
     def __init__(self, *args, always_fixed: Tuple[str, ...] = (), **kwargs) -> None:
         self._always_fixed = always_fixed
-        self._data = self._setup_data(*args, **kwargs)
+        data = self._setup_data(*args, **kwargs)
+        self._names = tuple(parameter.name for parameter in data)
+        self._indices = {name: index for index, name in enumerate(self._names)}
+        self._values = np.array([parameter.value for parameter in data], dtype=np.float64)
+        self._is_fixed = np.array([parameter.is_fixed for parameter in data], dtype=bool)
 
     @abstractmethod
     def _setup_data(self, *args, **kwargs) -> List[Parameter]:
@@ -29,82 +48,124 @@ class ModelParameters(ABC):
     def from_list(cls, list_of_parameters: List[Parameter]) -> 'ModelParameters':
         pass
 
+    @property
+    def _data(self) -> List[Parameter]:
+        return [
+            Parameter(name, value, is_fixed)
+            for name, value, is_fixed in zip(self._names, self._values.tolist(), self._is_fixed.tolist())
+        ]
+
     def to_list(self) -> List[Parameter]:
-        return list(self._data)
+        return self._data
 
     def copy(self) -> 'ModelParameters':
-        return self.from_list(self.to_list())
-
-    def _find(self, name: str) -> Tuple[int, Parameter]:
-        for index, parameter in enumerate(self._data):
-            if parameter.name == name:
-                return index, parameter
-        raise KeyError(f'No such key: {name}')
+        # the names and the index map are never modified, hence they can be shared by the copies
+        new_parameters = copy.copy(self)
+        new_parameters._values = self._values.copy()
+        new_parameters._is_fixed = self._is_fixed.copy()
+        return new_parameters
+
+    def _find(self, name: str) -> int:
+        try:
+            return self._indices[name]
+        except KeyError:
+            raise KeyError(f'No such key: {name}') from None
 
     def __getitem__(self, item: str) -> Parameter:
-        _, parameter = self._find(item)
-        return parameter
+        index = self._find(item)
+        return Parameter(item, float(self._values[index]), bool(self._is_fixed[index]))
 
     def __setitem__(self, key: str, new_value: Parameter) -> None:
-        index, parameter = self._find(key)
+        index = self._find(key)
         if not isinstance(new_value, Parameter):
             raise TypeError('Bad type: new_value must be of type Parameter!')
-        if not parameter.name == new_value.name:
+        if not key == new_value.name:
             raise ValueError('When setting new parameters names must be preserved!')
         if new_value.name in self._always_fixed and not new_value.is_fixed:
             raise ValueError(f'The parameter {new_value.name} must always be fixed!')
-        self._data[index] = new_value
+        self._values[index] = new_value.value
+        self._is_fixed[index] = new_value.is_fixed
 
     def set_value(self, parameter_name: str, new_parameter_value: float) -> None:
-        index, old_par = self._find(parameter_name)
-        new_par = Parameter(name=parameter_name, value=new_parameter_value, is_fixed=old_par.is_fixed)
-        self._data[index] = new_par
+        self._values[self._find(parameter_name)] = new_parameter_value
 
     def fix_parameters(self, names: List[str]) -> None:
         for name in names:
-            index, parameter = self._find(name)
-            self._data[index] = Parameter(parameter.name, parameter.value, True)
+            self._is_fixed[self._find(name)] = True
 
     def release_parameters(self, names: List[str]) -> None:
         for name in names:
             if name in self._always_fixed:
                 raise ValueError(f'The parameter {name} cannot be released!')
         for name in names:
-            index, parameter = self._find(name)
-            self._data[index] = Parameter(parameter.name, parameter.value, False)
+            self._is_fixed[self._find(name)] = False
 
     def fix_all_parameters(self) -> None:
-        for index, parameter in enumerate(self._data):
-            self._data[index] = Parameter(parameter.name, parameter.value, True)
+        self._is_fixed[:] = True
 
     def release_all_parameters(self) -> None:
-        for index, parameter in enumerate(self._data):
-            if parameter.name not in self._always_fixed:
-                self._data[index] = Parameter(parameter.name, parameter.value, False)
+        for index, name in enumerate(self._names):
+            if name not in self._always_fixed:
+                self._is_fixed[index] = False
+
+    def get_names(self) -> List[str]:
+        return list(self._names)
 
     def get_fixed_values(self) -> List[float]:
-        return [parameter.value for parameter in self._data if parameter.is_fixed]
+        return self._values[self._is_fixed].tolist()
 
     def get_free_values(self) -> List[float]:
-        return [parameter.value for parameter in self._data if not parameter.is_fixed]
+        return self._values[~self._is_fixed].tolist()
 
     def get_all_values(self) -> List[float]:
-        return list(map(lambda p: p.value, self._data))
+        return self._values.tolist()
 
     def update_free_values(self, new_values: List[float]) -> None:
-        free_parameters = [(i, parameter) for i, parameter
-                           in enumerate(self._data) if not parameter.is_fixed]
-        if len(free_parameters) != len(new_values):
-            raise ValueError(f'Wrong number of new values: got {len(new_values)}, requires {len(free_parameters)}.')
-        for (i, parameter), new_value in zip(free_parameters, new_values):
-            self._data[i] = Parameter(parameter.name, new_value, parameter.is_fixed)
+        free = ~self._is_fixed
+        nr_free_parameters = np.count_nonzero(free)
+        if nr_free_parameters != len(new_values):
+            raise ValueError(f'Wrong number of new values: got {len(new_values)}, requires {nr_free_parameters}.')
+        self._values[free] = new_values
 
     def __iter__(self) -> Iterator[Parameter]:
-        for parameter in self._data:
-            yield parameter
+        return iter(self._data)
+
+    def get_bounds_for_free_parameters(self, handpicked: bool = True) -> Tuple[List[float], List[float]]:
+        lower_bounds, upper_bounds, has_bounds = self._get_bounds_arrays(handpicked)
+        free = ~self._is_fixed
+        missing = free & ~has_bounds
+        if np.any(missing):
+            raise KeyError(self._names[int(np.argmax(missing))])
+        return lower_bounds[free].tolist(), upper_bounds[free].tolist()
+
+    def _get_bounds_arrays(self, handpicked: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the arrays of the lower and of the upper bounds of all the parameters (in the order of the parameters)
+        and the mask of the parameters which have bounds.
+
+        The arrays are built only once for each class, since the Tasks ask for the bounds repeatedly.
+        Note: The bounds may depend only on the values of the parameters that are always fixed (the thresholds t_0).
+
+        """
+        always_fixed_values = tuple(self._values[self._find(name)] for name in self._always_fixed)
+        key = (type(self), handpicked, always_fixed_values)
+        if key not in _bounds_cache:
+            if handpicked:
+                full_bounds = self.get_model_parameters_bounds_handpicked()
+            else:
+                full_bounds = self.get_model_parameters_bounds_maximal()
+            lower_bounds = np.array([full_bounds.get(name, {}).get('lower', -np.inf) for name in self._names])
+            upper_bounds = np.array([full_bounds.get(name, {}).get('upper', np.inf) for name in self._names])
+            has_bounds = np.array([name in full_bounds for name in self._names], dtype=bool)
+            _bounds_cache[key] = (lower_bounds, upper_bounds, has_bounds)
+        return _bounds_cache[key]
+
+    @abstractmethod
+    def get_model_parameters_bounds_handpicked(self) -> Dict:
+        pass
 
     @abstractmethod
-    def get_bounds_for_free_parameters(self, *args, **kwargs) -> Tuple[List[float], List[float]]:
+    def get_model_parameters_bounds_maximal(self) -> Dict:
         pass
 
     def get_ordered_values(self) -> List[float]:
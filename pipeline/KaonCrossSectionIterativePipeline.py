@@ -2,6 +2,7 @@ from typing import List, Tuple, Union
 from random import sample
 
 from pipeline.KaonCrossSectionPipeline import KaonCrossSectionPipeline
+from pipeline.PipelineLog import format_parameters
 from model_parameters import KaonParameters, KaonParametersB, KaonParametersSimplified, KaonParametersFixedSelected
 from task.kaon_cross_section_tasks import TaskFixAccordingToParametersFit, TaskFullFit
 
@@ -17,11 +18,12 @@ class KaonCrossSectionIterativePipeline(KaonCrossSectionPipeline):
                  reports_dir: str, plot: bool = True, use_handpicked_bounds: bool = True,
                  nr_free_params: Tuple[int, ...] = (3, 5, 7, 10),
                  nr_iterations: Tuple[int, ...] = (10, 20, 20, 10),
-                 nr_initial_rounds_with_fixed_resonances: int = 0) -> None:
+                 nr_initial_rounds_with_fixed_resonances: int = 0,
+                 resume: bool = False) -> None:
 
         super().__init__(name, parameters, [], t_values_charged, cross_sections_charged, errors_charged,
                          t_values_neutral, cross_sections_neutral, errors_neutral, k_meson_mass, alpha, hc_squared,
-                         reports_dir, plot, use_handpicked_bounds)
+                         reports_dir, plot, use_handpicked_bounds, resume)
 
         self.free_params_numbers = []
         for free_pars, repetitions in zip(nr_free_params, nr_iterations):
@@ -29,8 +31,14 @@ class KaonCrossSectionIterativePipeline(KaonCrossSectionPipeline):
         self.nr_initial_rounds_with_fixed_resonances = nr_initial_rounds_with_fixed_resonances
 
     def run(self) -> dict:
-        self._log(f'Starting. Initial parameters: {self.parameters.to_list()}')
+        first_round = self._load_checkpoint()
+        if first_round:
+            self._log(f'Resuming from Task#{first_round}. Parameters: {format_parameters(self.parameters)}')
+        else:
+            self._log(f'Starting. Initial parameters: {format_parameters(self.parameters)}')
         for i, fp_num in enumerate(self.free_params_numbers):
+            if i < first_round:
+                continue
             fix_resonances = (i < self.nr_initial_rounds_with_fixed_resonances)
             free_params = self._randomly_freeze_parameters(fp_num, fix_resonances)
             self._log(f'Initializing Task#{i}. Free parameters: {free_params}')
@@ -43,13 +51,19 @@ class KaonCrossSectionIterativePipeline(KaonCrossSectionPipeline):
             )
 
             self._log(f'Running {task_name}')
-            task.run()
-            self._log(f'{task_name} report: {task.report}')
+            self._run_task(task)
+            self._log_task_report(task_name, task.report)
             self._update_best_fit(task)
 
             self.parameters = task.parameters
             self._flush_report()
             self._save_report(str(i), task.report)
+            self._save_checkpoint(i + 1)
+
+        if first_round > len(self.free_params_numbers):
+            self._log_best_fit()
+            self._close_log()
+            return self._best_fit
 
         self._log(f'Initializing Task#{len(self.free_params_numbers)}. Full fit.')
         task_name = f'Task#{len(self.free_params_numbers)}:{TaskFullFit.__name__}'
@@ -61,14 +75,15 @@ class KaonCrossSectionIterativePipeline(KaonCrossSectionPipeline):
         )
 
         self._log(f'Running {task_name}')
-        task.run()
-        self._log(f'{task_name} report: {task.report}')
+        self._run_task(task)
+        self._log_task_report(task_name, task.report)
         self._update_best_fit(task)
         self.parameters = task.parameters
 
-        self._log(f'Best fit: {self._best_fit}')
-        self._flush_report()
+        self._log_best_fit()
+        self._close_log()
         self._save_report(str(len(self.free_params_numbers)), task.report)
+        self._save_checkpoint(len(self.free_params_numbers) + 1)
         return self._best_fit
 
     def _randomly_freeze_parameters(self, number_of_free_parameters, fix_resonances):
@@ -14,7 +14,7 @@ class KaonCrossSectionPipeline(Pipeline):
                  t_values_charged: List[float], cross_sections_charged: List[float], errors_charged: List[float],
                  t_values_neutral: List[float], cross_sections_neutral: List[float], errors_neutral: List[float],
                  k_meson_mass: float, alpha: float, hc_squared: float, reports_dir: str,
-                 plot: bool = True, use_handpicked_bounds: bool = True) -> None:
+                 plot: bool = True, use_handpicked_bounds: bool = True, resume: bool = False) -> None:
         ts, css, errors = self._prepare_data(
             t_values_charged, cross_sections_charged, errors_charged,
             t_values_neutral, cross_sections_neutral, errors_neutral,
@@ -22,7 +22,7 @@ class KaonCrossSectionPipeline(Pipeline):
 
         super().__init__(name, parameters, tasks,
                          ts, css, errors,
-                         reports_dir, plot, use_handpicked_bounds)
+                         reports_dir, plot, use_handpicked_bounds, resume)
         self.k_meson_mass = k_meson_mass
         self.alpha = alpha
         self.hc_squared = hc_squared
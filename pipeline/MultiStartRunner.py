@@ -0,0 +1,114 @@
+from multiprocessing import Pool
+from typing import Callable, Iterator, List, Optional, Tuple
+import random
+
+import numpy as np
+
+from common.utils import perturb_model_parameters
+from model_parameters import ModelParameters
+from pipeline.Pipeline import Pipeline
+from plotting.plot_jobs import render_plot_jobs
+
+
+def _run_single_start(
+        arguments: Tuple[Callable[[str, ModelParameters], Pipeline], str, ModelParameters, int, dict],
+) -> dict:
+    """
+    Perturb the initial parameters and run a single pipeline. Executed in the worker processes.
+
+    The random number generators are seeded with the seed of this start, so the result does not depend
+    on the worker that runs it (nor on the order in which the starts are processed).
+
+    """
+    pipeline_factory, name, initial_parameters, seed, perturbation = arguments
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        parameters = perturb_model_parameters(initial_parameters.copy(), **perturbation)
+        best_fit = pipeline_factory(name, parameters).run()
+    except Exception as err:
+        # a failure of a single start should not terminate the others
+        return {'chi_squared': None, 'name': name, 'parameters': None, 'seed': seed, 'error': repr(err)}
+    return dict(best_fit, seed=seed)
+
+
+class MultiStartRunner:
+    """
+    Run a pipeline repeatedly, each time from randomly perturbed initial parameters, in parallel processes.
+
+    The pipelines are created by pipeline_factory(name, parameters), which is called in the worker processes.
+    Hence, the factory has to be picklable: a function defined on the module level (or a functools.partial
+    of such a function), not a closure.
+
+    The runs are reproducible: each start gets its own seed derived from the given seed.
+    The number of the worker processes defaults to the number of CPUs; with a single worker the pipelines run
+    in the current process.
+
+    """
+
+    def __init__(self,
+                 pipeline_factory: Callable[[str, ModelParameters], Pipeline],
+                 initial_parameters: ModelParameters,
+                 nr_starts: int,
+                 name: str = 'start',
+                 perturbation_size: float = 0.2,
+                 perturbation_size_resonances: Optional[float] = None,
+                 use_handpicked_bounds: bool = True,
+                 nr_workers: Optional[int] = None,
+                 seed: Optional[int] = None) -> None:
+        self.pipeline_factory = pipeline_factory
+        self.initial_parameters = initial_parameters
+        self.nr_starts = nr_starts
+        self.name = name
+        self.perturbation = {
+            'perturbation_size': perturbation_size,
+            'perturbation_size_resonances': perturbation_size_resonances,
+            'use_handpicked_bounds': use_handpicked_bounds,
+        }
+        self.nr_workers = nr_workers
+        self.seed = seed
+
+    def run_iter(self) -> Iterator[dict]:
+        """
+        Run all the starts and yield the best fits of the individual pipelines as soon as they finish.
+
+        """
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(self.seed).spawn(self.nr_starts)]
+        arguments = [
+            (self.pipeline_factory, f'{self.name}_{i}', self.initial_parameters, seed, self.perturbation)
+            for i, seed in enumerate(seeds)
+        ]
+        if self.nr_workers == 1:
+            for args in arguments:
+                yield _run_single_start(args)
+            return
+
+        with Pool(processes=self.nr_workers) as pool:
+            for result in pool.imap_unordered(_run_single_start, arguments):
+                yield result
+
+    def run(self, nr_best: Optional[int] = None, verbose: bool = True, nr_plots: int = 0) -> List[dict]:
+        """
+        Run all the starts and return the successful best fits ordered by chi-squared (the best first).
+
+        Args:
+            nr_best (int): return only this number of the best fits (all of them if None)
+            verbose (bool): print the results as they arrive
+            nr_plots (int): render the plots of this number of the best fits; the pipelines have to defer
+                their plots (see Pipeline.defer_plots), the plots are rendered in parallel processes at the end
+
+        Returns:
+            list: the best fits of the individual pipelines
+
+        """
+        results = []
+        for result in self.run_iter():
+            if verbose:
+                print({key: value for key, value in result.items() if key != 'plot_job'})
+            if result.get('chi_squared') is not None:
+                results.append(result)
+        results.sort(key=lambda r: float(r['chi_squared']))
+        if nr_plots:
+            plot_jobs = [r['plot_job'] for r in results[:nr_plots] if r.get('plot_job') is not None]
+            render_plot_jobs(plot_jobs, self.nr_workers)
+        return results if nr_best is None else results[:nr_best]
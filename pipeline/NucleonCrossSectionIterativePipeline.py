@@ -2,6 +2,7 @@ from typing import List, Tuple, Union
 from random import sample
 
 from pipeline.NucleonCrossSectionPipeline import NucleonCrossSectionPipeline
+from pipeline.PipelineLog import format_parameters
 from model_parameters import NucleonParameters, ETGMRModelParameters, TwoPolesModelParameters
 from task.nucleon_cross_section_tasks import TaskFixAccordingToParametersFit, TaskFullFit
 from task.ResidualOscillationsTask import ResidualOscillationsTask
@@ -23,14 +24,15 @@ class NucleonCrossSectionIterativePipeline(NucleonCrossSectionPipeline):
                  reports_dir: str, plot: bool = True, use_handpicked_bounds: bool = True,
                  nr_free_params: Tuple[int, ...] = (3, 5, 7, 10),
                  nr_iterations: Tuple[int, ...] = (10, 20, 20, 10),
-                 nr_initial_rounds_with_fixed_resonances: int = 0) -> None:
+                 nr_initial_rounds_with_fixed_resonances: int = 0,
+                 resume: bool = False) -> None:
 
         super().__init__(name, parameters, [], t_values_proton_electric, cross_sections_proton_electric,
                          errors_proton_electric, t_values_proton_magnetic, cross_sections_proton_magnetic,
                          errors_proton_magnetic, t_values_neutron_electric, cross_sections_neutron_electric,
                          errors_neutron_electric, t_values_neutron_magnetic, cross_sections_neutron_magnetic,
                          errors_neutron_magnetic, nucleon_mass, alpha, hc_squared,
-                         reports_dir, plot, use_handpicked_bounds)
+                         reports_dir, plot, use_handpicked_bounds, resume)
 
         self.free_params_numbers = []
         for free_pars, repetitions in zip(nr_free_params, nr_iterations):
@@ -38,8 +40,14 @@ class NucleonCrossSectionIterativePipeline(NucleonCrossSectionPipeline):
         self.nr_initial_rounds_with_fixed_resonances = nr_initial_rounds_with_fixed_resonances
 
     def run(self) -> dict:
-        self._log(f'Starting. Initial parameters: {self.parameters.to_list()}')
+        first_round = self._load_checkpoint()
+        if first_round:
+            self._log(f'Resuming from Task#{first_round}. Parameters: {format_parameters(self.parameters)}')
+        else:
+            self._log(f'Starting. Initial parameters: {format_parameters(self.parameters)}')
         for i, fp_num in enumerate(self.free_params_numbers):
+            if i < first_round:
+                continue
             fix_resonances = (i < self.nr_initial_rounds_with_fixed_resonances)
             free_params = self._randomly_freeze_parameters(fp_num, fix_resonances)
             self._log(f'Initializing Task#{i}. Free parameters: {free_params}')
@@ -52,23 +60,29 @@ class NucleonCrossSectionIterativePipeline(NucleonCrossSectionPipeline):
             )
 
             self._log(f'Running {task_name}')
-            task.run()
-            self._log(f'{task_name} report: {task.report}')
+            self._run_task(task)
+            self._log_task_report(task_name, task.report)
             self._update_best_fit(task)
 
             self.parameters = task.parameters
             self._flush_report()
             self._save_report(str(i), task.report)
+            self._save_checkpoint(i + 1)
 
-        self.parameters.release_all_parameters()
-        if len(self.free_params_numbers) < self.nr_initial_rounds_with_fixed_resonances:
-            name = 'Full fit (Fixed resonances)'
-            self.parameters.fix_resonances()  # type: ignore
-        else:
-            name = 'Full fit'
-        self._log(f'Initializing Task#{len(self.free_params_numbers)}. {name}.')
-        task_name = f'Task#{len(self.free_params_numbers)}:{name}'
-        task = TaskFixAccordingToParametersFit(
+        nr_rounds = len(self.free_params_numbers)
+        if first_round > nr_rounds + 1:
+            self._log_best_fit()
+            self._close_log()
+            return self._best_fit
+
+        if first_round <= nr_rounds:
+            self._run_full_fit()
+        self._log_best_fit()
+
+        # residuals
+        self._log(f'Initializing Task#{nr_rounds + 1}. Residuals.')
+        task_name = f'Task#{nr_rounds + 1}:{ResidualOscillationsTask.__name__}'
+        task = ResidualOscillationsTask(
             task_name, self.parameters,  # type: ignore
             self.ts, self.ys, self.errors,
             self.nucleon_mass, self.alpha, self.hc_squared,
@@ -76,19 +90,25 @@ class NucleonCrossSectionIterativePipeline(NucleonCrossSectionPipeline):
         )
 
         self._log(f'Running {task_name}')
-        task.run()
-        self._log(f'{task_name} report: {task.report}')
-        self._update_best_fit(task)
-        self.parameters = task.parameters
+        task.run()  # Note: the residuals are not comparable with the fits, their plot is never deferred
+        self._log_task_report(task_name, task.report)
+        self._save_report(str(nr_rounds + 1), task.report)
+        self._save_checkpoint(nr_rounds + 2)
+        self._close_log()
 
-        self._log(f'Best fit: {self._best_fit}')
-        self._flush_report()
-        self._save_report(str(len(self.free_params_numbers)), task.report)
+        return self._best_fit
 
-        # residuals
-        self._log(f'Initializing Task#{len(self.free_params_numbers) + 1}. Residuals.')
-        task_name = f'Task#{len(self.free_params_numbers) + 1}:{ResidualOscillationsTask.__name__}'
-        task = ResidualOscillationsTask(
+    def _run_full_fit(self) -> None:
+        nr_rounds = len(self.free_params_numbers)
+        self.parameters.release_all_parameters()
+        if nr_rounds < self.nr_initial_rounds_with_fixed_resonances:
+            name = 'Full fit (Fixed resonances)'
+            self.parameters.fix_resonances()  # type: ignore
+        else:
+            name = 'Full fit'
+        self._log(f'Initializing Task#{nr_rounds}. {name}.')
+        task_name = f'Task#{nr_rounds}:{name}'
+        task = TaskFixAccordingToParametersFit(
             task_name, self.parameters,  # type: ignore
             self.ts, self.ys, self.errors,
             self.nucleon_mass, self.alpha, self.hc_squared,
@@ -96,11 +116,14 @@ class NucleonCrossSectionIterativePipeline(NucleonCrossSectionPipeline):
         )
 
         self._log(f'Running {task_name}')
-        task.run()
-        self._log(f'{task_name} report: {task.report}')
-        self._save_report(str(len(self.free_params_numbers) + 1), task.report)
+        self._run_task(task)
+        self._log_task_report(task_name, task.report)
+        self._update_best_fit(task)
+        self.parameters = task.parameters
 
-        return self._best_fit
+        self._flush_report()
+        self._save_report(str(nr_rounds), task.report)
+        self._save_checkpoint(nr_rounds + 1)
 
     def _randomly_freeze_parameters(self, number_of_free_parameters, fix_resonances):
         self.parameters.release_all_parameters()  # this allows us to identify which parameters cannot be released
@@ -20,7 +20,7 @@ class NucleonCrossSectionPipeline(Pipeline):
                  t_values_neutron_magnetic: List[float], cross_sections_neutron_magnetic: List[float],
                  errors_neutron_magnetic: List[float],
                  nucleon_mass: float, alpha: float, hc_squared: float, reports_dir: str,
-                 plot: bool = True, use_handpicked_bounds: bool = True) -> None:
+                 plot: bool = True, use_handpicked_bounds: bool = True, resume: bool = False) -> None:
         ts, ys, errors = self._prepare_data(
             t_values_proton_electric, cross_sections_proton_electric, errors_proton_electric,
             t_values_proton_magnetic, cross_sections_proton_magnetic, errors_proton_magnetic,
@@ -30,7 +30,7 @@ class NucleonCrossSectionPipeline(Pipeline):
 
         super().__init__(name, parameters, tasks,
                          ts, ys, errors,
-                         reports_dir, plot, use_handpicked_bounds)
+                         reports_dir, plot, use_handpicked_bounds, resume)
         self.nucleon_mass = nucleon_mass
         self.alpha = alpha
         self.hc_squared = hc_squared
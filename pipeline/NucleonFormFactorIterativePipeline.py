@@ -2,6 +2,7 @@ from typing import List, Tuple, Union
 from random import sample
 
 from pipeline.NucleonFormFactorPipeline import NucleonFormFactorPipeline
+from pipeline.PipelineLog import format_parameters
 from model_parameters import NucleonParameters, ETGMRModelParameters, TwoPolesModelParameters
 from task.nucleon_form_factor_tasks import TaskFixAccordingToParametersFit, TaskFullFit
 
@@ -35,7 +36,7 @@ class NucleonFormFactorIterativePipeline(NucleonFormFactorPipeline):
         self.nr_initial_rounds_with_fixed_resonances = nr_initial_rounds_with_fixed_resonances
 
     def run(self) -> dict:
-        self._log(f'Starting. Initial parameters: {self.parameters.to_list()}')
+        self._log(f'Starting. Initial parameters: {format_parameters(self.parameters)}')
         for i, fp_num in enumerate(self.free_params_numbers):
             fix_resonances = (i < self.nr_initial_rounds_with_fixed_resonances)
             free_params = self._randomly_freeze_parameters(fp_num, fix_resonances)
@@ -48,8 +49,8 @@ class NucleonFormFactorIterativePipeline(NucleonFormFactorPipeline):
             )
 
             self._log(f'Running {task_name}')
-            task.run()
-            self._log(f'{task_name} report: {task.report}')
+            self._run_task(task)
+            self._log_task_report(task_name, task.report)
             self._update_best_fit(task)
 
             self.parameters = task.parameters
@@ -65,13 +66,13 @@ class NucleonFormFactorIterativePipeline(NucleonFormFactorPipeline):
         )
 
         self._log(f'Running {task_name}')
-        task.run()
-        self._log(f'{task_name} report: {task.report}')
+        self._run_task(task)
+        self._log_task_report(task_name, task.report)
         self._update_best_fit(task)
         self.parameters = task.parameters
 
-        self._log(f'Best fit: {self._best_fit}')
-        self._flush_report()
+        self._log_best_fit()
+        self._close_log()
         self._save_report(str(len(self.free_params_numbers)), task.report)
         return self._best_fit
 
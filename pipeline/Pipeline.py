@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import List, Type, Union
+from typing import List, Optional, Type, Union
 import os.path
+import pickle
+import random
+
+import numpy as np
 
 from model_parameters import ModelParameters
+from plotting.plot_jobs import render_plot_jobs
+from pipeline.PipelineLog import PipelineLog, SUMMARY, DETAILED, LOG_FILE_NAME
+from pipeline.PipelineLog import format_parameters, format_task_details, format_task_summary, format_value
+from pipeline.ReportStore import ReportStore, REPORTS_FILE_NAME
 from task.Task import Task
 from kaon_production.data import KaonDatapoint
 from nucleon_production.data import NucleonDatapoint
@@ -10,12 +18,19 @@ from nucleon_production.data import NucleonDatapoint
 
 class Pipeline(ABC):
 
+    # the name of the file (in the reports directory of the pipeline) with the checkpoint, see _save_checkpoint
+    CHECKPOINT_FILE_NAME = 'checkpoint.pickle'
+
+    # the verbosity of the log of the pipelines (see PipelineLog), it can be changed by 'pipeline.log.verbosity'
+    LOG_VERBOSITY = SUMMARY
+
     def __init__(self, name: str,
                  parameters: ModelParameters,
                  tasks: List[Type[Task]],
                  ts: Union[List[KaonDatapoint], List[NucleonDatapoint]],
                  ys: List[float], errors: List[float],
-                 reports_dir: str, plot: bool = True, use_handpicked_bounds: bool = True) -> None:
+                 reports_dir: str, plot: bool = True, use_handpicked_bounds: bool = True,
+                 resume: bool = False) -> None:
         self.name = name
         self.parameters = parameters
         self.tasks = tasks
@@ -25,58 +40,144 @@ class Pipeline(ABC):
         self.reports_dir = os.path.join(reports_dir, name)
         self.plot = plot
         self.use_handpicked_bounds = use_handpicked_bounds
+        self.resume = resume
+        # if set, the Tasks do not render their plots, the plots of the best fits are rendered by render_plots
+        self.defer_plots = False
 
-        self._report = f'Report {name}:\n'
         self._set_up_reports_directory()
+        self.log = PipelineLog(name, os.path.join(self.reports_dir, LOG_FILE_NAME), self.LOG_VERBOSITY)
+        self._report_store = ReportStore(self.reports_dir)
         self._best_fit = {'chi_squared': None, 'name': None, 'parameters': None, 'parameters_list': None}
+        self._plot_jobs = []  # pairs (chi-squared, plot job) of the finished Tasks, if the plots are deferred
 
     def run(self) -> dict:
-        self._log(f'Starting. Initial parameters: {self.parameters.to_list()}')
+        self._log(f'Starting. Initial parameters: {format_parameters(self.parameters)}')
         for i, task_class in enumerate(self.tasks):
-            self._log(f'Initializing Task#{i}. Parameters: {self.parameters.to_list()}')
+            self._log(f'Initializing Task#{i}. Parameters: {format_parameters(self.parameters)}')
             task_name = f'Task#{i}:{task_class.__name__}'
             task = self._create_task(task_name, task_class)
 
             self._log(f'Running {task_name}')
-            task.run()
-            self._log(f'{task_name} report: {task.report}')
+            self._run_task(task)
+            self._log_task_report(task_name, task.report)
             self._update_best_fit(task)
 
             self.parameters = task.parameters
             self.parameters.release_all_parameters()
             self._flush_report()
             self._save_report(str(i), task.report)
-        self._log(f'Best fit: {self._best_fit}')
-        self._flush_report()
+        self._log_best_fit()
+        self._close_log()
         return self._best_fit
 
-    def _log(self, msg: str) -> None:
-        print(f'Pipeline {self.name}: {msg}\n')
-        self._report += (msg + '\n')
+    def render_plots(self, nr_best: int = 1, nr_workers: Optional[int] = None) -> None:
+        """
+        Render the deferred plots (see defer_plots) of the 'nr_best' best fits, in parallel processes.
+
+        """
+        best_plot_jobs = sorted(self._plot_jobs, key=lambda pair: pair[0])[:nr_best]
+        render_plot_jobs([plot_job for _, plot_job in best_plot_jobs], nr_workers)
+
+    def _run_task(self, task: Task) -> None:
+        task.defer_plot = self.defer_plots
+        task.run()
+        if task.plot_job is not None and task.report['chi_squared']:
+            self._plot_jobs.append((float(task.report['chi_squared']), task.plot_job))
+
+    def _log(self, msg: str, level: int = SUMMARY) -> None:
+        self.log.log(msg, level)
+
+    def _log_task_report(self, task_name: str, report: dict) -> None:
+        self._log(f'{task_name} report: {format_task_summary(report)}')
+        if self.log.is_enabled(DETAILED):
+            self._log(f'{task_name} details: {format_task_details(report)}', DETAILED)
+
+    def _log_best_fit(self) -> None:
+        parameters = self._best_fit['parameters']
+        self._log(
+            f"Best fit: {self._best_fit['name']}, chi_squared={format_value(self._best_fit['chi_squared'])}, "
+            f"parameters: {format_parameters(parameters) if parameters is not None else None}"
+        )
 
     def _set_up_reports_directory(self) -> None:
         if os.path.exists(self.reports_dir):
-            raise ValueError(f'Directory already exists: {self.reports_dir}')
+            if not self.resume:
+                raise ValueError(f'Directory already exists: {self.reports_dir}')
+            if not os.path.exists(self._get_checkpoint_path()):
+                # interrupted before the first checkpoint: the pipeline starts from the beginning,
+                # the reports and the log of the interrupted run are discarded
+                for file_name in [REPORTS_FILE_NAME, LOG_FILE_NAME]:
+                    if os.path.exists(os.path.join(self.reports_dir, file_name)):
+                        os.remove(os.path.join(self.reports_dir, file_name))
+            return None
         os.mkdir(self.reports_dir)
 
+    def _get_checkpoint_path(self) -> str:
+        return os.path.join(self.reports_dir, self.CHECKPOINT_FILE_NAME)
+
+    def _save_checkpoint(self, next_round: int) -> None:
+        """
+        Save the state of the pipeline after a finished Task, so that the pipeline can be resumed
+        (see the argument 'resume') from the round 'next_round' if the process gets interrupted.
+
+        The states of the random number generators are saved too, hence a resumed pipeline proceeds
+        exactly as the uninterrupted one would have. So is the size of the report store, the reports appended
+        after the checkpoint are dropped on resuming (the Tasks are run again).
+
+        """
+        checkpoint = {
+            'next_round': next_round,
+            'parameters': self.parameters,
+            'best_fit': self._best_fit,
+            'plot_jobs': self._plot_jobs,
+            'random_state': random.getstate(),
+            'numpy_random_state': np.random.get_state(),
+            'reports_size': self._report_store.size(),
+        }
+        # write into a temporary file first, so that an interruption cannot leave a corrupted checkpoint behind
+        filepath = self._get_checkpoint_path()
+        with open(filepath + '.tmp', 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(filepath + '.tmp', filepath)
+
+    def _load_checkpoint(self) -> int:
+        """
+        Restore the state saved by _save_checkpoint (if the pipeline is resumed and there is a checkpoint).
+
+        Returns:
+            int: the index of the round from which the pipeline continues (0 if there is nothing to resume)
+
+        """
+        if not self.resume or not os.path.exists(self._get_checkpoint_path()):
+            return 0
+        with open(self._get_checkpoint_path(), 'rb') as f:
+            checkpoint = pickle.load(f)
+        self.parameters = checkpoint['parameters']
+        self._best_fit = checkpoint['best_fit']
+        self._plot_jobs = checkpoint['plot_jobs']
+        random.setstate(checkpoint['random_state'])
+        np.random.set_state(checkpoint['numpy_random_state'])
+        if 'reports_size' in checkpoint:
+            self._report_store.truncate(checkpoint['reports_size'])
+        return checkpoint['next_round']
+
     def _flush_report(self) -> None:
-        filepath = os.path.join(self.reports_dir, 'report.txt')
-        with open(filepath, 'a') as f:
-            f.write(self._report)
-        self._report = '\n'
+        # Note: the messages are written by a background thread, see PipelineLog
+        self.log.flush()
+
+    def _close_log(self) -> None:
+        self.log.close()
 
     def _save_report(self, name: str, report: dict) -> None:
-        filename = f'report_{name}.txt'
-        filepath = os.path.join(self.reports_dir, filename)
-        with open(filepath, 'w') as f:
-            f.write(str(report))
+        self._report_store.append(ReportStore.make_record(self.name, name, report))
 
     def _update_best_fit(self, task: Task) -> None:
         if not task.report['chi_squared']:
             return None
         current = task.report['chi_squared']
         best_so_far = self._best_fit.get('chi_squared', None)
-        if not best_so_far or current < best_so_far:
+        # Note: the reports store chi_squared as a string
+        if not best_so_far or float(current) < float(best_so_far):
             self._best_fit = {
                 'chi_squared': current,
                 'name': f'{self.name}:{task.name}',
@@ -84,6 +185,7 @@ class Pipeline(ABC):
                 'parameters_list': task.parameters.get_ordered_values(),
                 'covariance_matrix': task.report.get('covariance_matrix'),
                 'parameter_errors': task.report.get('parameter_errors'),
+                'plot_job': task.plot_job,
             }
 
     @abstractmethod
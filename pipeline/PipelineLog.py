@@ -0,0 +1,137 @@
+"""
+The text log of a pipeline (the file report.txt in its reports directory).
+
+The messages are collected in memory and written into the file in one go when the log is flushed (the pipelines
+flush it after every Task). The writes are done by a background thread, hence a slow (e.g. shared) filesystem
+does not hold up the fits, and the file is kept open between the flushes.
+
+The verbosity controls which messages are logged:
+    QUIET: nothing
+    SUMMARY: the progress of the pipeline, the status and chi-squared of every Task, the best fit
+    DETAILED: additionally the final parameters and the parameter errors of every Task
+
+The numbers are written in a compact form (the parameters as name=value pairs, see format_parameters). The complete
+reports of the Tasks, including the covariance matrices, are in the report store (see ReportStore).
+
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from model_parameters import Parameter
+
+
+QUIET = 0
+SUMMARY = 1
+DETAILED = 2
+
+LOG_FILE_NAME = 'report.txt'
+
+
+class PipelineLog:
+
+    def __init__(self, name: str, filepath: str, verbosity: int = SUMMARY, echo: bool = True) -> None:
+        self.name = name
+        self.filepath = filepath
+        self.verbosity = verbosity
+        self.echo = echo
+
+        self._buffer = [f'Report {name}:\n']
+        self._file = None
+        self._writer = None
+        self._pending = []  # the futures of the writes, an error of any of them is raised by wait (or close)
+
+    def is_enabled(self, level: int) -> bool:
+        return level <= self.verbosity
+
+    def log(self, msg: str, level: int = SUMMARY) -> None:
+        if not self.is_enabled(level):
+            return None
+        if self.echo:
+            print(f'Pipeline {self.name}: {msg}\n')
+        self._buffer.append(msg + '\n')
+
+    def flush(self) -> None:
+        """
+        Hand the buffered messages over to the writer thread (the call does not wait for the write).
+
+        """
+        if not self._buffer:
+            return None
+        text = ''.join(self._buffer)
+        self._buffer = ['\n']
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1)  # a single thread keeps the order of the writes
+        # the finished writes are forgotten unless they failed
+        self._pending = [future for future in self._pending if not future.done() or future.exception() is not None]
+        self._pending.append(self._writer.submit(self._write, text))
+
+    def wait(self) -> None:
+        """
+        Block until all the flushed messages are written into the file, raise the error of a failed write.
+
+        """
+        pending, self._pending = self._pending, []
+        self._raise_error(pending)
+
+    def close(self) -> None:
+        """
+        Write all the messages, stop the writer thread and close the file (they get restarted and reopened if
+        anything is logged and flushed later).
+
+        """
+        try:
+            self.flush()
+            self.wait()
+        finally:
+            if self._writer is not None:
+                self._writer.shutdown(wait=True)
+                self._writer = None
+            # no write is running anymore
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _raise_error(futures: List[Future]) -> None:
+        # waits for all the futures, the first error is raised
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _write(self, text: str) -> None:
+        if self._file is None:
+            self._file = open(self.filepath, 'a')
+        self._file.write(text)
+        self._file.flush()
+
+
+def format_value(value: Optional[float]) -> str:
+    return 'None' if value is None else f'{float(value):.8g}'
+
+
+def format_parameters(parameters: Iterable[Parameter]) -> str:
+    """
+    Return the parameters as 'name=value' pairs, the free parameters are marked by an asterisk.
+
+    """
+    return ', '.join(
+        f"{parameter.name}{'' if parameter.is_fixed else '*'}={format_value(parameter.value)}"
+        for parameter in parameters
+    )
+
+
+def format_task_summary(report: dict) -> str:
+    summary = f"status={report['status']}, chi_squared={format_value(report['chi_squared'])}"
+    if report.get('error_message'):
+        summary += f", error: {report['error_message']}"
+    return summary
+
+
+def format_task_details(report: dict) -> str:
+    parameters = report['final_parameters'] or report['initial_parameters']
+    details = f'parameters: {format_parameters(parameters)}'
+    if report.get('parameter_errors') is not None:
+        errors = ', '.join(format_value(error) for error in report['parameter_errors'])
+        details += f'; errors of the free parameters: [{errors}]'
+    return details
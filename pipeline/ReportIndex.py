@@ -0,0 +1,210 @@
+"""
+A persistent index of the reports of all the pipelines in a reports root directory.
+
+The index is an SQLite database (in the root directory) with a row for every Task report found
+in the report stores (see ReportStore) of the pipelines. Since the stores are append-only, the index remembers
+how far it has read each of them, so updating the index reads only the reports appended since the last update.
+A store that was replaced or truncated since (e.g. by a resumed pipeline, see Pipeline._load_checkpoint)
+is recognized by its inode and by its last indexed line, its reports are then indexed anew.
+
+Usage:
+    python -m pipeline.ReportIndex /path/to/reports --model KaonParametersFixedSelected --max-chi-squared 2.0 --top 10
+
+"""
+from typing import List, Optional
+import argparse
+import json
+import os.path
+import sqlite3
+
+from pipeline.ReportStore import REPORTS_FILE_NAME
+
+
+INDEX_FILE_NAME = 'index.sqlite'
+
+# the version of the schema below, an index of another version is built anew (it is derived from the stores)
+_SCHEMA_VERSION = 2
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS stores (
+    directory TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    last_line BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reports (
+    directory TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    round TEXT NOT NULL,
+    task TEXT NOT NULL,
+    parameters_class TEXT,
+    status TEXT,
+    chi_squared REAL,
+    free_parameters TEXT NOT NULL,
+    parameter_names TEXT NOT NULL,
+    final_values TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_by_chi_squared ON reports (parameters_class, chi_squared);
+CREATE INDEX IF NOT EXISTS reports_by_directory ON reports (directory);
+'''
+
+
+class ReportIndex:
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._connection = sqlite3.connect(os.path.join(root, INDEX_FILE_NAME))
+        if self._connection.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            self._connection.executescript('DROP TABLE IF EXISTS stores; DROP TABLE IF EXISTS reports;')
+            self._connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def update(self) -> int:
+        """
+        Add the reports appended to the stores since the last update to the index. The reports of a store
+        that was replaced or truncated are replaced by its current reports.
+
+        Returns:
+            int: the number of the new reports (all the reports of a replaced or truncated store)
+
+        """
+        stores = {
+            directory: (position, inode, last_line)
+            for directory, position, inode, last_line in self._connection.execute('SELECT * FROM stores')
+        }
+        nr_new_reports = 0
+        with self._connection:
+            for name in sorted(os.listdir(self.root)):
+                filepath = os.path.join(self.root, name, REPORTS_FILE_NAME)
+                if not os.path.isfile(filepath):
+                    continue
+                inode = os.stat(filepath).st_ino
+                position, indexed_inode, last_line = stores.get(name, (0, inode, b''))
+                if not self._is_indexed_store(filepath, inode, position, indexed_inode, last_line):
+                    self._connection.execute('DELETE FROM reports WHERE directory = ?', (name,))
+                    position, last_line = 0, b''
+                elif os.path.getsize(filepath) <= position:
+                    continue
+                rows, position, last_line = self._read_store(filepath, name, position, last_line)
+                self._connection.executemany(
+                    'INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows,
+                )
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO stores VALUES (?, ?, ?, ?)', (name, position, inode, last_line),
+                )
+                nr_new_reports += len(rows)
+        return nr_new_reports
+
+    def query(
+            self,
+            parameters_class: Optional[str] = None,
+            max_chi_squared: Optional[float] = None,
+            free_parameter: Optional[str] = None,
+            top: Optional[int] = 10,
+    ) -> List[dict]:
+        """
+        Return the finished Task reports ordered by chi-squared (the best first).
+
+        Args:
+            parameters_class (str): only the reports of the models with this class of parameters
+            max_chi_squared (float): only the reports with chi-squared below this value
+            free_parameter (str): only the reports of the Tasks in which this parameter was free
+            top (int): the maximal number of the returned reports (all of them if None)
+
+        Returns:
+            list: dicts with the keys pipeline, round, task, parameters_class, chi_squared, free_parameters
+                and parameters (a dict of the final values)
+
+        """
+        conditions = ['chi_squared IS NOT NULL']
+        arguments = []
+        if parameters_class is not None:
+            conditions.append('parameters_class = ?')
+            arguments.append(parameters_class)
+        if max_chi_squared is not None:
+            conditions.append('chi_squared < ?')
+            arguments.append(max_chi_squared)
+        if free_parameter is not None:
+            conditions.append("(',' || free_parameters || ',') LIKE ?")
+            arguments.append(f'%,{free_parameter},%')
+        sql = (
+            'SELECT pipeline, round, task, parameters_class, chi_squared, free_parameters, parameter_names, '
+            'final_values FROM reports WHERE '
+        )
+        sql += ' AND '.join(conditions) + ' ORDER BY chi_squared'
+        if top is not None:
+            sql += ' LIMIT ?'
+            arguments.append(top)
+
+        results = []
+        for row in self._connection.execute(sql, arguments):
+            pipeline, round_name, task, class_name, chi_squared, free_parameters, names, values = row
+            results.append({
+                'pipeline': pipeline,
+                'round': round_name,
+                'task': task,
+                'parameters_class': class_name,
+                'chi_squared': chi_squared,
+                'free_parameters': free_parameters.split(',') if free_parameters else [],
+                'parameters': dict(zip(json.loads(names), json.loads(values))),
+            })
+        return results
+
+    @staticmethod
+    def _is_indexed_store(filepath: str, inode: int, position: int, indexed_inode: int, last_line: bytes) -> bool:
+        """
+        Check that the store is the one indexed up to 'position', i.e. it is the same file and its content
+        up to 'position' (checked by the last indexed line) has not changed.
+
+        """
+        if inode != indexed_inode or os.path.getsize(filepath) < position:
+            return False
+        with open(filepath, 'rb') as f:
+            f.seek(position - len(last_line))
+            return f.read(len(last_line)) == last_line
+
+    @staticmethod
+    def _read_store(filepath: str, directory: str, position: int, last_line: bytes):
+        rows = []
+        with open(filepath, 'rb') as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # the line is still being written, it will be read by the next update
+                position += len(line)
+                last_line = line
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                free_parameters = [
+                    name for name, is_fixed in zip(record['parameter_names'], record['is_fixed']) if not is_fixed
+                ]
+                rows.append((
+                    directory, record['pipeline'], record['round'], record['task'], record['parameters_class'],
+                    record['status'], record['chi_squared'], ','.join(free_parameters),
+                    json.dumps(record['parameter_names']), json.dumps(record['final_values']),
+                ))
+        return rows, position, last_line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Update the index of a reports root and query the best fits.')
+    parser.add_argument('root', help='the directory containing the reports directories of the pipelines')
+    parser.add_argument('--model', help='the class of the parameters, e.g. KaonParameters')
+    parser.add_argument('--max-chi-squared', type=float)
+    parser.add_argument('--free-parameter', help='only the Tasks in which this parameter was free')
+    parser.add_argument('--top', type=int, default=10)
+    arguments = parser.parse_args()
+
+    index = ReportIndex(arguments.root)
+    print(f'New reports indexed: {index.update()}')
+    for result in index.query(arguments.model, arguments.max_chi_squared, arguments.free_parameter, arguments.top):
+        print(f"{result['chi_squared']:.6g}  {result['pipeline']}  {result['task']}")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+The structured store of the reports of the Tasks run by a pipeline.
+
+Each pipeline appends the reports of its Tasks to a single JSON Lines file in its reports directory, one report
+(a JSON object) per line. The parameters are stored as the arrays of their names, values and 'fixed' flags,
+the chi-squared as a number and the covariance matrix as an array of arrays (over the free parameters
+of the Task), so the reports of a whole pool of pipelines can be read in bulk, without any parsing of text.
+
+"""
+from typing import List, Optional
+import json
+import os.path
+
+import numpy as np
+
+
+REPORTS_FILE_NAME = 'reports.jsonl'
+
+
+class ReportStore:
+
+    def __init__(self, directory: str) -> None:
+        self.path = os.path.join(directory, REPORTS_FILE_NAME)
+
+    def append(self, record: dict) -> None:
+        self._drop_incomplete_last_line()
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def size(self) -> int:
+        """
+        Return the size of the file in bytes (0 if nothing has been appended yet), see truncate.
+
+        """
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, size: int) -> None:
+        """
+        Drop everything appended after the store had the given size (see size).
+
+        """
+        if self.size() > size:
+            with open(self.path, 'r+') as f:
+                f.truncate(size)
+
+    def read(self) -> List[dict]:
+        """
+        Return the records in the order in which they were appended.
+
+        Note: An incomplete last line (the process was killed while writing it) is skipped.
+
+        """
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+    def _drop_incomplete_last_line(self) -> None:
+        # The process was killed while writing the last line (see read). The next record would be appended
+        # to the fragment and lost with it, hence the file is truncated to its last complete line.
+        size = self.size()
+        if size == 0:
+            return None
+        with open(self.path, 'rb+') as f:
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return None
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                position = f.read(end - start).rfind(b'\n')
+                if position >= 0:
+                    f.truncate(start + position + 1)
+                    return None
+                end = start
+            f.truncate(0)
+
+    @staticmethod
+    def make_record(pipeline_name: str, round_name: str, report: dict) -> dict:
+        """
+        Convert the report of a Task (see Task.report) into a record of the store.
+
+        """
+        initial_parameters = report['initial_parameters']
+        final_parameters = report['final_parameters'] or initial_parameters
+        return {
+            'pipeline': pipeline_name,
+            'round': round_name,
+            'task': report['name'],
+            'parameters_class': report.get('parameters_class'),
+            'status': report['status'],
+            'chi_squared': _to_float(report['chi_squared']),
+            'r2': _to_float(report['r2']),
+            'parameter_names': [p.name for p in final_parameters],
+            'initial_values': [float(p.value) for p in initial_parameters],
+            'final_values': [float(p.value) for p in final_parameters],
+            'is_fixed': [bool(p.is_fixed) for p in final_parameters],
+            'covariance_matrix': _to_list(report['covariance_matrix']),
+            'parameter_errors': _to_list(report['parameter_errors']),
+            'parameter_list': [float(value) for value in report['parameter_list']],
+            'error_message': report['error_message'],
+        }
+
+
+def read_reports(root: str) -> List[dict]:
+    """
+    Read the records of all the pipelines whose reports directories are in the directory 'root'.
+
+    """
+    records = []
+    for name in sorted(os.listdir(root)):
+        directory = os.path.join(root, name)
+        if os.path.isdir(directory):
+            records.extend(ReportStore(directory).read())
+    return records
+
+
+def _to_float(value) -> Optional[float]:
+    # Note: Task reports store the chi-squared and r2 as strings
+    return None if value is None else float(value)
+
+
+def _to_list(array) -> Optional[list]:
+    return None if array is None else np.asarray(array, dtype=float).tolist()
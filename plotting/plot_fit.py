@@ -1,15 +1,45 @@
-import os.path
-import matplotlib.pyplot as plt
+from multiprocessing import current_process
+import os
+import sys
 
+# Note: The plot functions evaluate the fit as f(ts, *pars), unless the values are passed in as fit_values
+#       (then f is not needed at all, see plotting.plot_jobs).
 
-def plot_ff_fit(ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None):
+# the non-interactive backend of matplotlib used in the worker processes, it renders into files only
+HEADLESS_BACKEND = 'Agg'
+
+
+def use_headless_backend() -> None:
+    """
+    Make matplotlib render without a display (e.g. in the worker processes), without importing it prematurely.
+
+    """
+    if 'matplotlib' in sys.modules:
+        import matplotlib
+        matplotlib.use(HEADLESS_BACKEND)
+    else:
+        os.environ['MPLBACKEND'] = HEADLESS_BACKEND
+
+
+def _get_pyplot():
+    # Note: matplotlib.pyplot is imported only when a plot is actually made, since its import (including
+    #       the selection of the backend) takes a large part of the start-up time of the fitting processes.
+    #       The worker processes of the pools (e.g. MultiStartRunner, render_plot_jobs) never use a display.
+    if current_process().daemon:
+        use_headless_backend()
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_ff_fit(ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
     fig, ax = plt.subplots()
     ax.set_title(title)
     ax.set_xlabel('t [GeV^2]')
     ax.set_ylabel('FF [1]')
     ax.errorbar(ts, ffs, yerr=errors, ecolor='black', color='black', fmt='x')
 
-    fit_ffs = f(ts, *pars)
+    fit_ffs = f(ts, *pars) if fit_values is None else fit_values
     ax.scatter(ts, fit_ffs, color='red')
 
     ax.set_xscale('log')
@@ -22,7 +52,8 @@ def plot_ff_fit(ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, sa
     plt.close()
 
 
-def plot_cs_fit(ts, css, errors, f, pars, title='Cross Section Fit', show=True, save_dir=None):
+def plot_cs_fit(ts, css, errors, f, pars, title='Cross Section Fit', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
     fig, ax = plt.subplots()
     ax.set_title(title)
     ax.set_xlabel('t [GeV^2]')
@@ -30,7 +61,7 @@ def plot_cs_fit(ts, css, errors, f, pars, title='Cross Section Fit', show=True,
     xs = [datapoint.t for datapoint in ts]
     ax.errorbar(xs, css, yerr=errors, ecolor='black', color='black', fmt='x')
 
-    fit_css = f(ts, *pars)
+    fit_css = f(ts, *pars) if fit_values is None else fit_values
     ax.scatter(xs, fit_css, color='red')
 
     ax.set_xscale('log')
@@ -44,8 +75,9 @@ def plot_cs_fit(ts, css, errors, f, pars, title='Cross Section Fit', show=True,
 
 
 def plot_cs_fit_neutral_plus_charged(
-        ts, css, errors, f, pars, title='Cross Section Fit', show=True, save_dir=None):
-    fit_css = f(ts, *pars)
+        ts, css, errors, f, pars, title='Cross Section Fit', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
+    fit_css = f(ts, *pars) if fit_values is None else fit_values
 
     charged_ts = []
     charged_css = []
@@ -94,8 +126,9 @@ def plot_cs_fit_neutral_plus_charged(
 
 
 def plot_ff_fit_neutral_plus_charged(
-        ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None):
-    fit_ffs = f(ts, *pars)
+        ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
+    fit_ffs = f(ts, *pars) if fit_values is None else fit_values
 
     charged_ts = []
     charged_ffs = []
@@ -159,8 +192,9 @@ def plot_ff_fit_neutral_plus_charged(
 
 def plot_background_residuals(
         ts, ffs, background_fit, errors, ts_residuals, residuals, errors_residuals, f, pars,
-        title='Background residuals', show=True, save_dir=None):
-    fit_res = f(ts_residuals, *pars)
+        title='Background residuals', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
+    fit_res = f(ts_residuals, *pars) if fit_values is None else fit_values
     ts = [datapoint.t for datapoint in ts]
     ts_residuals = [datapoint.t for datapoint in ts_residuals]
 
@@ -186,8 +220,9 @@ def plot_background_residuals(
 
 
 def plot_ff_fit_electric_plus_magnetic(
-        ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None):
-    fit_ffs = f(ts, *pars)
+        ts, ffs, errors, f, pars, title='Form Factor Fit', show=True, save_dir=None, fit_values=None):
+    plt = _get_pyplot()
+    fit_ffs = f(ts, *pars) if fit_values is None else fit_values
 
     electric_ts = []
     electric_ffs = []
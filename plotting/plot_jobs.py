@@ -0,0 +1,41 @@
+"""
+Deferred plotting of the fits.
+
+A Task with defer_plot set does not render its plot, it only records a PlotJob: the plot function
+(from plotting.plot_fit) together with its arguments, i.e. the data, the optimal parameters and the values
+of the fit (so the job does not refer to the model function and can be sent to another process).
+The jobs of the best fits are then rendered in a single batch by render_plot_jobs, in a process pool.
+
+"""
+from multiprocessing import Pool, current_process
+from typing import Callable, Iterable, NamedTuple, Optional
+
+
+class PlotJob(NamedTuple):
+    function: Callable
+    args: tuple
+    kwargs: dict
+
+    def render(self) -> None:
+        self.function(*self.args, **self.kwargs)
+
+
+def _render(job: PlotJob) -> None:
+    job.render()
+
+
+def render_plot_jobs(jobs: Iterable[PlotJob], nr_workers: Optional[int] = None) -> None:
+    """
+    Render the plots in parallel processes (the number of the processes defaults to the number of CPUs).
+
+    Note: The plots are rendered in the current process if nr_workers is 1 or if the current process
+          is itself a worker of a pool (these cannot start processes of their own).
+
+    """
+    jobs = list(jobs)
+    if nr_workers == 1 or len(jobs) < 2 or current_process().daemon:
+        for job in jobs:
+            job.render()
+        return None
+    with Pool(processes=nr_workers) as pool:
+        pool.map(_render, jobs)
@@ -29,10 +29,12 @@ class ETGMRModelTask(Task):
         self.alpha = alpha
         self.hc_squared = hc_squared
 
-    def _plot(self, opt_params):
+    def _make_plot_job(self, opt_params):
         if self.reports_dir:
-            plot_ff_fit_neutral_plus_charged(self.ts, self.ys, self.errors, self.partial_f,
-                                             opt_params, self.name, show=self.should_plot, save_dir=self.reports_dir)
+            return self._plot_job(
+                plot_ff_fit_neutral_plus_charged, self.ts, self.ys, self.errors, None, opt_params, self.name,
+            )
+        return None
 
     def _set_up(self):
         self.partial_f = make_partial_cross_section_for_parameters(
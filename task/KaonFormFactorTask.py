@@ -22,7 +22,9 @@ class KaonFormFactorTask(Task, ABC):
         super().__init__(name, parameters, ts, ffs, errors, plot, use_handpicked_bounds)
         self.reports_dir = reports_dir
 
-    def _plot(self, opt_params):
+    def _make_plot_job(self, opt_params):
         if self.reports_dir:
-            plot_ff_fit_neutral_plus_charged(self.ts, self.ys, self.errors, self.partial_f,
-                                             opt_params, self.name, show=self.should_plot, save_dir=self.reports_dir)
+            return self._plot_job(
+                plot_ff_fit_neutral_plus_charged, self.ts, self.ys, self.errors, None, opt_params, self.name,
+            )
+        return None
@@ -27,7 +27,7 @@ class NucleonCrossSectionTask(Task, ABC):
         self.alpha = alpha
         self.hc_squared = hc_squared
 
-    def _plot(self, opt_params):
+    def _make_plot_job(self, opt_params):
         if self.reports_dir:
-            plot_cs_fit(self.ts, self.ys, self.errors, self.partial_f,
-                        opt_params, self.name, show=self.should_plot, save_dir=self.reports_dir)
+            return self._plot_job(plot_cs_fit, self.ts, self.ys, self.errors, None, opt_params, self.name)
+        return None
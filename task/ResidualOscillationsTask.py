@@ -1,6 +1,6 @@
 import math
 import numpy as np
-from typing import Dict, List, Tuple, Union, Optional
+from typing import Dict, List, Union, Optional
 
 from plotting.plot_fit import plot_background_residuals
 from task.Task import Task
@@ -37,20 +37,6 @@ class _OscillationsParameters(ModelParameters):
         instance.fix_parameters(parameters_to_fix)
         return instance
 
-    def get_bounds_for_free_parameters(self, handpicked: bool = True) -> Tuple[List[float], List[float]]:
-        if handpicked:
-            full_bounds = self.get_model_parameters_bounds_handpicked()
-        else:
-            full_bounds = self.get_model_parameters_bounds_maximal()
-        lower_bounds = []
-        upper_bounds = []
-        for parameter in self._data:
-            if not parameter.is_fixed:
-                bounds = full_bounds[parameter.name]
-                lower_bounds.append(bounds['lower'])
-                upper_bounds.append(bounds['upper'])
-        return lower_bounds, upper_bounds
-
     @staticmethod
     def get_model_parameters_bounds_handpicked() -> Dict:
         """
@@ -102,12 +88,14 @@ class ResidualOscillationsTask(Task):
         self.ff_errors = None
         self.ff_ts = None
 
-    def _plot(self, opt_params):
+    def _make_plot_job(self, opt_params):
         if self.reports_dir:
-            plot_background_residuals(
-                self.ff_ts, self.eff_ffs, self.background_fit, self.ff_errors,
-                self.ts, self.ys, self.errors, self.partial_f,
-                opt_params, self.name, show=self.should_plot, save_dir=self.reports_dir)
+            return self._plot_job(
+                plot_background_residuals,
+                self.ff_ts, self.eff_ffs, self.background_fit, self.ff_errors, self.ts, self.ys, self.errors,
+                None, opt_params, self.name,
+            )
+        return None
 
     def transform_to_effective_form_factor(self, cs, err, t):
         tau = t / (4 * (self.product_particle_mass**2))
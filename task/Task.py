@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
 import numpy as np
 from scipy.optimize import curve_fit
-from typing import List, Union
+from typing import List, Optional, Union
 
 from kaon_production.data import KaonDatapoint
 from nucleon_production.data import NucleonDatapoint
 from model_parameters import ModelParameters
+from plotting.plot_jobs import PlotJob
 
 
 class Task(ABC):
@@ -21,6 +22,7 @@ class Task(ABC):
         self.name = name
         self.parameters = parameters
         self.partial_f = None  # prepared in the _setup method
+        self.partial_jac = None  # optionally prepared in the _setup method; if None, curve_fit uses finite differences
         self.ts = ts
         self.ys = ys
         self.errors = errors
@@ -28,9 +30,14 @@ class Task(ABC):
         self.ys_fit = ys
         self.errors_fit = errors
         self.should_plot = plot
+        # if set, the plot is not rendered but recorded in self.plot_job (see plotting.plot_jobs)
+        self.defer_plot = False
+        self.plot_job = None
+        self.fit_values = None  # the values of the fit at ts, evaluated for the report
         self.use_handpicked_bounds = use_handpicked_bounds
         self.report = {
             'name': self.name,
+            'parameters_class': type(self.parameters).__name__,
             'initial_parameters': self.parameters.to_list(),
             'final_parameters': None,
             'r2': None,
@@ -55,6 +62,7 @@ class Task(ABC):
         try:
             opt_params, covariance_matrix = curve_fit(
                 f=self.partial_f,
+                jac=self.partial_jac,
                 xdata=self.ts_fit,
                 ydata=self.ys_fit,
                 p0=self.parameters.get_free_values(),
@@ -71,7 +79,7 @@ class Task(ABC):
         return opt_params, covariance_matrix
 
     def _update_report(self, opt_parameters, covariance_matrix):
-        fit_ys = self.partial_f(self.ts, *opt_parameters)
+        fit_ys = self.fit_values = self.partial_f(self.ts, *opt_parameters)
         r_squared = [(data - fit) ** 2 for data, fit in zip(self.ys, fit_ys)]
         errors = self.errors
         chi_squared = (
@@ -88,8 +96,25 @@ class Task(ABC):
             parameter_list=self.parameters.get_ordered_values(),
         )
 
-    @abstractmethod
     def _plot(self, opt_params):
+        plot_job = self._make_plot_job(opt_params)
+        if plot_job is None:
+            return None
+        if self.defer_plot:
+            self.plot_job = plot_job
+        else:
+            plot_job.render()
+
+    def _plot_job(self, function, *args) -> PlotJob:
+        # Note: the values of the fit are passed to the plot function, so it does not need the model function
+        return PlotJob(function, args, {
+            'show': self.should_plot and not self.defer_plot,
+            'save_dir': self.reports_dir,
+            'fit_values': self.fit_values,
+        })
+
+    @abstractmethod
+    def _make_plot_job(self, opt_params) -> Optional[PlotJob]:
         pass
 
     @abstractmethod
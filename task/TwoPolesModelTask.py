@@ -23,10 +23,12 @@ class TwoPolesModelTask(Task):
         super().__init__(name, parameters, ts, ys, errors, plot, use_handpicked_bounds)
         self.reports_dir = reports_dir
 
-    def _plot(self, opt_params):
+    def _make_plot_job(self, opt_params):
         if self.reports_dir:
-            plot_ff_fit_neutral_plus_charged(self.ts, self.ys, self.errors, self.partial_f,
-                                             opt_params, self.name, show=self.should_plot, save_dir=self.reports_dir)
+            return self._plot_job(
+                plot_ff_fit_neutral_plus_charged, self.ts, self.ys, self.errors, None, opt_params, self.name,
+            )
+        return None
 
     def _set_up(self):
         self.partial_f = make_partial_cross_section_for_parameters(0, 0, 0, self.parameters)
@@ -1,5 +1,5 @@
 from task.KaonCrossSectionTask import KaonCrossSectionTask
-from common.utils import make_partial_cross_section_for_parameters
+from common.utils import make_partial_cross_section_for_parameters, make_partial_cross_section_jacobian_for_parameters
 
 # TODO: is it possible to merge tasks for kaons and nucleons?
 
@@ -11,6 +11,9 @@ class TaskFullFit(KaonCrossSectionTask):
         self.partial_f = make_partial_cross_section_for_parameters(
             self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
         )
+        self.partial_jac = make_partial_cross_section_jacobian_for_parameters(
+            self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
+        )
 
 
 class TaskFixedCouplingConstants(KaonCrossSectionTask):
@@ -22,6 +25,9 @@ class TaskFixedCouplingConstants(KaonCrossSectionTask):
         self.partial_f = make_partial_cross_section_for_parameters(
             self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
         )
+        self.partial_jac = make_partial_cross_section_jacobian_for_parameters(
+            self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
+        )
 
 
 class TaskFixAccordingToParametersFit(KaonCrossSectionTask):
@@ -30,3 +36,6 @@ class TaskFixAccordingToParametersFit(KaonCrossSectionTask):
         self.partial_f = make_partial_cross_section_for_parameters(
             self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
         )
+        self.partial_jac = make_partial_cross_section_jacobian_for_parameters(
+            self.product_particle_mass, self.alpha, self.hc_squared, self.parameters
+        )
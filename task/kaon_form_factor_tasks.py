@@ -1,5 +1,6 @@
 from task.KaonFormFactorTask import KaonFormFactorTask
-from common.utils import make_partial_form_factor_for_parameters
+from common.utils import (make_partial_form_factor_for_parameters, make_partial_form_factor_jacobian_for_parameters,
+                          make_partial_form_factor_with_linear_couplings_for_parameters, solve_linear_couplings)
 
 
 class TaskFullFit(KaonFormFactorTask):
@@ -7,6 +8,45 @@ class TaskFullFit(KaonFormFactorTask):
     def _set_up(self):
         self.parameters.release_all_parameters()
         self.partial_f = make_partial_form_factor_for_parameters(self.parameters)
+        self.partial_jac = make_partial_form_factor_jacobian_for_parameters(self.parameters)
+
+
+class TaskFullFitLinearCouplings(KaonFormFactorTask):
+    """
+    Fit all the parameters, solving for the coupling constants separately (variable projection).
+
+    The form factor is linear in the couplings. In the first stage only the remaining parameters are passed
+    to curve_fit; for each of their values the couplings are set to the optimal ones (see solve_linear_couplings).
+    Since we fit |F|, which is not linear in the couplings, the couplings are found only as a local optimum.
+    Hence the first stage is followed by a full fit of all the free parameters (the couplings included) starting
+    from its result. Only the first stage works in the reduced space of the nonlinear parameters, the second one
+    is as large as TaskFullFit.
+
+    A failure of the first stage is not reported, the second stage starts from the initial parameters then.
+
+    """
+
+    def _set_up(self):
+        self.parameters.release_all_parameters()
+        self.linear_couplings = [p.name for p in self.parameters if p.name[:2] == 'a_' and not p.is_fixed]
+
+    def _fit(self):
+        self.parameters.fix_parameters(self.linear_couplings)
+        self.partial_f, self.partial_jac = make_partial_form_factor_with_linear_couplings_for_parameters(
+            self.parameters, self.linear_couplings, self.ts_fit, self.ys_fit, self.errors_fit,
+        )
+        opt_params, _ = super()._fit()
+        if opt_params is not None:
+            self.parameters.update_free_values(opt_params)
+            solve_linear_couplings(self.ts_fit, self.ys_fit, self.errors_fit, self.parameters, self.linear_couplings)
+        self.parameters.release_parameters(self.linear_couplings)
+
+        # the report of the task is the report of the second stage
+        self.report['status'] = 'started'
+        self.report['error_message'] = None
+        self.partial_f = make_partial_form_factor_for_parameters(self.parameters)
+        self.partial_jac = make_partial_form_factor_jacobian_for_parameters(self.parameters)
+        return super()._fit()
 
 
 class TaskFullFitOnlyCharged(KaonFormFactorTask):
@@ -14,6 +54,7 @@ class TaskFullFitOnlyCharged(KaonFormFactorTask):
     def _set_up(self):
         self.parameters.release_all_parameters()
         self.partial_f = make_partial_form_factor_for_parameters(self.parameters)
+        self.partial_jac = make_partial_form_factor_jacobian_for_parameters(self.parameters)
 
         self.ts_fit, self.ys_fit, self.errors_fit = zip(
             *filter(lambda t: t[0].is_charged,
@@ -26,12 +67,14 @@ class TaskFixAccordingToParametersFit(KaonFormFactorTask):
 
     def _set_up(self):
         self.partial_f = make_partial_form_factor_for_parameters(self.parameters)
+        self.partial_jac = make_partial_form_factor_jacobian_for_parameters(self.parameters)
 
 
 class TaskFixAccordingToParametersFitOnlyCharged(KaonFormFactorTask):
 
     def _set_up(self):
         self.partial_f = make_partial_form_factor_for_parameters(self.parameters)
+        self.partial_jac = make_partial_form_factor_jacobian_for_parameters(self.parameters)
 
         self.ts_fit, self.ys_fit, self.errors_fit = zip(
             *filter(lambda t: t[0].is_charged,
@@ -0,0 +1,198 @@
+from unittest import TestCase
+from unittest.mock import patch
+from contextlib import redirect_stdout
+import io
+import os
+import pickle
+import random
+import tempfile
+
+import numpy as np
+
+from common.utils import function_cross_section
+from kaon_production.data import KaonDatapoint
+from model_parameters import KaonParameters
+from pipeline.KaonCrossSectionIterativePipeline import KaonCrossSectionIterativePipeline
+from pipeline.Pipeline import Pipeline
+from pipeline.ReportStore import ReportStore
+from plotting.plot_fit import plot_cs_fit_neutral_plus_charged
+from plotting.plot_jobs import PlotJob
+from task.kaon_cross_section_tasks import TaskFixAccordingToParametersFit
+
+
+class _Interruption(Exception):
+    pass
+
+
+class TestKaonCrossSectionIterativePipeline(TestCase):
+
+    kaon_mass = 0.493677
+    alpha = 0.0072973525693
+    hc_squared = 389379.3721
+
+    def setUp(self):
+        self.parameters = KaonParameters(
+            0.17531904388276887, 0.07791957505900839, 1.35, 2.1,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        self.ts = list(np.linspace(1.0, 4.5, 25))
+        self.css = list(function_cross_section(
+            [KaonDatapoint(t, True) for t in self.ts], self.kaon_mass, self.alpha, self.hc_squared, self.parameters,
+        ))
+        self.errors = [0.05 * cs for cs in self.css]
+        self.ts_neutral = list(np.linspace(1.02, 3.5, 15))
+        self.css_neutral = list(function_cross_section(
+            [KaonDatapoint(t, False) for t in self.ts_neutral], self.kaon_mass, self.alpha, self.hc_squared,
+            self.parameters,
+        ))
+        self.errors_neutral = [0.05 * cs for cs in self.css_neutral]
+        self.parameters.set_value('a_omega', 0.12)
+        self.parameters.set_value('a_rho', 0.1)
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.reports_dir = self._tmp_dir.name
+        # the plots are irrelevant here (and slow)
+        self._plot_patcher = patch.object(PlotJob, 'render')
+        self.render = self._plot_patcher.start()
+
+    def tearDown(self):
+        self._plot_patcher.stop()
+        self._tmp_dir.cleanup()
+
+    def _make_pipeline(self, name, resume=False):
+        return KaonCrossSectionIterativePipeline(
+            name, self.parameters.copy(),
+            self.ts, self.css, self.errors, self.ts_neutral, self.css_neutral, self.errors_neutral,
+            self.kaon_mass, self.alpha, self.hc_squared,
+            self.reports_dir, plot=False, use_handpicked_bounds=False,
+            nr_free_params=(2, 3), nr_iterations=(2, 2), resume=resume,
+        )
+
+    def _run_pipeline(self, name, resume=False):
+        pipeline = self._make_pipeline(name, resume)
+        with redirect_stdout(io.StringIO()):
+            return pipeline.run()
+
+    def test_run__deferred_plots(self):
+        random.seed(3)
+        pipeline = self._make_pipeline('deferred')
+        pipeline.defer_plots = True
+        with redirect_stdout(io.StringIO()):
+            best_fit = pipeline.run()
+
+        with self.subTest(msg='nothing is rendered by the tasks'):
+            self.assertEqual(self.render.call_count, 0)
+
+        with self.subTest(msg='plot job'):
+            plot_job = pickle.loads(pickle.dumps(best_fit['plot_job']))
+            self.assertIs(plot_job.function, plot_cs_fit_neutral_plus_charged)
+            self.assertEqual(plot_job.args[5], best_fit['name'].split(':', 1)[1])
+            self.assertEqual(plot_job.kwargs['save_dir'], os.path.join(self.reports_dir, 'deferred'))
+            self.assertFalse(plot_job.kwargs['show'])
+            self.assertEqual(len(plot_job.kwargs['fit_values']), len(self.ts) + len(self.ts_neutral))
+
+        with self.subTest(msg='the best fits are rendered'):
+            pipeline.render_plots(nr_best=2, nr_workers=1)
+            self.assertEqual(self.render.call_count, 2)
+
+    def test_run__resume(self):
+        random.seed(3)
+        uninterrupted = self._run_pipeline('uninterrupted')
+
+        original_run = TaskFixAccordingToParametersFit.run
+        nr_calls = [0]
+
+        def interrupted_run(task):
+            nr_calls[0] += 1
+            if nr_calls[0] == 3:
+                raise _Interruption()
+            return original_run(task)
+
+        random.seed(3)
+        with patch.object(TaskFixAccordingToParametersFit, 'run', interrupted_run):
+            with self.assertRaises(_Interruption):
+                self._run_pipeline('interrupted')
+
+        with self.subTest(msg='the directory cannot be reused without resuming'):
+            with self.assertRaises(ValueError):
+                self._run_pipeline('interrupted')
+
+        random.seed(12345)  # the state of the generator is restored from the checkpoint
+        resumed = self._run_pipeline('interrupted', resume=True)
+        with self.subTest(msg='a resumed pipeline ends as the uninterrupted one'):
+            self.assertEqual(resumed['chi_squared'], uninterrupted['chi_squared'])
+            self.assertEqual(resumed['parameters'], uninterrupted['parameters'])
+            self.assertEqual(resumed['name'].split(':', 1)[1], uninterrupted['name'].split(':', 1)[1])
+
+        with self.subTest(msg='reports'):
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted')).read()
+            # the interrupted round has no report, it is reported only once by the resumed pipeline
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2', '3', '4'])
+            self.assertEqual(min(r['chi_squared'] for r in records), float(resumed['chi_squared']))
+
+        with self.subTest(msg='resuming a finished pipeline'):
+            finished = self._run_pipeline('interrupted', resume=True)
+            self.assertEqual(finished['chi_squared'], resumed['chi_squared'])
+            self.assertEqual(finished['parameters'], resumed['parameters'])
+
+        with self.subTest(msg='resuming without a checkpoint starts from the beginning'):
+            random.seed(3)
+            self.assertEqual(self._run_pipeline('new', resume=True)['chi_squared'], uninterrupted['chi_squared'])
+            self.assertTrue(os.path.exists(os.path.join(self.reports_dir, 'new', 'checkpoint.pickle')))
+
+        with self.subTest(msg='resuming a pipeline interrupted in the first task'):
+            def interrupted_first_run(task):
+                raise _Interruption()
+
+            with patch.object(TaskFixAccordingToParametersFit, 'run', interrupted_first_run):
+                with self.assertRaises(_Interruption):
+                    self._run_pipeline('interrupted_first')
+            self.assertFalse(os.path.exists(os.path.join(self.reports_dir, 'interrupted_first', 'checkpoint.pickle')))
+
+            random.seed(3)
+            resumed_first = self._run_pipeline('interrupted_first', resume=True)
+            self.assertEqual(resumed_first['chi_squared'], uninterrupted['chi_squared'])
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted_first')).read()
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2', '3', '4'])
+            with open(os.path.join(self.reports_dir, 'interrupted_first', 'report.txt')) as f:
+                self.assertEqual(f.read().count('Report interrupted_first:\n'), 1)
+
+        with self.subTest(msg='resuming a pipeline interrupted between a report and its checkpoint'):
+            original_save_checkpoint = Pipeline._save_checkpoint
+            nr_checkpoints = [0]
+
+            def interrupted_save_checkpoint(pipeline, next_round):
+                nr_checkpoints[0] += 1
+                if nr_checkpoints[0] == 3:
+                    raise _Interruption()
+                return original_save_checkpoint(pipeline, next_round)
+
+            random.seed(3)
+            with patch.object(Pipeline, '_save_checkpoint', interrupted_save_checkpoint):
+                with self.assertRaises(_Interruption):
+                    self._run_pipeline('interrupted_checkpoint')
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted_checkpoint')).read()
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2'])
+
+            resumed_checkpoint = self._run_pipeline('interrupted_checkpoint', resume=True)
+            self.assertEqual(resumed_checkpoint['chi_squared'], uninterrupted['chi_squared'])
+            # the report of the round without a checkpoint is replaced by the one of the resumed pipeline
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted_checkpoint')).read()
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2', '3', '4'])
+
+        with self.subTest(msg='log'):
+            with open(os.path.join(self.reports_dir, 'uninterrupted', 'report.txt')) as f:
+                log = f.read()
+            self.assertTrue(log.startswith('Report uninterrupted:\n'))
+            self.assertIn('Task#4:TaskFullFit report: status=finished, chi_squared=', log)
+            self.assertIn('Best fit: uninterrupted:Task#', log)
+            self.assertNotIn('covariance', log)
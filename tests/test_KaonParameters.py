@@ -120,6 +120,25 @@ class TestModelParameters(TestCase):
         self.assertEqual(self.parameters['a_phi'].value, 1)
         self.assertEqual(copy['a_phi'].value, 2)
 
+        self.parameters.release_all_parameters()
+        copy = self.parameters.copy()
+        copy.fix_parameters(['a_rho'])
+        self.assertFalse(self.parameters['a_rho'].is_fixed)
+        self.assertTrue(copy['a_rho'].is_fixed)
+        self.assertIsInstance(copy, KaonParameters)
+
+    def test_get_names(self):
+        names = self.parameters.get_names()
+        self.assertEqual(len(names), 32)
+        self.assertListEqual(names, [parameter.name for parameter in self.parameters])
+
+    def test_values_are_floats(self):
+        # the values end up in the reports, hence they must not be numpy scalars
+        self.parameters.update_free_values(np.array(self.parameters.get_free_values()) * 2)
+        self.assertIs(type(self.parameters['a_phi'].value), float)
+        self.assertTrue(all(type(value) is float for value in self.parameters.get_all_values()))
+        self.assertTrue(all(type(parameter.value) is float for parameter in self.parameters.to_list()))
+
     def test_update_free_values(self):
         self.parameters.release_all_parameters()
         self.parameters.fix_parameters([
@@ -175,6 +194,22 @@ class TestModelParameters(TestCase):
             [np.inf, np.inf, np.inf, np.inf, np.inf],
         )
 
+    def test_get_bounds_for_free_parameters__thresholds(self):
+        # the bounds depend on the thresholds, which differ between the instances of a class
+        other_parameters = KaonParameters.from_list([
+            Parameter(p.name, 0.09 if p.name == 't_0_isoscalar' else p.value, p.is_fixed) for p in self.parameters
+        ])
+        for parameters, t_0_isoscalar in [(self.parameters, 0.5), (other_parameters, 0.09), (self.parameters, 0.5)]:
+            parameters.fix_all_parameters()
+            parameters.release_parameters(['t_in_isoscalar', 'mass_omega', 'a_phi'])
+            for handpicked, expected_lower_bounds in [
+                (True, [t_0_isoscalar, 0.775, -np.inf]),
+                (False, [t_0_isoscalar, np.sqrt(t_0_isoscalar), -np.inf]),
+            ]:
+                with self.subTest(t_0_isoscalar=t_0_isoscalar, handpicked=handpicked):
+                    lower_bounds, _ = parameters.get_bounds_for_free_parameters(handpicked=handpicked)
+                    self.assertListEqual(lower_bounds, expected_lower_bounds)
+
     def test_from_list_to_list_consistency(self):
         list_of_parameters = [
             Parameter(name='t_0_isoscalar', value=0.17531904388276887, is_fixed=True),
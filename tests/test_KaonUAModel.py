@@ -1,5 +1,8 @@
 from unittest import TestCase
 import cmath
+import copy
+
+import numpy as np
 
 from ua_model.KaonUAModel import KaonUAModel
 
@@ -127,3 +130,107 @@ class TestKaonUAModel(TestCase):
                 actual = kaon_model(case['t'])
                 expected = case['expected_value']
                 self.assertTrue(cmath.isclose(actual, expected, abs_tol=1.0e-15))
+
+    def test_evaluate_array_with_jacobian(self):
+        parameters = {
+            't_0_isoscalar': 0.17531, 't_0_isovector': 0.07792, 't_in_isoscalar': 1.35, 't_in_isovector': 2.1,
+            'a_omega': 0.21, 'a_omega_prime': 0.09, 'a_omega_double_prime': 0.12, 'a_phi': 0.15, 'a_phi_prime': 0.07,
+            'a_rho': 0.34, 'a_rho_prime': 0.03, 'a_rho_double_prime': 0.09,
+            'mass_omega': 0.78266, 'decay_rate_omega': 0.00868,
+            'mass_omega_prime': 1.41, 'decay_rate_omega_prime': 0.29,
+            'mass_omega_double_prime': 1.67, 'decay_rate_omega_double_prime': 0.315,
+            'mass_phi': 1.019461, 'decay_rate_phi': 0.004249,
+            'mass_phi_prime': 1.68, 'decay_rate_phi_prime': 0.15,
+            'mass_phi_double_prime': 2.159, 'decay_rate_phi_double_prime': 0.137,
+            'mass_rho': 0.77526, 'decay_rate_rho': 0.1474,
+            'mass_rho_prime': 1.465, 'decay_rate_rho_prime': 0.4,
+            'mass_rho_double_prime': 1.72, 'decay_rate_rho_double_prime': 0.25,
+            'mass_rho_triple_prime': 2.15, 'decay_rate_rho_triple_prime': 0.3,
+        }
+        parameter_names = list(parameters.keys())
+        ts = np.array([0.3, 1.1, 1.3 + 0.2j, 2.5, 4.0, 62.4j])
+        h = 1e-6
+
+        for charged_variant in [True, False]:
+            kaon_model = KaonUAModel(charged_variant=charged_variant, **parameters)
+            values, jacobian = kaon_model.evaluate_array_with_jacobian(ts, parameter_names)
+
+            with self.subTest(msg='values', charged_variant=charged_variant):
+                self.assertTrue(np.allclose(values, kaon_model.evaluate_array(ts), rtol=1e-14, atol=1e-15))
+
+            for column, name in enumerate(parameter_names):
+                shifted_up = KaonUAModel(charged_variant=charged_variant, **{**parameters, name: parameters[name] + h})
+                shifted_down = KaonUAModel(
+                    charged_variant=charged_variant, **{**parameters, name: parameters[name] - h}
+                )
+                expected = (shifted_up.evaluate_array(ts) - shifted_down.evaluate_array(ts)) / (2 * h)
+                with self.subTest(parameter=name, charged_variant=charged_variant):
+                    self.assertTrue(np.allclose(jacobian[:, column], expected, rtol=1e-5, atol=1e-8))
+
+        with self.subTest(msg='unknown parameter'):
+            kaon_model = KaonUAModel(charged_variant=True, **parameters)
+            for name in ['a_phi_double_prime', 'a_rho_triple_prime', 'mass_rh']:
+                with self.assertRaises(ValueError):
+                    kaon_model.evaluate_array_with_jacobian(ts, ['a_omega', name])
+
+    def test_update_parameters(self):
+        parameters = {
+            't_0_isoscalar': 0.17531, 't_0_isovector': 0.07792, 't_in_isoscalar': 1.35, 't_in_isovector': 2.1,
+            'a_omega': 0.21, 'a_omega_prime': 0.09, 'a_omega_double_prime': 0.12, 'a_phi': 0.15, 'a_phi_prime': 0.07,
+            'a_rho': 0.34, 'a_rho_prime': 0.03, 'a_rho_double_prime': 0.09,
+            'mass_omega': 0.78266, 'decay_rate_omega': 0.00868,
+            'mass_omega_prime': 1.41, 'decay_rate_omega_prime': 0.29,
+            'mass_omega_double_prime': 1.67, 'decay_rate_omega_double_prime': 0.315,
+            'mass_phi': 1.019461, 'decay_rate_phi': 0.004249,
+            'mass_phi_prime': 1.68, 'decay_rate_phi_prime': 0.15,
+            'mass_phi_double_prime': 2.159, 'decay_rate_phi_double_prime': 0.137,
+            'mass_rho': 0.77526, 'decay_rate_rho': 0.1474,
+            'mass_rho_prime': 1.465, 'decay_rate_rho_prime': 0.4,
+            'mass_rho_double_prime': 1.72, 'decay_rate_rho_double_prime': 0.25,
+            'mass_rho_triple_prime': 2.15, 'decay_rate_rho_triple_prime': 0.3,
+        }
+        resonances = KaonUAModel.ISOSCALAR_RESONANCES + KaonUAModel.ISOVECTOR_RESONANCES
+        components = ['_component_' + name for name in resonances]
+        ts = np.array([0.3, 1.1, 1.3 + 0.2j, 2.5, 4.0, 62.4j])
+        cases = [
+            {'changes': {'a_omega': 0.25, 'a_rho_prime': 0.01}, 'rebuilt': []},
+            {'changes': {'mass_phi': 1.02}, 'rebuilt': ['_component_phi']},
+            {
+                'changes': {'decay_rate_omega': 0.009, 'mass_rho_triple_prime': 2.2},
+                'rebuilt': ['_component_omega', '_component_rho_triple_prime'],
+            },
+            {
+                'changes': {'t_in_isovector': 2.3},
+                'rebuilt': ['_component_' + name for name in KaonUAModel.ISOVECTOR_RESONANCES],
+            },
+            {'changes': {'mass_omega': parameters['mass_omega']}, 'rebuilt': []},
+        ]
+
+        for case in cases:
+            original = KaonUAModel(charged_variant=False, **parameters)
+            updated = copy.copy(original)
+            updated.update_parameters(**case['changes'])
+            expected = KaonUAModel(charged_variant=False, **{**parameters, **case['changes']})
+
+            with self.subTest(msg='values', changes=case['changes']):
+                self.assertTrue(np.allclose(updated.evaluate_array(ts), expected.evaluate_array(ts), rtol=1e-14))
+                self.assertEqual(updated.a_phi_double_prime, expected.a_phi_double_prime)
+                self.assertEqual(updated.a_rho_triple_prime, expected.a_rho_triple_prime)
+
+            with self.subTest(msg='rebuilt components', changes=case['changes']):
+                for component in components:
+                    if component in case['rebuilt']:
+                        self.assertIsNot(getattr(updated, component), getattr(original, component))
+                    else:
+                        self.assertIs(getattr(updated, component), getattr(original, component))
+
+            with self.subTest(msg='the original is not modified', changes=case['changes']):
+                self.assertTrue(np.array_equal(
+                    original.evaluate_array(ts),
+                    KaonUAModel(charged_variant=False, **parameters).evaluate_array(ts),
+                ))
+
+        with self.subTest(msg='unknown parameter'):
+            kaon_model = KaonUAModel(charged_variant=True, **parameters)
+            with self.assertRaises(ValueError):
+                kaon_model.update_parameters(a_phi_double_prime=0.1)
@@ -0,0 +1,103 @@
+from unittest import TestCase
+import cmath
+
+import numpy as np
+
+from ua_model.KaonUAModelBase import KaonUAModelBase
+
+
+class _PhiRhoKaonModel(KaonUAModelBase):
+    ISOSCALAR_RESONANCES = ('phi', 'phi_prime')
+    ISOVECTOR_RESONANCES = ('rho', 'rho_prime', 'rho_double_prime')
+
+
+class TestKaonUAModelBase(TestCase):
+
+    parameters = {
+        't_0_isoscalar': 0.17531, 't_in_isoscalar': 1.35, 't_0_isovector': 0.07792, 't_in_isovector': 2.1,
+        'a_phi': 0.35, 'a_rho': 0.34, 'a_rho_prime': 0.03,
+        'mass_phi': 1.019461, 'decay_rate_phi': 0.004249,
+        'mass_phi_prime': 1.68, 'decay_rate_phi_prime': 0.15,
+        'mass_rho': 0.77526, 'decay_rate_rho': 0.1474,
+        'mass_rho_prime': 1.465, 'decay_rate_rho_prime': 0.4,
+        'mass_rho_double_prime': 1.72, 'decay_rate_rho_double_prime': 0.25,
+    }
+    ts = np.array([0.3, 1.1, 1.3 + 0.2j, 2.5, 4.0, 62.4j])
+
+    def test_get_parameter_names(self):
+        self.assertEqual(_PhiRhoKaonModel.get_parameter_names(), list(self.parameters.keys()))
+
+    def test_initialization(self):
+        model = _PhiRhoKaonModel(charged_variant=True, **self.parameters)
+
+        with self.subTest(msg='the dependent coupling constants'):
+            self.assertAlmostEqual(model.a_phi_prime, 0.15)
+            self.assertAlmostEqual(model.a_rho_double_prime, 0.13)
+
+        with self.subTest(msg='missing parameter'):
+            with self.assertRaises(TypeError):
+                _PhiRhoKaonModel(charged_variant=True, **{k: v for k, v in self.parameters.items() if k != 'a_phi'})
+
+        with self.subTest(msg='unknown parameter'):
+            with self.assertRaises(TypeError):
+                _PhiRhoKaonModel(charged_variant=True, a_phi_prime=0.1, **self.parameters)
+
+    def test___call__(self):
+        model = _PhiRhoKaonModel(charged_variant=True, **self.parameters)
+
+        with self.subTest(msg='normalization of the charged variant'):
+            self.assertTrue(cmath.isclose(model(0.0), 1.0))
+
+        with self.subTest(msg='normalization of the neutral variant'):
+            model.charged_variant = False
+            self.assertTrue(cmath.isclose(model(0.0), 0.0, abs_tol=1e-15))
+
+        with self.subTest(msg='scalar and array evaluation agree'):
+            values = model.evaluate_array(self.ts)
+            for t, value in zip(self.ts, values):
+                self.assertTrue(cmath.isclose(model(t), value, rel_tol=1e-14))
+
+    def test_eval_channel_contribution(self):
+        model = _PhiRhoKaonModel(charged_variant=True, **self.parameters)
+        for channel, resonances in [('isoscalar', model.ISOSCALAR_RESONANCES),
+                                    ('isovector', model.ISOVECTOR_RESONANCES)]:
+            ws = getattr(model, '_t_to_W_' + channel).evaluate_array(self.ts)
+            expected = sum(
+                getattr(model, 'a_' + name) * getattr(model, '_component_' + name).evaluate_array(ws)
+                for name in resonances
+            )
+            with self.subTest(channel=channel):
+                self.assertTrue(np.allclose(model.eval_channel_contribution(channel, ws), expected, rtol=1e-13))
+
+    def test_evaluate_array_with_jacobian(self):
+        parameter_names = list(self.parameters.keys())
+        h = 1e-6
+        for charged_variant in [True, False]:
+            model = _PhiRhoKaonModel(charged_variant=charged_variant, **self.parameters)
+            values, jacobian = model.evaluate_array_with_jacobian(self.ts, parameter_names)
+
+            with self.subTest(msg='values', charged_variant=charged_variant):
+                self.assertTrue(np.allclose(values, model.evaluate_array(self.ts), rtol=1e-14, atol=1e-15))
+
+            for column, name in enumerate(parameter_names):
+                shifted_up = _PhiRhoKaonModel(
+                    charged_variant=charged_variant, **{**self.parameters, name: self.parameters[name] + h}
+                )
+                shifted_down = _PhiRhoKaonModel(
+                    charged_variant=charged_variant, **{**self.parameters, name: self.parameters[name] - h}
+                )
+                expected = (shifted_up.evaluate_array(self.ts) - shifted_down.evaluate_array(self.ts)) / (2 * h)
+                with self.subTest(parameter=name, charged_variant=charged_variant):
+                    self.assertTrue(np.allclose(jacobian[:, column], expected, rtol=1e-5, atol=1e-8))
+
+    def test_combine_contributions(self):
+        model = _PhiRhoKaonModel(charged_variant=True, **self.parameters)
+        isoscalar_contribution, isovector_contribution = model.eval_contributions(self.ts)
+        is_charged = np.array([True, False, False, True, True, False])
+
+        actual = model.combine_contributions(isoscalar_contribution, isovector_contribution, is_charged)
+        for variant in [True, False]:
+            model.charged_variant = variant
+            with self.subTest(charged_variant=variant):
+                mask = is_charged == variant
+                self.assertTrue(np.allclose(actual[mask], model.evaluate_array(self.ts[mask]), rtol=1e-14))
@@ -1,6 +1,8 @@
 import cmath
 from unittest import TestCase
 
+import numpy as np
+
 from ua_model.MapFromTtoW import MapFromTtoW
 
 
@@ -28,3 +30,53 @@ class TestMapFromTtoW(TestCase):
                 self.assertTrue(
                     cmath.isclose(f(case['t']), case['expected_W'])
                 )
+
+    def test_evaluate_array(self):
+
+        f = MapFromTtoW(t_0=0.0, t_in=0.25)
+
+        ts = np.array([-4.0 / 9.0, 4.0 / 25.0, 1.0, 0.031069896194 + 0.035343944637j])
+        expected_ws = [-0.5, 0.5j, (-0.86602540378 + 0.5j), -0.1 + 0.2j]
+
+        actual_ws = f.evaluate_array(ts)
+        for t, actual, expected in zip(ts, actual_ws, expected_ws):
+            with self.subTest(t=t):
+                self.assertTrue(cmath.isclose(actual, expected))
+
+    def test_evaluate_array__consistency_with___call__(self):
+
+        f = MapFromTtoW(t_0=0.0779, t_in=1.35)
+
+        ts = [-1.2, 0.0, 0.0779, 0.3, 1.2, 78.4, 1j, -0.1j, 816.6412 + 76.1j, -0.2 + 14.2j, -72.413 - 0.0081j,
+              0.5 - 0j, 3.2 + 0j]
+
+        actual_ws = f.evaluate_array(np.array(ts))
+        for t, actual in zip(ts, actual_ws):
+            with self.subTest(t=t):
+                self.assertTrue(cmath.isclose(actual, f(t), abs_tol=1e-15))
+
+    def test_evaluate_derivatives_array(self):
+
+        t_0, t_in = 0.0779, 1.35
+        f = MapFromTtoW(t_0=t_0, t_in=t_in)
+
+        ts = np.array([-1.2, 0.0, 0.3, 1.2 + 0.1j, 78.4, 1j, 816.6412 + 76.1j, -72.413 - 0.0081j, 3.2 - 0.4j])
+        h = 1e-6
+
+        dw_dt, dw_dt_0, dw_dt_in = f.evaluate_derivatives_array(ts)
+        expected_dw_dt = (f.evaluate_array(ts + h) - f.evaluate_array(ts - h)) / (2 * h)
+        expected_dw_dt_0 = (
+            MapFromTtoW(t_0 + h, t_in).evaluate_array(ts) - MapFromTtoW(t_0 - h, t_in).evaluate_array(ts)
+        ) / (2 * h)
+        expected_dw_dt_in = (
+            MapFromTtoW(t_0, t_in + h).evaluate_array(ts) - MapFromTtoW(t_0, t_in - h).evaluate_array(ts)
+        ) / (2 * h)
+
+        for name, actual_values, expected_values in [
+            ('dW/dt', dw_dt, expected_dw_dt),
+            ('dW/dt_0', dw_dt_0, expected_dw_dt_0),
+            ('dW/dt_in', dw_dt_in, expected_dw_dt_in),
+        ]:
+            for t, actual, expected in zip(ts, actual_values, expected_values):
+                with self.subTest(derivative=name, t=t):
+                    self.assertTrue(cmath.isclose(actual, expected, rel_tol=1e-6, abs_tol=1e-9))
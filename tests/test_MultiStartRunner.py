@@ -0,0 +1,62 @@
+from unittest import TestCase
+import random
+
+from model_parameters import TwoPolesModelParameters
+from pipeline.MultiStartRunner import MultiStartRunner
+
+
+class _FakePipeline:
+
+    def __init__(self, name, parameters):
+        self.name = name
+        self.parameters = parameters
+
+    def run(self):
+        if self.name.endswith('_3'):
+            raise RuntimeError('Failed fit')
+        # also uses the random number generator, as the iterative pipelines do
+        chi_squared = abs(self.parameters['a'].value - 1.0) + random.random() * 1e-3
+        return {'chi_squared': str(chi_squared), 'name': self.name, 'parameters': self.parameters.to_list()}
+
+
+def _make_fake_pipeline(name, parameters):
+    return _FakePipeline(name, parameters)
+
+
+class TestMultiStartRunner(TestCase):
+
+    def _make_runner(self, nr_workers, seed):
+        return MultiStartRunner(
+            _make_fake_pipeline, TwoPolesModelParameters(1.0, 0.7, 1.2), nr_starts=6, name='test',
+            perturbation_size=0.5, nr_workers=nr_workers, seed=seed,
+        )
+
+    def test_run(self):
+        results = self._make_runner(nr_workers=1, seed=42).run(verbose=False)
+
+        with self.subTest(msg='failed starts are skipped'):
+            self.assertEqual(len(results), 5)
+            self.assertNotIn('test_3', [r['name'] for r in results])
+
+        with self.subTest(msg='ordered by chi_squared'):
+            chi_squared_values = [float(r['chi_squared']) for r in results]
+            self.assertEqual(chi_squared_values, sorted(chi_squared_values))
+
+        with self.subTest(msg='nr_best'):
+            self.assertEqual(self._make_runner(nr_workers=1, seed=42).run(nr_best=2, verbose=False), results[:2])
+
+    def test_run__reproducibility(self):
+        results_sequential = self._make_runner(nr_workers=1, seed=7).run(verbose=False)
+        results_parallel = self._make_runner(nr_workers=3, seed=7).run(verbose=False)
+        results_other_seed = self._make_runner(nr_workers=1, seed=8).run(verbose=False)
+
+        self.assertEqual(results_sequential, results_parallel)
+        self.assertNotEqual(results_sequential, results_other_seed)
+
+    def test_run_iter__failures_are_reported(self):
+        results = list(self._make_runner(nr_workers=2, seed=1).run_iter())
+
+        self.assertEqual(len(results), 6)
+        failed = [r for r in results if r['chi_squared'] is None]
+        self.assertEqual([r['name'] for r in failed], ['test_3'])
+        self.assertIn('Failed fit', failed[0]['error'])
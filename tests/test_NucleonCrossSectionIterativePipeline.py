@@ -0,0 +1,82 @@
+from unittest import TestCase
+from unittest.mock import patch
+from contextlib import redirect_stdout
+import io
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from common.utils import function_cross_section
+from model_parameters import TwoPolesModelParameters
+from nucleon_production.data import NucleonDatapoint
+from pipeline.NucleonCrossSectionIterativePipeline import NucleonCrossSectionIterativePipeline
+from pipeline.ReportStore import ReportStore
+from plotting.plot_jobs import PlotJob
+from task.ResidualOscillationsTask import ResidualOscillationsTask
+
+
+class _Interruption(Exception):
+    pass
+
+
+class TestNucleonCrossSectionIterativePipeline(TestCase):
+
+    nucleon_mass = 0.938272
+    alpha = 0.0072973525693
+    hc_squared = 389379.3721
+
+    def setUp(self):
+        self.parameters = TwoPolesModelParameters(1.0, 0.7, 1.2)
+        self.ts = list(np.linspace(3.6, 6.0, 20))
+        self.css = list(function_cross_section(
+            [NucleonDatapoint(t, True, True) for t in self.ts], self.nucleon_mass, self.alpha, self.hc_squared,
+            self.parameters,
+        ))
+        self.errors = [0.05 * cs for cs in self.css]
+        self.parameters.set_value('a', 1.1)
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.reports_dir = self._tmp_dir.name
+        # the plots are irrelevant here (and slow)
+        self._plot_patcher = patch.object(PlotJob, 'render')
+        self._plot_patcher.start()
+
+    def tearDown(self):
+        self._plot_patcher.stop()
+        self._tmp_dir.cleanup()
+
+    def _run_pipeline(self, name, resume=False):
+        pipeline = NucleonCrossSectionIterativePipeline(
+            name, self.parameters.copy(),
+            self.ts, self.css, self.errors, [], [], [], [], [], [], [], [], [],
+            self.nucleon_mass, self.alpha, self.hc_squared,
+            self.reports_dir, plot=False, use_handpicked_bounds=False,
+            nr_free_params=(1, 2), nr_iterations=(1, 1), resume=resume,
+        )
+        with redirect_stdout(io.StringIO()):
+            return pipeline.run()
+
+    def test_run__resume_in_residuals(self):
+        # the residuals are irrelevant here
+        nr_calls = [0]
+
+        def interrupted_run(task):
+            nr_calls[0] += 1
+            if nr_calls[0] == 1:
+                raise _Interruption()
+
+        random.seed(3)
+        with patch.object(ResidualOscillationsTask, 'run', interrupted_run):
+            with self.assertRaises(_Interruption):
+                self._run_pipeline('interrupted')
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted')).read()
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2'])
+
+            self._run_pipeline('interrupted', resume=True)
+
+        with self.subTest(msg='the full fit is not repeated'):
+            records = ReportStore(os.path.join(self.reports_dir, 'interrupted')).read()
+            self.assertEqual([r['round'] for r in records], ['0', '1', '2', '3'])
+            self.assertEqual(nr_calls[0], 2)
@@ -2,6 +2,8 @@ import cmath
 from unittest import TestCase
 from configparser import ConfigParser
 
+import numpy as np
+
 from cross_section.NucleonPairToElectronPositronTotalCrossSection import NucleonPairToElectronPositronTotalCrossSection
 from ua_model.NucleonUAModel import NucleonUAModel
 
@@ -102,3 +104,28 @@ class TestScalarMesonProductionTotalCrossSection(TestCase):
                 actual = cross_section(case['t'])
                 expected = case['expected_value']
                 self.assertTrue(cmath.isclose(actual, expected, abs_tol=1e-15))
+
+    def test_eval_kinematic_factors_array(self):
+        config = ConfigParser()
+        config['constants'] = {'alpha': 1/137, 'hc_squared': 1.0}
+        cross_section = NucleonPairToElectronPositronTotalCrossSection(
+            nucleon_mass=1.0,
+            form_factor_model=lambda t: t,
+            config=config,
+        )
+
+        ts = np.array([4.1, 4.21, 14.31 + 8.21j, 862.0 - 0.87j])
+        electric_factors, magnetic_factors = cross_section.eval_kinematic_factors_array(ts)
+        for t, electric_factor, magnetic_factor in zip(ts, electric_factors, magnetic_factors):
+            with self.subTest(t=t):
+                self.assertTrue(cmath.isclose(
+                    electric_factor * abs(2 * t) ** 2 + magnetic_factor * abs(3 * t) ** 2,
+                    cross_section.eval_from_form_factors(t, 2 * t, 3 * t),
+                    rel_tol=1e-12,
+                ))
+
+        with self.subTest(msg='below the threshold'):
+            with self.assertRaises(ValueError):
+                cross_section.eval_from_form_factors(3.9, 1.0, 1.0)
+            with self.assertRaises(ValueError):
+                cross_section.eval_kinematic_factors_array(np.array([4.1, 3.9]))
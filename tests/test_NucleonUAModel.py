@@ -1,6 +1,8 @@
 from unittest import TestCase
 import cmath
 
+import numpy as np
+
 from ua_model.NucleonUAModel import NucleonUAModel
 
 
@@ -247,3 +249,69 @@ class TestNucleonUAModel(TestCase):
                 actual = nucleon_model(case['t'])
                 expected = case['expected_value']
                 self.assertTrue(cmath.isclose(actual, expected, abs_tol=1.0e-15))
+
+    def test_eval_all_form_factors(self):
+        nucleon_model = NucleonUAModel(
+            proton=True,
+            electric=True,
+            nucleon_mass=0.938272,
+            magnetic_moment_proton=2.792847351,
+            magnetic_moment_neutron=-1.91304273,
+            t_0_dirac_isoscalar=0.17531904388276887,
+            t_0_dirac_isovector=0.07791957505900839,
+            t_in_dirac_isoscalar=0.9001581776629138,
+            t_in_dirac_isovector=2.713739494786232,
+            t_0_pauli_isoscalar=0.17531904388276887,
+            t_0_pauli_isovector=0.07791957505900839,
+            t_in_pauli_isoscalar=1.0512202460515163,
+            t_in_pauli_isovector=4.176812892690669,
+            a_dirac_omega=1.3200505056850964,
+            a_dirac_omega_prime=0.11215926509622014,
+            a_dirac_phi=-1.013845791442124,
+            a_dirac_phi_prime=0.26717864421535276,
+            a_dirac_rho=0.06479104707666819,
+            a_pauli_omega=-0.32774864723704805,
+            a_pauli_phi=0.07195092152400877,
+            a_pauli_phi_prime=0.349116996120233,
+            mass_omega=0.78266,
+            decay_rate_omega=0.00868,
+            mass_omega_prime=1.41,
+            decay_rate_omega_prime=0.29,
+            mass_omega_double_prime=1.67,
+            decay_rate_omega_double_prime=0.315,
+            mass_phi=1.019461,
+            decay_rate_phi=0.004249,
+            mass_phi_prime=1.68,
+            decay_rate_phi_prime=0.15,
+            mass_phi_double_prime=2.159,
+            decay_rate_phi_double_prime=0.137,
+            mass_rho=0.77526,
+            decay_rate_rho=0.1474,
+            mass_rho_prime=1.465,
+            decay_rate_rho_prime=0.4,
+            mass_rho_double_prime=1.72,
+            decay_rate_rho_double_prime=0.25,
+        )
+
+        for t in [0.0, 1.7, 0.4 + 1.2j, 162.42 - 0.647j, 62.4j]:
+            expected = []
+            for proton in [True, False]:
+                for electric in [True, False]:
+                    nucleon_model.proton = proton
+                    nucleon_model.electric = electric
+                    expected.append(nucleon_model(t))
+            with self.subTest(t=t):
+                actual = nucleon_model.eval_all_form_factors(t)
+                for actual_value, expected_value in zip(actual, expected):
+                    self.assertTrue(cmath.isclose(actual_value, expected_value, abs_tol=1.0e-15))
+
+            with self.subTest(msg='the proton (see the attribute) form factors', t=t):
+                nucleon_model.proton = True
+                self.assertEqual(nucleon_model.eval_electric_and_magnetic(t), actual[:2])
+
+        with self.subTest(msg='numpy arrays'):
+            ts = np.array([0.0, 1.7, 0.4 + 1.2j, 162.42 - 0.647j, 62.4j])
+            actual_arrays = nucleon_model.eval_all_form_factors(ts)
+            for i, t in enumerate(ts):
+                for actual_array, expected_value in zip(actual_arrays, nucleon_model.eval_all_form_factors(t)):
+                    self.assertTrue(cmath.isclose(actual_array[i], expected_value, rel_tol=1.0e-12, abs_tol=1.0e-15))
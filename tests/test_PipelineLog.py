@@ -0,0 +1,121 @@
+from unittest import TestCase
+from unittest.mock import patch
+from contextlib import redirect_stdout
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from model_parameters import TwoPolesModelParameters
+from pipeline.PipelineLog import PipelineLog, QUIET, SUMMARY, DETAILED
+from pipeline.PipelineLog import format_parameters, format_task_details, format_task_summary
+
+
+class TestPipelineLog(TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self._tmp_dir.name, 'report.txt')
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _read(self):
+        with open(self.filepath) as f:
+            return f.read()
+
+    def test_log(self):
+        log = PipelineLog('p1', self.filepath, echo=False)
+        log.log('first')
+        log.log('hidden', DETAILED)
+        with self.subTest(msg='nothing is written before a flush'):
+            self.assertFalse(os.path.exists(self.filepath))
+
+        log.flush()
+        log.log('second')
+        log.flush()
+        log.wait()
+        with self.subTest(msg='flushed'):
+            self.assertEqual(self._read(), 'Report p1:\nfirst\n\nsecond\n')
+
+        log.log('third')
+        log.close()
+        log.log('fourth')
+        log.close()
+        with self.subTest(msg='closed'):
+            self.assertEqual(self._read(), 'Report p1:\nfirst\n\nsecond\n\nthird\n\nfourth\n')
+
+    def test_log__failed_write(self):
+        log = PipelineLog('p1', self.filepath, echo=False)
+        nr_calls = [0]
+        write = log._write
+
+        def failing_first_write(text):
+            nr_calls[0] += 1
+            if nr_calls[0] == 1:
+                raise OSError('disk full')
+            write(text)
+
+        with patch.object(log, '_write', failing_first_write):
+            log.log('first')
+            log.flush()
+            log.log('second')
+            log.flush()
+            with self.subTest(msg='the error of an earlier write is not dropped by a later flush'):
+                with self.assertRaises(OSError):
+                    log.wait()
+
+            log.log('third')
+            log.flush()
+            with self.subTest(msg='the later writes are done'):
+                log.wait()
+                self.assertEqual(self._read(), '\nsecond\n\nthird\n')
+
+            log.log('fourth')
+            log.close()
+            with self.subTest(msg='closed'):
+                self.assertIsNone(log._writer)
+                self.assertIsNone(log._file)
+                self.assertEqual(self._read(), '\nsecond\n\nthird\n\nfourth\n')
+
+    def test_log__verbosity(self):
+        for verbosity, expected in [(QUIET, []), (SUMMARY, ['a']), (DETAILED, ['a', 'b'])]:
+            with self.subTest(verbosity=verbosity):
+                log = PipelineLog('p1', self.filepath, verbosity)
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    log.log('a')
+                    log.log('b', DETAILED)
+                log.close()
+                self.assertEqual(output.getvalue(), ''.join(f'Pipeline p1: {msg}\n\n' for msg in expected))
+                self.assertTrue(self._read().endswith(''.join(f'{msg}\n' for msg in expected)))
+
+    def test_format(self):
+        parameters = TwoPolesModelParameters(1.0, 0.123456789123, 1.2)
+        parameters.fix_parameters(['m_2'])
+        report = {
+            'initial_parameters': parameters.to_list(),
+            'final_parameters': parameters.to_list(),
+            'chi_squared': '1.5',
+            'covariance_matrix': np.array([[0.01, 0.0], [0.0, 0.04]]),
+            'parameter_errors': np.array([0.1, 0.2]),
+            'status': 'finished',
+            'error_message': None,
+        }
+        with self.subTest(msg='parameters'):
+            self.assertEqual(format_parameters(parameters), 'a*=1, m_1*=0.12345679, m_2=1.2')
+        with self.subTest(msg='summary'):
+            self.assertEqual(format_task_summary(report), 'status=finished, chi_squared=1.5')
+        with self.subTest(msg='details'):
+            self.assertEqual(
+                format_task_details(report),
+                'parameters: a*=1, m_1*=0.12345679, m_2=1.2; errors of the free parameters: [0.1, 0.2]',
+            )
+        with self.subTest(msg='failed task'):
+            report.update(final_parameters=None, chi_squared=None, parameter_errors=None, status='failed',
+                          error_message='Optimal parameters not found')
+            self.assertEqual(
+                format_task_summary(report), 'status=failed, chi_squared=None, error: Optimal parameters not found',
+            )
+            self.assertEqual(format_task_details(report), 'parameters: a*=1, m_1*=0.12345679, m_2=1.2')
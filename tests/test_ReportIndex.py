@@ -0,0 +1,144 @@
+from unittest import TestCase
+import os
+import sqlite3
+import tempfile
+
+from model_parameters import TwoPolesModelParameters
+from pipeline.ReportIndex import ReportIndex, INDEX_FILE_NAME
+from pipeline.ReportStore import ReportStore, REPORTS_FILE_NAME
+
+
+class TestReportIndex(TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self._tmp_dir.name
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _append_report(self, pipeline_name, round_name, parameters_class, chi_squared, free_parameters):
+        parameters = TwoPolesModelParameters(1.0, 0.7, 1.2 + float(round_name))
+        parameters.fix_all_parameters()
+        parameters.release_parameters(free_parameters)
+        report = {
+            'name': f'Task#{round_name}:TaskFullFit',
+            'parameters_class': parameters_class,
+            'initial_parameters': parameters.to_list(),
+            'final_parameters': parameters.to_list(),
+            'r2': None,
+            'chi_squared': None if chi_squared is None else str(chi_squared),
+            'covariance_matrix': None,
+            'parameter_errors': None,
+            'status': 'failed' if chi_squared is None else 'finished',
+            'error_message': None,
+            'parameter_list': [],
+        }
+        directory = os.path.join(self.root, pipeline_name)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        ReportStore(directory).append(ReportStore.make_record(pipeline_name, round_name, report))
+
+    def test_update_and_query(self):
+        self._append_report('p1', '0', 'KaonParameters', 3.0, ['a'])
+        self._append_report('p1', '1', 'KaonParameters', 1.5, ['a', 'm_1'])
+        self._append_report('p1', '2', 'KaonParameters', None, ['m_1'])
+        self._append_report('p2', '0', 'KaonParametersB', 1.0, ['m_2'])
+        self._append_report('p2', '1', 'KaonParameters', 2.0, ['m_1', 'm_2'])
+
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 5)
+
+        with self.subTest(msg='all the finished reports'):
+            self.assertEqual([r['chi_squared'] for r in index.query(top=None)], [1.0, 1.5, 2.0, 3.0])
+
+        with self.subTest(msg='model and chi-squared'):
+            results = index.query(parameters_class='KaonParameters', max_chi_squared=2.5)
+            self.assertEqual([(r['pipeline'], r['round']) for r in results], [('p1', '1'), ('p2', '1')])
+            self.assertEqual(results[0]['free_parameters'], ['a', 'm_1'])
+            self.assertEqual(results[0]['parameters'], {'a': 1.0, 'm_1': 0.7, 'm_2': 2.2})
+
+        with self.subTest(msg='top'):
+            self.assertEqual([r['chi_squared'] for r in index.query(top=2)], [1.0, 1.5])
+
+        with self.subTest(msg='free parameter'):
+            self.assertEqual([r['chi_squared'] for r in index.query(free_parameter='m_1')], [1.5, 2.0])
+            self.assertEqual(index.query(free_parameter='m'), [])
+
+        index.close()
+
+    def test_update__incremental(self):
+        self._append_report('p1', '0', 'KaonParameters', 3.0, ['a'])
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 1)
+        self.assertEqual(index.update(), 0)
+        index.close()
+
+        self._append_report('p1', '1', 'KaonParameters', 2.0, ['a'])
+        self._append_report('p2', '0', 'KaonParameters', 1.0, ['a'])
+        with open(os.path.join(self.root, 'p1', REPORTS_FILE_NAME), 'a') as f:
+            f.write('{"pipeline": "p1", "rou')  # a report being written at the moment
+
+        # the index is persistent, only the new complete reports are added
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 2)
+        self.assertEqual([r['chi_squared'] for r in index.query()], [1.0, 2.0, 3.0])
+
+        # the writer of the incomplete report was killed, the next report replaces it
+        self._append_report('p1', '2', 'KaonParameters', 0.5, ['a'])
+        self.assertEqual(index.update(), 1)
+        self.assertEqual([r['chi_squared'] for r in index.query()], [0.5, 1.0, 2.0, 3.0])
+        index.close()
+
+    def test_update__replaced_store(self):
+        for round_name, chi_squared in [('0', 10.0), ('1', 11.0), ('2', 12.0)]:
+            self._append_report('p1', round_name, 'KaonParameters', chi_squared, ['a'])
+        self._append_report('p2', '0', 'KaonParameters', 5.0, ['a'])
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 4)
+
+        # e.g. a pipeline resumed without a checkpoint starts a new store
+        os.remove(os.path.join(self.root, 'p1', REPORTS_FILE_NAME))
+        for round_name, chi_squared in [('0', 1.0), ('1', 2.0), ('2', 3.0), ('3', 4.0), ('4', 13.0)]:
+            self._append_report('p1', round_name, 'KaonParameters', chi_squared, ['a'])
+
+        self.assertEqual(index.update(), 5)
+        self.assertEqual([r['chi_squared'] for r in index.query(top=None)], [1.0, 2.0, 3.0, 4.0, 5.0, 13.0])
+        index.close()
+
+    def test_update__truncated_store(self):
+        for round_name, chi_squared in [('0', 10.0), ('1', 11.0)]:
+            self._append_report('p1', round_name, 'KaonParameters', chi_squared, ['a'])
+        store = ReportStore(os.path.join(self.root, 'p1'))
+        size = store.size()
+        self._append_report('p1', '2', 'KaonParameters', 12.0, ['a'])
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 3)
+
+        # e.g. a pipeline resumed from a checkpoint drops the reports appended after it, the store grows
+        # past the indexed position again before the next update
+        store.truncate(size)
+        for round_name, chi_squared in [('2', 2.0), ('3', 3.0)]:
+            self._append_report('p1', round_name, 'KaonParameters', chi_squared, ['a'])
+
+        self.assertEqual(index.update(), 4)
+        self.assertEqual([r['chi_squared'] for r in index.query(top=None)], [2.0, 3.0, 10.0, 11.0])
+
+        with self.subTest(msg='a store truncated below the indexed position'):
+            store.truncate(size)
+            self.assertEqual(index.update(), 2)
+            self.assertEqual([r['chi_squared'] for r in index.query(top=None)], [10.0, 11.0])
+        index.close()
+
+    def test_update__index_of_an_older_version(self):
+        self._append_report('p1', '0', 'KaonParameters', 1.0, ['a'])
+        connection = sqlite3.connect(os.path.join(self.root, INDEX_FILE_NAME))
+        connection.executescript('CREATE TABLE stores (directory TEXT PRIMARY KEY, position INTEGER NOT NULL);')
+        connection.execute('INSERT INTO stores VALUES (?, ?)', ('p1', 0))
+        connection.commit()
+        connection.close()
+
+        index = ReportIndex(self.root)
+        self.assertEqual(index.update(), 1)
+        self.assertEqual([r['chi_squared'] for r in index.query()], [1.0])
+        index.close()
@@ -0,0 +1,117 @@
+from unittest import TestCase
+import os
+import tempfile
+
+import numpy as np
+
+from model_parameters import TwoPolesModelParameters
+from pipeline.ReportStore import ReportStore, read_reports, REPORTS_FILE_NAME
+
+
+class TestReportStore(TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self._tmp_dir.name
+
+        initial_parameters = TwoPolesModelParameters(1.0, 0.7, 1.2)
+        final_parameters = TwoPolesModelParameters(1.1, 0.75, 1.2)
+        final_parameters.fix_parameters(['m_2'])
+        self.report = {
+            'name': 'Task#3:TaskFullFit',
+            'parameters_class': 'TwoPolesModelParameters',
+            'initial_parameters': initial_parameters.to_list(),
+            'final_parameters': final_parameters.to_list(),
+            'r2': '0.25',
+            'chi_squared': '1.5',
+            'covariance_matrix': np.array([[0.01, 0.002], [0.002, np.inf]]),
+            'parameter_errors': np.array([0.1, np.inf]),
+            'status': 'finished',
+            'error_message': None,
+            'parameter_list': [1.1, 0.75, 1.2],
+        }
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_make_record(self):
+        record = ReportStore.make_record('pipeline_1', '3', self.report)
+        self.assertEqual(record['pipeline'], 'pipeline_1')
+        self.assertEqual(record['round'], '3')
+        self.assertEqual(record['task'], 'Task#3:TaskFullFit')
+        self.assertEqual(record['parameters_class'], 'TwoPolesModelParameters')
+        self.assertEqual(record['chi_squared'], 1.5)
+        self.assertEqual(record['r2'], 0.25)
+        self.assertEqual(record['parameter_names'], ['a', 'm_1', 'm_2'])
+        self.assertEqual(record['initial_values'], [1.0, 0.7, 1.2])
+        self.assertEqual(record['final_values'], [1.1, 0.75, 1.2])
+        self.assertEqual(record['is_fixed'], [False, False, True])
+        self.assertEqual(record['covariance_matrix'], [[0.01, 0.002], [0.002, np.inf]])
+
+    def test_make_record__failed_task(self):
+        self.report.update(
+            final_parameters=None, r2=None, chi_squared=None, covariance_matrix=None, parameter_errors=None,
+            status='failed', error_message='Optimal parameters not found', parameter_list=[],
+        )
+        record = ReportStore.make_record('pipeline_1', '3', self.report)
+        self.assertIsNone(record['chi_squared'])
+        self.assertIsNone(record['covariance_matrix'])
+        self.assertEqual(record['final_values'], record['initial_values'])
+        self.assertEqual(record['error_message'], 'Optimal parameters not found')
+
+    def test_append_read(self):
+        directory = os.path.join(self.root, 'pipeline_1')
+        os.mkdir(directory)
+        store = ReportStore(directory)
+        self.assertEqual(store.read(), [])
+
+        records = [ReportStore.make_record('pipeline_1', str(i), self.report) for i in range(3)]
+        for record in records:
+            store.append(record)
+        with self.subTest(msg='round trip'):
+            self.assertEqual(ReportStore(directory).read(), records)
+
+        with self.subTest(msg='an incomplete last line is skipped'):
+            with open(os.path.join(directory, REPORTS_FILE_NAME), 'a') as f:
+                f.write('{"pipeline": "pipeline_1", "rou')
+            self.assertEqual(ReportStore(directory).read(), records)
+
+        with self.subTest(msg='a record appended after an incomplete last line'):
+            record = ReportStore.make_record('pipeline_1', '3', self.report)
+            store.append(record)
+            self.assertEqual(ReportStore(directory).read(), records + [record])
+
+        with self.subTest(msg='an incomplete only line'):
+            other_directory = os.path.join(self.root, 'pipeline_2')
+            os.mkdir(other_directory)
+            with open(os.path.join(other_directory, REPORTS_FILE_NAME), 'w') as f:
+                f.write('{"pipeline": "pipeline_2", "rou')
+            ReportStore(other_directory).append(record)
+            self.assertEqual(ReportStore(other_directory).read(), [record])
+
+    def test_truncate(self):
+        store = ReportStore(self.root)
+        self.assertEqual(store.size(), 0)
+        records = [ReportStore.make_record('pipeline_1', str(i), self.report) for i in range(3)]
+        store.append(records[0])
+        size = store.size()
+        store.append(records[1])
+        store.append(records[2])
+
+        store.truncate(size)
+        self.assertEqual(store.read(), records[:1])
+        store.truncate(10 * size)  # nothing to drop
+        self.assertEqual(store.read(), records[:1])
+
+    def test_read_reports(self):
+        for name, nr_records in [('pipeline_2', 2), ('pipeline_1', 3), ('empty', 0)]:
+            directory = os.path.join(self.root, name)
+            os.mkdir(directory)
+            for i in range(nr_records):
+                ReportStore(directory).append(ReportStore.make_record(name, str(i), self.report))
+
+        records = read_reports(self.root)
+        self.assertEqual(
+            [(r['pipeline'], r['round']) for r in records],
+            [('pipeline_1', '0'), ('pipeline_1', '1'), ('pipeline_1', '2'), ('pipeline_2', '0'), ('pipeline_2', '1')],
+        )
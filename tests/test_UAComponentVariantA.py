@@ -1,6 +1,9 @@
 from unittest import TestCase
 import cmath
 
+import numpy as np
+
+from ua_model.functions import asymptotic_factor
 from ua_model.ua_components.UAComponentVariantA import UAComponentVariantA
 
 
@@ -20,3 +23,26 @@ class TestUAComponentVariantA(TestCase):
                 actual = component(case['w'])
                 expected = case['expected_value']
                 self.assertTrue(cmath.isclose(actual, expected))
+
+    def test_evaluate_array(self):
+        component = UAComponentVariantA(w_n=2, w_meson=3 + 1j)
+
+        ws = np.array([0.0, 1.0, 1j, 2.1 - 4.3j, -0.5 + 0.2j, -0.999 - 0.01j, 0.3j])
+        actual_values = component.evaluate_array(ws)
+
+        self.assertEqual(actual_values.shape, ws.shape)
+        for w, actual in zip(ws, actual_values):
+            with self.subTest(w=w):
+                self.assertTrue(cmath.isclose(actual, component(w), abs_tol=1e-15))
+
+    def test_eval_resonant_factor(self):
+        component = UAComponentVariantA(w_n=-0.3 + 0.1j, w_meson=-0.4 + 0.8j)
+
+        with self.subTest(msg='normalization at w_n'):
+            self.assertEqual(component.eval_resonant_factor(-0.3 + 0.1j), 1.0)
+
+        for w in [0.0, 1j, 2.1 - 4.3j, -0.5 + 0.2j, -0.999 - 0.01j]:
+            with self.subTest(w=w):
+                expected = component(w)
+                actual = asymptotic_factor(w) / asymptotic_factor(-0.3 + 0.1j) * component.eval_resonant_factor(w)
+                self.assertTrue(cmath.isclose(actual, expected, abs_tol=1e-15))
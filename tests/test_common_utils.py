@@ -1,9 +1,20 @@
 from unittest import TestCase
 import cmath
 
-from common.utils import function_cross_section
+import numpy as np
+
+from configparser import ConfigParser
+
+from common.utils import (function_cross_section, CrossSectionEvaluationPlan, _get_ff_model,
+                          make_partial_cross_section_for_parameters, make_partial_cross_section_jacobian_for_parameters,
+                          function_form_factor, function_form_factor_jacobian, solve_linear_couplings,
+                          make_partial_form_factor_with_linear_couplings_for_parameters, _eval_at_distinct_ts)
+from cross_section.NucleonPairToElectronPositronTotalCrossSection import NucleonPairToElectronPositronTotalCrossSection
+from cross_section.ScalarMesonProductionTotalCrossSection import ScalarMesonProductionTotalCrossSection
 from kaon_production.data import KaonDatapoint
-from model_parameters import KaonParameters, KaonParametersSimplified
+from model_parameters import KaonParameters, KaonParametersSimplified, NucleonParameters, TwoPolesModelParameters
+from nucleon_production.data import NucleonDatapoint
+from other_models import TwoPolesModel
 
 # TODO: extend!
 
@@ -154,3 +165,399 @@ class TestCommonUtils(TestCase):
         for t, actual, expected in zip(ts, actual_values, expected_values):
             with self.subTest(msg=f't={t}'):
                 self.assertTrue(cmath.isclose(actual, expected, abs_tol=1e-15))
+
+    def test_cross_section_evaluation_plan__repeated_evaluations(self):
+
+        ts = [
+            KaonDatapoint(t=1.1230, is_charged=True),
+            KaonDatapoint(t=1.1230 + 0.73200j, is_charged=False),
+            (0.73200j, 1.0),
+            (2.4, 0.0),
+            KaonDatapoint(t=0.5 - 0.1j, is_charged=True),
+        ]
+        kaon_mass = 0.493677
+        alpha = 0.0072973525693
+        hc_squared = 389379.3721
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+
+        config = ConfigParser()
+        config['constants'] = {'alpha': str(alpha), 'hc_squared': str(hc_squared)}
+
+        plan = CrossSectionEvaluationPlan(ts, kaon_mass, alpha, hc_squared)
+        for a_omega, mass_phi_prime, t_in_isovector in [(0.1, 1.68, 0.59), (-0.3, 1.7, 2.1), (0.0, 1.6, 0.8)]:
+            parameters.set_value('a_omega', a_omega)
+            parameters.set_value('mass_phi_prime', mass_phi_prime)
+            parameters.set_value('t_in_isovector', t_in_isovector)
+
+            model = _get_ff_model(parameters)
+            cross_section = ScalarMesonProductionTotalCrossSection(kaon_mass, model, config)
+            actual_values = plan.evaluate(model)
+            for datapoint, actual in zip(ts, actual_values):
+                with self.subTest(msg=f'a_omega={a_omega}, t={datapoint[0]}'):
+                    model.charged_variant = bool(datapoint[1])
+                    expected = abs(cross_section(datapoint[0]))
+                    self.assertTrue(cmath.isclose(actual, expected, rel_tol=1e-12))
+
+        with self.subTest(msg='W-plane cache'):
+            # one pair of branch points for the isoscalar channel, three for the isovector channel
+            self.assertEqual(len(plan._w_cache), 4)
+
+        with self.subTest(msg='components cache'):
+            # isoscalar: five fixed resonances and three values of mass_phi_prime,
+            # isovector: four resonances for each of the three values of t_in_isovector
+            self.assertEqual(len(plan._component_cache), 5 + 3 + 4 * 3)
+
+            # a change of the couplings reuses the cached contributions
+            parameters.set_value('a_phi', 0.25)
+            parameters.set_value('a_rho_prime', -0.1)
+            model = _get_ff_model(parameters)
+            cross_section = ScalarMesonProductionTotalCrossSection(kaon_mass, model, config)
+            actual_values = plan.evaluate(model)
+            self.assertEqual(len(plan._component_cache), 5 + 3 + 4 * 3)
+            for datapoint, actual in zip(ts, actual_values):
+                model.charged_variant = bool(datapoint[1])
+                self.assertTrue(cmath.isclose(actual, abs(cross_section(datapoint[0])), rel_tol=1e-12))
+
+    def test_function_cross_section__with_nucleon_parameters(self):
+        nucleon_mass = 0.938272
+        alpha = 0.0072973525693
+        hc_squared = 389379.3721
+        parameters = NucleonParameters(
+            nucleon_mass, 2.792847351, -1.91304273,
+            0.17531904388276887, 0.07791957505900839, 0.9001581776629138, 2.713739494786232,
+            0.17531904388276887, 0.07791957505900839, 1.0512202460515163, 4.176812892690669,
+            1.3200505056850964, -0.32774864723704805, 0.78266, 0.00868,
+            0.11215926509622014, 1.41, 0.29,
+            1.67, 0.315,
+            -1.013845791442124, 0.07195092152400877, 1.019461, 0.004249,
+            0.26717864421535276, 0.349116996120233, 1.68, 0.15,
+            2.159, 0.137,
+            0.06479104707666819, 0.77526, 0.1474,
+            1.465, 0.4,
+            1.72, 0.25,
+        )
+        # the proton and the neutron datapoints share some values of t
+        ts = [
+            NucleonDatapoint(t=3.6, proton=True, electric=False),
+            NucleonDatapoint(t=3.6, proton=False, electric=False),
+            NucleonDatapoint(t=4.2 + 0.1j, proton=True, electric=False),
+            (5.5, 0.0, 0.0),
+            (3.6, 1.0, 0.0),
+        ]
+        config = ConfigParser()
+        config['constants'] = {'alpha': str(alpha), 'hc_squared': str(hc_squared)}
+
+        def eval_form_factor(model, t, proton, electric):
+            model.proton = proton
+            model.electric = electric
+            return model(t)
+
+        model = _get_ff_model(parameters)
+        cross_section = NucleonPairToElectronPositronTotalCrossSection(nucleon_mass, model, config)
+        actual_values = function_cross_section(ts, nucleon_mass, alpha, hc_squared, parameters)
+        for datapoint, actual in zip(ts, actual_values):
+            t, proton = complex(datapoint[0]), bool(datapoint[1])
+            with self.subTest(msg=f't={t}, proton={proton}'):
+                # the cross-section evaluated from the form factors of the model, one at a time
+                expected = cross_section.eval_from_form_factors(
+                    t, eval_form_factor(model, t, proton, True), eval_form_factor(model, t, proton, False),
+                )
+                self.assertTrue(cmath.isclose(actual, abs(expected), rel_tol=1e-12))
+
+        with self.subTest(msg='form factors'):
+            ts_form_factors = [NucleonDatapoint(t, proton, electric)
+                               for t in [0.0, 3.6, 10.0] for proton in [True, False] for electric in [True, False]]
+            actual_values = function_form_factor(ts_form_factors, parameters)
+            for datapoint, actual in zip(ts_form_factors, actual_values):
+                expected = abs(eval_form_factor(model, datapoint.t, datapoint.proton, datapoint.electric))
+                self.assertTrue(cmath.isclose(actual, expected, rel_tol=1e-12, abs_tol=1e-15))
+
+    def test_cross_section_evaluation_plan__repeated_evaluations_with_nucleon_parameters(self):
+        nucleon_mass = 0.938272
+        alpha = 0.0072973525693
+        hc_squared = 389379.3721
+        parameters = NucleonParameters(
+            nucleon_mass, 2.792847351, -1.91304273,
+            0.17531904388276887, 0.07791957505900839, 0.9001581776629138, 2.713739494786232,
+            0.17531904388276887, 0.07791957505900839, 1.0512202460515163, 4.176812892690669,
+            1.3200505056850964, -0.32774864723704805, 0.78266, 0.00868,
+            0.11215926509622014, 1.41, 0.29,
+            1.67, 0.315,
+            -1.013845791442124, 0.07195092152400877, 1.019461, 0.004249,
+            0.26717864421535276, 0.349116996120233, 1.68, 0.15,
+            2.159, 0.137,
+            0.06479104707666819, 0.77526, 0.1474,
+            1.465, 0.4,
+            1.72, 0.25,
+        )
+        ts = [
+            NucleonDatapoint(t=3.6, proton=True, electric=False),
+            NucleonDatapoint(t=3.6, proton=False, electric=False),
+            NucleonDatapoint(t=4.2 + 0.1j, proton=True, electric=False),
+            (5.5, 0.0, 0.0),
+        ]
+        config = ConfigParser()
+        config['constants'] = {'alpha': str(alpha), 'hc_squared': str(hc_squared)}
+
+        def check_values(plan):
+            model = _get_ff_model(parameters)
+            cross_section = NucleonPairToElectronPositronTotalCrossSection(nucleon_mass, model, config)
+            actual_values = plan.evaluate(model)
+            for datapoint, actual in zip(ts, actual_values):
+                model.proton = bool(datapoint[1])
+                expected = abs(cross_section(complex(datapoint[0])))
+                self.assertTrue(cmath.isclose(actual, expected, rel_tol=1e-12))
+
+        plan = CrossSectionEvaluationPlan(ts, nucleon_mass, alpha, hc_squared)
+        for a_dirac_omega, mass_phi_prime in [(1.32, 1.68), (0.8, 1.7), (-0.5, 1.6)]:
+            parameters.set_value('a_dirac_omega', a_dirac_omega)
+            parameters.set_value('mass_phi_prime', mass_phi_prime)
+            with self.subTest(msg=f'a_dirac_omega={a_dirac_omega}, mass_phi_prime={mass_phi_prime}'):
+                check_values(plan)
+
+        with self.subTest(msg='channels cache'):
+            # the isoscalar channels for each of the three values of mass_phi_prime, the fixed isovector channels
+            self.assertEqual(len(plan._nucleon_channel_cache), 2 * 3 + 2)
+
+            # a change of the couplings reuses the cached terms
+            for name, value in [('a_dirac_phi', -0.7), ('a_pauli_omega', 0.1), ('a_dirac_rho', 0.2)]:
+                parameters.set_value(name, value)
+            check_values(plan)
+            self.assertEqual(len(plan._nucleon_channel_cache), 2 * 3 + 2)
+
+    def test_make_partial_cross_section_jacobian_for_parameters(self):
+
+        ts = np.array([(1.1230, 1.0), (1.25 + 0.1j, 0.0), (1.5, 0.0), (2.4, 1.0), (4.2, 1.0)])
+        kaon_mass = 0.493677
+        alpha = 0.0072973525693
+        hc_squared = 389379.3721
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        parameters.release_all_parameters()
+        parameters.fix_parameters(['mass_omega', 'a_rho_prime', 'decay_rate_phi'])
+
+        partial_f = make_partial_cross_section_for_parameters(kaon_mass, alpha, hc_squared, parameters)
+        partial_jac = make_partial_cross_section_jacobian_for_parameters(kaon_mass, alpha, hc_squared, parameters)
+
+        free_values = np.array(parameters.get_free_values())
+        jacobian = partial_jac(ts, *free_values)
+        self.assertEqual(jacobian.shape, (len(ts), len(free_values)))
+
+        h = 1e-6
+        for column, name in enumerate([p.name for p in parameters if not p.is_fixed]):
+            shift = np.zeros(len(free_values))
+            shift[column] = h
+            expected = (partial_f(ts, *(free_values + shift)) - partial_f(ts, *(free_values - shift))) / (2 * h)
+            with self.subTest(parameter=name):
+                self.assertTrue(np.allclose(jacobian[:, column], expected, rtol=1e-5, atol=1e-6))
+
+    def test_solve_linear_couplings(self):
+
+        ts = [
+            KaonDatapoint(t=t, is_charged=is_charged)
+            for t in np.linspace(1.0, 4.0, 15) for is_charged in [True, False]
+        ]
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        coupling_names = [p.name for p in parameters if p.name[:2] == 'a_']
+        expected_couplings = [parameters[name].value for name in coupling_names]
+        ys = function_form_factor(ts, parameters)
+        errors = [0.01] * len(ts)
+
+        for name in coupling_names:
+            parameters.set_value(name, parameters[name].value + 0.01)
+        solve_linear_couplings(ts, ys, errors, parameters, coupling_names)
+
+        for name, expected in zip(coupling_names, expected_couplings):
+            with self.subTest(coupling=name):
+                self.assertTrue(cmath.isclose(parameters[name].value, expected, abs_tol=1e-8))
+
+    def test_make_partial_form_factor_with_linear_couplings_for_parameters(self):
+
+        ts = [
+            KaonDatapoint(t=t, is_charged=is_charged)
+            for t in np.linspace(1.0, 4.0, 15) for is_charged in [True, False]
+        ]
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        # the data are given by the parameters, the couplings solved for at the point of the test are theirs
+        # and the projected Jacobian is the exact Jacobian of partial_f there
+        ys = function_form_factor(ts, parameters)
+        errors = [0.01] * len(ts)
+        coupling_names = [p.name for p in parameters if p.name[:2] == 'a_']
+        parameters.fix_all_parameters()
+        parameters.release_parameters(['t_in_isovector', 'mass_phi_prime', 'decay_rate_rho_prime'])
+
+        partial_f, partial_jac = make_partial_form_factor_with_linear_couplings_for_parameters(
+            parameters, coupling_names, ts, ys, errors,
+        )
+        free_values = np.array(parameters.get_free_values())
+        jacobian = partial_jac(ts, *free_values)
+        self.assertEqual(jacobian.shape, (len(ts), len(free_values)))
+
+        with self.subTest(msg='values'):
+            self.assertTrue(np.allclose(partial_f(ts, *free_values), ys, rtol=1e-8))
+
+        h = 1e-5
+        for column, name in enumerate([p.name for p in parameters if not p.is_fixed]):
+            shift = np.zeros(len(free_values))
+            shift[column] = h
+            expected = (partial_f(ts, *(free_values + shift)) - partial_f(ts, *(free_values - shift))) / (2 * h)
+            with self.subTest(parameter=name):
+                self.assertTrue(np.allclose(jacobian[:, column], expected, rtol=1e-4, atol=1e-6))
+
+    def test_function_form_factor__with_kaon_parameters(self):
+
+        # the charged and the neutral datapoints share some values of t
+        ts = [
+            KaonDatapoint(t=1.1230, is_charged=True),
+            KaonDatapoint(t=1.1230, is_charged=False),
+            (2.4 + 0.1j, 0.0),
+            KaonDatapoint(t=0.5, is_charged=True),
+            (1.1230, 1.0),
+            (0.5, 0.0),
+        ]
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        parameter_names = [p.name for p in parameters if not p.is_fixed]
+
+        actual_values = function_form_factor(ts, parameters)
+        actual_jacobian = function_form_factor_jacobian(ts, parameters)
+        model = _get_ff_model(parameters)
+        for row, datapoint in enumerate(ts):
+            t, is_charged = complex(datapoint[0]), bool(datapoint[1])
+            with self.subTest(msg=f't={t}, is_charged={is_charged}'):
+                # the form factor evaluated by the model, one variant and one datapoint at a time
+                model.charged_variant = is_charged
+                value, jacobian = model.evaluate_array_with_jacobian(np.array([t]), parameter_names)
+                self.assertTrue(cmath.isclose(actual_values[row], abs(model(t)), rel_tol=1e-12))
+                expected_jacobian = np.real(np.conj(value[0]) * jacobian[0]) / abs(value[0])
+                self.assertTrue(np.allclose(actual_jacobian[row], expected_jacobian, rtol=1e-12, atol=1e-12))
+
+    def test__eval_at_distinct_ts(self):
+        t_values = np.array([2.0, 1.0, 2.0, 3.0 + 0.5j, 1.0])
+        evaluated = []
+
+        def evaluate(ts):
+            evaluated.append(ts)
+            return ts ** 2, (ts + 1, np.column_stack([ts, -ts]))
+
+        squares, (shifted, columns) = _eval_at_distinct_ts(evaluate, t_values)
+        self.assertEqual(len(evaluated), 1)
+        self.assertEqual(sorted(evaluated[0], key=lambda t: (t.real, t.imag)), [1.0, 2.0, 3.0 + 0.5j])
+        self.assertTrue(np.array_equal(squares, t_values ** 2))
+        self.assertTrue(np.array_equal(shifted, t_values + 1))
+        self.assertTrue(np.array_equal(columns, np.column_stack([t_values, -t_values])))
+
+    def test_function_cross_section__with_two_poles_parameters(self):
+        parameters = TwoPolesModelParameters(1.2, 0.7, 1.1)
+        # the proton and the neutron datapoints share some values of t
+        ts = [
+            NucleonDatapoint(t=3.6, proton=True, electric=False),
+            NucleonDatapoint(t=3.6, proton=False, electric=False),
+            (5.5, 1.0, 0.0),
+            (4.2 + 0.1j, 0.0, 1.0),
+            (5.5, 0.0, 0.0),
+        ]
+        model = TwoPolesModel(1.2, 0.7, 1.1)
+        expected_values = [abs(model(complex(datapoint[0]))) for datapoint in ts]
+
+        with self.subTest(msg='cross-section'):
+            actual_values = function_cross_section(ts, 0.938272, 0.0072973525693, 389379.3721, parameters)
+            self.assertTrue(np.allclose(actual_values, expected_values, rtol=1e-14))
+
+        with self.subTest(msg='form factors'):
+            self.assertTrue(np.allclose(function_form_factor(ts, parameters), expected_values, rtol=1e-14))
+
+        with self.subTest(msg='evaluation plan'):
+            plan = CrossSectionEvaluationPlan(ts, 0.938272, 0.0072973525693, 389379.3721)
+            self.assertTrue(np.allclose(plan.evaluate(model), expected_values, rtol=1e-14))
+
+        with self.subTest(msg='unknown model'):
+            with self.assertRaises(TypeError):
+                plan.evaluate(lambda t: t)
+
+    def test__get_ff_model__cache(self):
+
+        parameters = KaonParameters(
+            0.17, 0.078, 1.35, 0.59,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        model = _get_ff_model(parameters)
+        model.charged_variant = False
+
+        with self.subTest(msg='the same values give the same model with reset flags'):
+            cached_model = _get_ff_model(parameters.copy())
+            self.assertIs(cached_model, model)
+            self.assertTrue(cached_model.charged_variant)
+
+        with self.subTest(msg='different values give a different model'):
+            parameters.set_value('mass_phi', 1.02)
+            other_model = _get_ff_model(parameters)
+            self.assertIsNot(other_model, model)
+            self.assertEqual(other_model.mass_phi, 1.02)
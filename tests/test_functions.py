@@ -1,7 +1,9 @@
 import cmath
 from unittest import TestCase
 
-from ua_model.functions import z_minus_its_reciprocal, square_root
+import numpy as np
+
+from ua_model.functions import z_minus_its_reciprocal, square_root, square_root_array
 
 
 class TestFunctions(TestCase):
@@ -57,3 +59,16 @@ class TestFunctions(TestCase):
             with self.subTest(case=case):
                 actual = square_root(case['argument'])
                 self.assertTrue(cmath.isclose(actual, case['expected_value']))
+
+    def test_square_root_array(self):
+        """Test that the vectorized square root uses the same branch as 'square_root'"""
+
+        arguments = [1, -1, 1j, -1j, 4, 534, -3 - 4j, 10000 - 0.000000001j, -9j, 0, 2.5 + 0j, 2.5 - 0j,
+                     -2.5 + 0j, complex(-2.5, -0.0), 0.001 - 71.2j, -81.3 + 0.4j]
+
+        actual_values = square_root_array(np.array(arguments))
+
+        self.assertEqual(actual_values.shape, (len(arguments),))
+        for argument, actual in zip(arguments, actual_values):
+            with self.subTest(argument=argument):
+                self.assertTrue(cmath.isclose(actual, square_root(argument), abs_tol=1e-15))
@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from scipy.optimize import curve_fit
+
+from common.utils import function_form_factor
+from kaon_production.data import KaonDatapoint
+from model_parameters import KaonParameters
+from task.kaon_form_factor_tasks import TaskFullFit, TaskFullFitLinearCouplings
+
+
+class TestKaonFormFactorTasks(TestCase):
+
+    def setUp(self):
+        # Note: the branch points t_in are away from the squared masses of the resonances (a component
+        # of the model changes its variant at t_in = mass^2, a fit may get stuck there)
+        self.parameters = KaonParameters(
+            0.17531904388276887, 0.07791957505900839, 1.35, 0.9,
+            0.1, 0.78266, 0.00868,
+            0.2, 1.410, 0.29,
+            0.15, 1.67, 0.315,
+            0.3, 1.019461, 0.004249,
+            0.35, 1.680, 0.150,
+            2.159, 0.137,
+            0.12, 0.77526, 0.1474,
+            0.13, 1.465, 0.4,
+            0.14, 1.720, 0.25,
+            2.15, 0.3,
+        )
+        # synthetic data given by known couplings
+        self.ts = [
+            KaonDatapoint(t=t, is_charged=is_charged)
+            for t in np.linspace(1.0, 4.5, 20) for is_charged in [True, False]
+        ]
+        self.ffs = list(function_form_factor(self.ts, self.parameters))
+        self.errors = [0.05 * ff for ff in self.ffs]
+
+        # the fits start from other couplings and resonances
+        for name, factor in [('a_omega', 1.5), ('a_phi', 0.7), ('a_rho', 1.3), ('a_rho_prime', 0.6),
+                             ('mass_phi_prime', 1.02), ('decay_rate_rho_prime', 0.9)]:
+            self.parameters.set_value(name, self.parameters[name].value * factor)
+
+    def _run_task(self, task_class):
+        task = task_class(
+            task_class.__name__, self.parameters.copy(), self.ts, self.ffs, self.errors,
+            plot=False, use_handpicked_bounds=False,
+        )
+        task.run()
+        return task.report
+
+    def test_full_fit_linear_couplings(self):
+        report = self._run_task(TaskFullFitLinearCouplings)
+        reference_report = self._run_task(TaskFullFit)
+
+        with self.subTest(msg='status'):
+            self.assertEqual(report['status'], 'finished')
+            self.assertEqual(reference_report['status'], 'finished')
+
+        with self.subTest(msg='chi-squared is not worse than the one of TaskFullFit'):
+            self.assertLessEqual(float(report['chi_squared']), float(reference_report['chi_squared']) + 1e-6)
+
+    def test_full_fit_linear_couplings__failed_first_stage(self):
+        nr_calls = [0]
+
+        def failing_first_curve_fit(*args, **kwargs):
+            nr_calls[0] += 1
+            if nr_calls[0] == 1:
+                raise RuntimeError('Optimal parameters not found')
+            return curve_fit(*args, **kwargs)
+
+        with patch('task.Task.curve_fit', failing_first_curve_fit):
+            report = self._run_task(TaskFullFitLinearCouplings)
+
+        # the second stage starts from the initial parameters, its report is the report of the task
+        self.assertEqual(nr_calls[0], 2)
+        self.assertEqual(report['status'], 'finished')
+        self.assertIsNone(report['error_message'])
@@ -0,0 +1,29 @@
+from unittest import TestCase
+from multiprocessing import Pool
+import os
+import subprocess
+import sys
+
+from plotting.plot_fit import _get_pyplot
+
+
+def _get_backend_in_worker():
+    return _get_pyplot().get_backend().lower()
+
+
+class TestPlotFit(TestCase):
+
+    def test_matplotlib_is_not_imported_by_the_fitting_code(self):
+        code = (
+            'import sys\n'
+            'import pipeline.MultiStartRunner, pipeline.KaonCrossSectionIterativePipeline, '
+            'pipeline.NucleonCrossSectionIterativePipeline\n'
+            "print('matplotlib' in sys.modules)\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+
+    def test_headless_backend_in_workers(self):
+        with Pool(processes=1) as pool:
+            self.assertEqual(pool.apply(_get_backend_in_worker), 'agg')
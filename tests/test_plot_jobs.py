@@ -0,0 +1,39 @@
+from unittest import TestCase
+import os
+import tempfile
+
+from plotting.plot_jobs import PlotJob, render_plot_jobs
+
+
+def _write_file(directory, name, content=''):
+    with open(os.path.join(directory, name), 'w') as f:
+        f.write(f'{content}:{os.getpid()}')
+
+
+class TestPlotJobs(TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self._tmp_dir.name
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _read(self, name):
+        with open(os.path.join(self.directory, name)) as f:
+            return f.read().split(':')
+
+    def test_render(self):
+        PlotJob(_write_file, (self.directory, 'plot.png'), {'content': 'fit'}).render()
+        self.assertEqual(self._read('plot.png'), ['fit', str(os.getpid())])
+
+    def test_render_plot_jobs(self):
+        names = [f'plot_{i}.png' for i in range(4)]
+        for nr_workers in [1, 2]:
+            with self.subTest(nr_workers=nr_workers):
+                render_plot_jobs([PlotJob(_write_file, (self.directory, name), {}) for name in names], nr_workers)
+                pids = {self._read(name)[1] for name in names}
+                if nr_workers == 1:
+                    self.assertEqual(pids, {str(os.getpid())})
+                else:
+                    self.assertNotIn(str(os.getpid()), pids)
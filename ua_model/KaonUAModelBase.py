@@ -0,0 +1,359 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from ua_model.ua_components.UAComponent import UAComponent
+from ua_model.ua_components.UAComponentVariantA import UAComponentVariantA
+from ua_model.ua_components.UAComponentVariantB import UAComponentVariantB
+from ua_model.MapFromTtoW import MapFromTtoW
+from ua_model.functions import asymptotic_factor
+from ua_model.derivatives import eval_kaon_channels_with_jacobian, eval_kaon_model_with_jacobian
+
+
+class KaonUAModelBase:
+    """
+    The common implementation of the U&A models for the charged or neutral kaon form factors.
+
+    A variant of the model is specified by the class attributes:
+        ISOSCALAR_RESONANCES, ISOVECTOR_RESONANCES: the resonances of the channels; the coupling constant
+            of the last resonance of a channel is not a free parameter
+        NORMALIZATION: the sum of the coupling constants of a channel (it fixes the last coupling constant)
+
+    The form factor of the charged kaons is the sum of the isoscalar and the isovector contribution, the form factor
+    of the neutral kaons is their difference. The parameters of a variant (passed to the initialization as keyword
+    arguments) are listed by 'get_parameter_names'.
+
+    For each channel the model precomputes (see '_compile_channel') the coefficients of the resonant factors of all
+    its components, so that the contribution of the channel is evaluated at once for all the components.
+
+    """
+    ISOSCALAR_RESONANCES: Tuple[str, ...] = ()
+    ISOVECTOR_RESONANCES: Tuple[str, ...] = ()
+    NORMALIZATION = 0.5
+
+    def __init__(self, charged_variant: bool, **parameters: float) -> None:
+        parameter_names = self.get_parameter_names()
+        missing = [name for name in parameter_names if name not in parameters]
+        if missing:
+            raise TypeError(f'{type(self).__name__} missing parameters: {", ".join(missing)}')
+        unknown = [name for name in parameters if name not in parameter_names]
+        if unknown:
+            raise TypeError(f'{type(self).__name__} got unexpected parameters: {", ".join(unknown)}')
+
+        self.charged_variant = charged_variant
+        for name in parameter_names:
+            self.__setattr__(name, parameters[name])
+
+        for channel, resonances in self._get_channels():
+            self._set_last_coupling(resonances)
+
+            t_to_w = MapFromTtoW(
+                t_0=self.__getattribute__('t_0_' + channel), t_in=self.__getattribute__('t_in_' + channel),
+            )
+            self.__setattr__('_t_to_W_' + channel, t_to_w)
+            # the asymptotic factor, including its normalization, is shared by all the components of a channel
+            self.__setattr__('_asymptotic_factor_denominator_' + channel, asymptotic_factor(t_to_w(0)))
+
+            # The construction below is perhaps a bit unfortunate, but it seems to me
+            # less error-prone than explicitly repeating the same code section for each resonance.
+            for name in resonances:
+                self._set_component(channel, name)
+            self._compile_channel(channel, resonances)
+
+    @classmethod
+    def get_parameter_names(cls) -> List[str]:
+        """
+        Return the names of the parameters of the model (the keyword arguments of the initialization).
+
+        """
+        names = ['t_0_isoscalar', 't_in_isoscalar', 't_0_isovector', 't_in_isovector']
+        for resonances in (cls.ISOSCALAR_RESONANCES, cls.ISOVECTOR_RESONANCES):
+            names.extend('a_' + name for name in resonances[:-1])
+        for resonances in (cls.ISOSCALAR_RESONANCES, cls.ISOVECTOR_RESONANCES):
+            for name in resonances:
+                names.extend(['mass_' + name, 'decay_rate_' + name])
+        return names
+
+    def update_parameters(self, **parameters: float) -> None:
+        """
+        Change the values of some of the parameters in place.
+
+        Only the parts of the model that depend on the changed parameters are rebuilt. If a branch point
+        of a channel changes, the map from t to W and all the components of the channel are rebuilt. Otherwise,
+        only the components whose mass or decay rate has changed are rebuilt. A change of the coupling constants
+        rebuilds no component, it only updates the (dependent) coupling constant of the last resonance.
+
+        The components and the maps are replaced, never modified. Hence, a shallow copy (copy.copy) of a model
+        may be updated without affecting the original.
+
+        Args:
+            **parameters: the new values of the parameters, named as in the initialization (except charged_variant)
+
+        """
+        parameter_names = set(self.get_parameter_names())
+        changed = set()
+        for name, value in parameters.items():
+            if name not in parameter_names:
+                raise ValueError(f'Unknown parameter: {name}')
+            if self.__getattribute__(name) != value:
+                self.__setattr__(name, value)
+                changed.add(name)
+
+        for channel, resonances in self._get_channels():
+            couplings_changed = any('a_' + name in changed for name in resonances[:-1])
+            if couplings_changed:
+                self._set_last_coupling(resonances)
+
+            if 't_0_' + channel in changed or 't_in_' + channel in changed:
+                t_to_w = MapFromTtoW(
+                    t_0=self.__getattribute__('t_0_' + channel), t_in=self.__getattribute__('t_in_' + channel),
+                )
+                self.__setattr__('_t_to_W_' + channel, t_to_w)
+                self.__setattr__('_asymptotic_factor_denominator_' + channel, asymptotic_factor(t_to_w(0)))
+                rebuilt_resonances = resonances
+            else:
+                rebuilt_resonances = [
+                    name for name in resonances if 'mass_' + name in changed or 'decay_rate_' + name in changed
+                ]
+            for name in rebuilt_resonances:
+                self._set_component(channel, name)
+            if couplings_changed or rebuilt_resonances:
+                self._compile_channel(channel, resonances)
+
+    def __call__(self, t: complex) -> complex:
+        if t.real < 0:
+            raise ValueError('t must have a positive real part!')
+
+        return self.evaluate_array_in_w(self._t_to_W_isoscalar(t), self._t_to_W_isovector(t))
+
+    def evaluate_array(self, ts: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the form factor at each element of an array of values of t.
+
+        This is the vectorized counterpart of '__call__'.
+
+        Args:
+            ts (np.ndarray): an array of complex numbers with non-negative real parts
+
+        Returns:
+            np.ndarray: a complex array of the same shape as ts
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        if np.any(ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+
+        return self.evaluate_array_in_w(
+            self._t_to_W_isoscalar.evaluate_array(ts),
+            self._t_to_W_isovector.evaluate_array(ts),
+        )
+
+    def evaluate_array_with_jacobian(self, ts: np.ndarray, parameter_names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the form factor and its derivatives with respect to the given parameters at an array of values of t.
+
+        Args:
+            ts (np.ndarray): an array of complex numbers with non-negative real parts
+            parameter_names (list): names of the parameters (as in the initialization) w.r.t. which we differentiate
+
+        Returns:
+            tuple: the complex array of the values (the same as 'evaluate_array' returns)
+                and the complex Jacobian of the shape (len(ts), len(parameter_names))
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        if np.any(ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+
+        return eval_kaon_model_with_jacobian(
+            self,
+            self._t_to_W_isoscalar.evaluate_array(ts),
+            self._t_to_W_isovector.evaluate_array(ts),
+            self._t_to_W_isoscalar.evaluate_derivatives_array(ts)[1:],
+            self._t_to_W_isovector.evaluate_derivatives_array(ts)[1:],
+            parameter_names,
+        )
+
+    def eval_contributions(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the contributions of the isoscalar and the isovector channel at an array of values of t.
+
+        The contributions do not depend on the variant (charged_variant) of the model, the form factors of both
+        the charged and the neutral kaons are their combinations (see 'combine_contributions').
+
+        Args:
+            ts (np.ndarray): an array of complex numbers with non-negative real parts
+
+        Returns:
+            tuple: the complex arrays of the isoscalar and of the isovector contribution (of the same shape as ts)
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        if np.any(ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+
+        return (
+            self.eval_channel_contribution('isoscalar', self._t_to_W_isoscalar.evaluate_array(ts)),
+            self.eval_channel_contribution('isovector', self._t_to_W_isovector.evaluate_array(ts)),
+        )
+
+    def eval_contributions_with_jacobian(
+            self,
+            ts: np.ndarray,
+            parameter_names: List[str],
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+        """
+        Evaluate the contributions of the channels (see 'eval_contributions') together with their derivatives
+        with respect to the given parameters.
+
+        Returns:
+            tuple: the pairs (values, Jacobian) of the isoscalar and of the isovector contribution,
+                the Jacobians are of the shape (len(ts), len(parameter_names))
+
+        """
+        ts = np.asarray(ts, dtype=complex)
+        if np.any(ts.real < 0):
+            raise ValueError('t must have a positive real part!')
+
+        return eval_kaon_channels_with_jacobian(
+            self,
+            self._t_to_W_isoscalar.evaluate_array(ts),
+            self._t_to_W_isovector.evaluate_array(ts),
+            self._t_to_W_isoscalar.evaluate_derivatives_array(ts)[1:],
+            self._t_to_W_isovector.evaluate_derivatives_array(ts)[1:],
+            parameter_names,
+        )
+
+    @staticmethod
+    def combine_contributions(
+            isoscalar_contribution: np.ndarray,
+            isovector_contribution: np.ndarray,
+            charged: Union[bool, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Combine the contributions of the channels into the form factor of the charged (isoscalar + isovector)
+        or of the neutral kaons (isoscalar - isovector).
+
+        Args:
+            isoscalar_contribution (np.ndarray): the isoscalar contribution (or its derivatives)
+            isovector_contribution (np.ndarray): the isovector contribution (or its derivatives) of the same shape
+            charged (bool or np.ndarray): the variant, or a boolean mask selecting the variant for each point
+                (along the first axis)
+
+        Returns:
+            np.ndarray
+
+        """
+        if isinstance(charged, np.ndarray):
+            signs = np.where(charged, 1.0, -1.0).reshape((-1,) + (1,) * (np.ndim(isovector_contribution) - 1))
+            return isoscalar_contribution + signs * isovector_contribution
+        elif charged:
+            return isoscalar_contribution + isovector_contribution
+        else:
+            return isoscalar_contribution - isovector_contribution
+
+    def evaluate_array_in_w(self, ws_isoscalar: np.ndarray, ws_isovector: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the form factor at points given by their images in the W-planes of both channels.
+
+        The images depend only on t and on the branch points t_0, t_in of the channels. Hence, they may
+        be computed once and reused while the branch points stay fixed.
+
+        Args:
+            ws_isoscalar (np.ndarray): the images of the values of t under the isoscalar map from t to W
+            ws_isovector (np.ndarray): the images of the same values of t under the isovector map
+
+        Returns:
+            np.ndarray: a complex array of the same shape as the inputs
+
+        """
+        return self.combine_contributions(
+            self.eval_channel_contribution('isoscalar', ws_isoscalar),
+            self.eval_channel_contribution('isovector', ws_isovector),
+            self.charged_variant,
+        )
+
+    def eval_channel_contribution(self, channel: str, ws: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the contribution of a channel ('isoscalar' or 'isovector') at the given images in its W-plane.
+
+        The contribution is the same for both the charged and the neutral kaons, only the sign of the isovector
+        contribution differs (see 'evaluate_array_in_w').
+
+        Args:
+            channel (str): 'isoscalar' or 'isovector'
+            ws (np.ndarray): the images of the values of t under the map from t to W of the channel
+
+        Returns:
+            np.ndarray: a complex array of the same shape as ws
+
+        """
+        weights, b_1, c_1, b_2, c_2 = self.__getattribute__('_compiled_' + channel)
+        if not isinstance(ws, np.ndarray):
+            # a single point, numpy would only add overhead here
+            w_squared = ws * ws
+            return asymptotic_factor(ws) * sum(
+                weight / ((w_squared + b_1 * ws + c_1) * (w_squared + b_2 * ws + c_2))
+                for weight, b_1, c_1, b_2, c_2 in self.__getattribute__('_compiled_terms_' + channel)
+            )
+
+        ws = np.asarray(ws, dtype=complex)
+        shape = (-1,) + (1,) * ws.ndim  # the resonances along the first axis
+        ws_squared = ws * ws
+        denominators = (
+            (ws_squared + b_1.reshape(shape) * ws + c_1.reshape(shape))
+            * (ws_squared + b_2.reshape(shape) * ws + c_2.reshape(shape))
+        )
+        return asymptotic_factor(ws) * np.tensordot(weights, 1 / denominators, axes=1)
+
+    def _get_channels(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        return [('isoscalar', self.ISOSCALAR_RESONANCES), ('isovector', self.ISOVECTOR_RESONANCES)]
+
+    def _set_last_coupling(self, resonances: Tuple[str, ...]) -> None:
+        last_coupling = self.NORMALIZATION
+        for name in resonances[:-1]:
+            last_coupling -= self.__getattribute__('a_' + name)
+        self.__setattr__('a_' + resonances[-1], last_coupling)
+
+    def _set_component(self, channel: str, resonance_name: str) -> None:
+        component = self._build_component(
+            self.__getattribute__('t_0_' + channel),
+            self.__getattribute__('t_in_' + channel),
+            self.__getattribute__('mass_' + resonance_name),
+            self.__getattribute__('decay_rate_' + resonance_name),
+        )
+        self.__setattr__('_component_' + resonance_name, component)
+
+    def _compile_channel(self, channel: str, resonances: Tuple[str, ...]) -> None:
+        """
+        Precompute the weights and the coefficients of the denominators of the resonant factors of the channel.
+
+        The contribution of the channel is the asymptotic factor times the sum over the components of
+        weight / ((W^2 + b_1 W + c_1) (W^2 + b_2 W + c_2)), where the weight is the coupling constant times
+        the numerator of the resonant factor divided by the normalization of the asymptotic factor
+        (see UAComponent.eval_resonant_factor). The arrays are replaced, never modified (see 'update_parameters').
+
+        """
+        components = [self.__getattribute__('_component_' + name) for name in resonances]
+        couplings = np.array([self.__getattribute__('a_' + name) for name in resonances])
+        numerators = np.array([component.get_resonant_factor_numerator() for component in components])
+        coefficients = np.array([component.get_resonant_factor_denominator_coefficients() for component in components])
+        weights = couplings * numerators / self.__getattribute__('_asymptotic_factor_denominator_' + channel)
+        compiled = (weights, coefficients[:, 0, 0], coefficients[:, 0, 1], coefficients[:, 1, 0], coefficients[:, 1, 1])
+        self.__setattr__('_compiled_' + channel, compiled)
+        self.__setattr__('_compiled_terms_' + channel, list(zip(*(array.tolist() for array in compiled))))
+
+    @staticmethod
+    def _build_component(t_0: float, t_in: float, mass: float, decay_rate: float) -> UAComponent:
+        map_from_t_to_w = MapFromTtoW(t_0, t_in)
+        w_n = map_from_t_to_w(0)
+        t_meson_pole = (mass - 1j * decay_rate / 2) ** 2
+        w_meson = map_from_t_to_w(t_meson_pole)
+
+        mass_squared = mass**2
+        if mass_squared < t_0:
+            raise ValueError('Mass squared of the resonance must be above the t_0 threshold!')
+        elif mass_squared < t_in:
+            return UAComponentVariantA(w_n, w_meson)
+        else:
+            return UAComponentVariantB(w_n, w_meson)
@@ -1,6 +1,9 @@
 import math
+from typing import Tuple
 
-from ua_model.functions import square_root
+import numpy as np
+
+from ua_model.functions import square_root, square_root_array
 from ua_model.utils import validate_branch_point_positions
 
 
@@ -53,6 +56,49 @@ class MapFromTtoW:
         v = square_root(transformed_z)
         return 1j * (v - 1) / (v + 1)  # the second Mobius transform
 
+    def evaluate_array(self, ts: np.ndarray) -> np.ndarray:
+        """
+        Return the values of W corresponding to an array of values of t.
+
+        This is the vectorized counterpart of '__call__' (the same branches of the square roots are used).
+        Note: Unlike '__call__', this method does not raise at t = t_in; the corresponding element is not finite.
+
+        Args:
+            ts (np.ndarray): an array of complex numbers
+
+        Returns:
+            np.ndarray: a complex array of the same shape as ts
+
+        """
+        z = square_root_array(np.asarray(ts, dtype=complex) - self.t_0)
+        transformed_z = (z + self._a) / (-z + self._a)  # the first Mobius transform
+        v = square_root_array(transformed_z)
+        return 1j * (v - 1) / (v + 1)  # the second Mobius transform
+
+    def evaluate_derivatives_array(self, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the derivatives of W with respect to t, t_0 and t_in at each element of an array of values of t.
+
+        The derivatives follow from the chain rule applied to the composition of the maps in '__call__'
+        (with the same branches of the square roots). Since W depends only on t - t_0 and t_in - t_0,
+        we have dW/dt_0 = - dW/dt - dW/dt_in.
+
+        Args:
+            ts (np.ndarray): an array of complex numbers (t = t_0 and t = t_in are singular points)
+
+        Returns:
+            tuple: the complex arrays dW/dt, dW/dt_0, dW/dt_in, each of the same shape as ts
+
+        """
+        z = square_root_array(np.asarray(ts, dtype=complex) - self.t_0)
+        transformed_z = (z + self._a) / (-z + self._a)
+        v = square_root_array(transformed_z)
+
+        dw_dtransformed_z = 1j / (v * (v + 1) ** 2)
+        dw_dt = dw_dtransformed_z * (2 * self._a / (self._a - z) ** 2) / (2 * z)
+        dw_dt_in = dw_dtransformed_z * (-2 * z / (self._a - z) ** 2) / (2 * self._a)
+        return dw_dt, -dw_dt - dw_dt_in, dw_dt_in
+
     @staticmethod
     def _validate_parameters(t_0, t_in):
         validate_branch_point_positions(t_0, t_in)
@@ -1,7 +1,12 @@
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
 from ua_model.ua_components.UAComponent import UAComponent
 from ua_model.ua_components.UAComponentVariantA import UAComponentVariantA
 from ua_model.ua_components.UAComponentVariantB import UAComponentVariantB
 from ua_model.MapFromTtoW import MapFromTtoW
+from ua_model.functions import asymptotic_factor
 
 
 class NucleonUAModel:
@@ -9,6 +14,9 @@ class NucleonUAModel:
     The U&A model for the proton and neutron form factors.
 
     """
+    ISOSCALAR_RESONANCES = ('omega', 'omega_prime', 'omega_double_prime', 'phi', 'phi_prime', 'phi_double_prime')
+    ISOVECTOR_RESONANCES = ('rho', 'rho_prime', 'rho_double_prime')
+
     def __init__(
             self,
             proton: bool,
@@ -116,6 +124,11 @@ class NucleonUAModel:
             t_0=self.t_0_pauli_isovector,
             t_in=self.t_in_pauli_isovector,
         )
+        # the asymptotic factor, including its normalization, is shared by all the components of a channel
+        self._asymptotic_factor_denominator_dirac_isoscalar = asymptotic_factor(self._t_to_W_dirac_isoscalar(0))
+        self._asymptotic_factor_denominator_dirac_isovector = asymptotic_factor(self._t_to_W_dirac_isovector(0))
+        self._asymptotic_factor_denominator_pauli_isoscalar = asymptotic_factor(self._t_to_W_pauli_isoscalar(0))
+        self._asymptotic_factor_denominator_pauli_isovector = asymptotic_factor(self._t_to_W_pauli_isovector(0))
 
         self._dirac_component_omega = None
         self._dirac_component_omega_prime = None
@@ -140,195 +153,201 @@ class NucleonUAModel:
         self._initialize_isoscalar_components(name='pauli')
         self._initialize_isovector_components(name='pauli')
 
-        self._mass_terms_cache = {}
+        self._channel_terms = None
+        self._initialize_channel_terms()
 
     def __call__(self, t: complex) -> complex:
-        if t.real < 0:
-            raise ValueError('t must have a positive real part!')
-
-        dirac_isoscalar_contribution = self._eval_dirac_isoscalar_contribution(t)
-        dirac_isovector_contribution = self._eval_dirac_isovector_contribution(t)
-        pauli_isoscalar_contribution = self._eval_pauli_isoscalar_contribution(t)
-        pauli_isovector_contribution = self._eval_pauli_isovector_contribution(t)
+        electric_form_factor, magnetic_form_factor = self.eval_electric_and_magnetic(t)
+        return electric_form_factor if self.electric else magnetic_form_factor
 
-        if self.proton:
-             dirac_form_factor = dirac_isoscalar_contribution + dirac_isovector_contribution
-             pauli_form_factor = pauli_isoscalar_contribution + pauli_isovector_contribution
-        else:
-            dirac_form_factor = dirac_isoscalar_contribution - dirac_isovector_contribution
-            pauli_form_factor = pauli_isoscalar_contribution - pauli_isovector_contribution
+    def eval_electric_and_magnetic(self, t: complex) -> Tuple[complex, complex]:
+        """
+        Evaluate both the electric and the magnetic form factor (of the proton or the neutron, see self.proton).
 
-        if self.electric:
-            return dirac_form_factor + (t / (4 * self.nucleon_mass ** 2)) * pauli_form_factor
-        else:
-            return dirac_form_factor + pauli_form_factor
+        """
+        return self.combine_contributions(t, self.eval_contributions(t), self.proton)
 
-    # TODO: refactor!
-    def _eval_dirac_isoscalar_contribution(self, t: complex) -> complex:
-        w = self._t_to_W_dirac_isoscalar(t)
+    def eval_all_form_factors(self, t: complex) -> Tuple[complex, complex, complex, complex]:
+        """
+        Evaluate the electric and magnetic form factors of both the proton and the neutron at once.
 
-        c_omega = self._get_mass_term(scalar=True, dirac=True, resonance='omega')
-        c_omega_prime = self._get_mass_term(scalar=True, dirac=True, resonance='omega_prime')
-        c_omega_double_prime = self._get_mass_term(scalar=True, dirac=True, resonance='omega_double_prime')
-        c_phi = self._get_mass_term(scalar=True, dirac=True, resonance='phi')
-        c_phi_prime = self._get_mass_term(scalar=True, dirac=True, resonance='phi_prime')
-        c_phi_double_prime = self._get_mass_term(scalar=True, dirac=True, resonance='phi_double_prime')
+        Returns:
+            tuple: G_E of the proton, G_M of the proton, G_E of the neutron, G_M of the neutron
 
+        """
+        contributions = self.eval_contributions(t)
         return (
-            0.5 * self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_double_prime(w) +
-            self.a_dirac_omega_prime * (
-                self._dirac_component_phi_double_prime(w) * self._dirac_component_omega_prime(w) *
-                (c_phi_double_prime - c_omega_prime) / (
-                        c_phi_double_prime - c_omega_double_prime) +
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_omega_prime(w) *
-                (c_omega_double_prime - c_omega_prime) / (
-                        c_omega_double_prime - c_phi_double_prime) -
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_double_prime(w)
-            ) +
-            self.a_dirac_phi_prime * (
-                self._dirac_component_phi_double_prime(w) * self._dirac_component_phi_prime(w) *
-                (c_phi_double_prime - c_phi_prime) / (
-                        c_phi_double_prime - c_omega_double_prime) +
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_prime(w) *
-                (c_omega_double_prime - c_phi_prime) / (
-                        c_omega_double_prime - c_phi_double_prime) -
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_double_prime(w)
-            ) +
-            self.a_dirac_omega * (
-                self._dirac_component_phi_double_prime(w) * self._dirac_component_omega(w) *
-                (c_phi_double_prime - c_omega) / (
-                        c_phi_double_prime - c_omega_double_prime) +
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_omega(w) *
-                (c_omega_double_prime - c_omega) / (
-                        c_omega_double_prime - c_phi_double_prime) -
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_double_prime(w)
-            ) +
-            self.a_dirac_phi * (
-                self._dirac_component_phi_double_prime(w) * self._dirac_component_phi(w) *
-                (c_phi_double_prime - c_phi) / (
-                        c_phi_double_prime - c_omega_double_prime) +
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi(w) *
-                (c_omega_double_prime - c_phi) / (
-                        c_omega_double_prime - c_phi_double_prime) -
-                self._dirac_component_omega_double_prime(w) * self._dirac_component_phi_double_prime(w)
-            )
+            *self.combine_contributions(t, contributions, proton=True),
+            *self.combine_contributions(t, contributions, proton=False),
         )
 
-    def _eval_dirac_isovector_contribution(self, t: complex) -> complex:
-        w = self._t_to_W_dirac_isovector(t)
+    def eval_contributions(self, t: complex) -> Tuple[complex, complex, complex, complex]:
+        """
+        Evaluate the contributions of the four channels, all the form factors are their linear combinations
+        (see combine_contributions). Works for numpy arrays of t as well.
 
-        c_rho = self._get_mass_term(scalar=False, dirac=True, resonance='rho')
-        c_rho_prime = self._get_mass_term(scalar=False, dirac=True, resonance='rho_prime')
-        c_rho_double_prime = self._get_mass_term(scalar=False, dirac=True, resonance='rho_double_prime')
+        Returns:
+            tuple: the Dirac isoscalar, Dirac isovector, Pauli isoscalar and Pauli isovector contributions
+
+        """
+        if np.any(np.real(t) < 0):
+            raise ValueError('t must have a positive real part!')
 
         return (
-            0.5 * self._dirac_component_rho_prime(w) * self._dirac_component_rho_double_prime(w) +
-            self.a_dirac_rho * (
-                self._dirac_component_rho(w) * self._dirac_component_rho_prime(w) *
-                (c_rho_prime - c_rho) / (
-                    c_rho_prime - c_rho_double_prime) +
-                self._dirac_component_rho(w) * self._dirac_component_rho_double_prime(w) *
-                (c_rho_double_prime - c_rho) / (
-                    c_rho_double_prime - c_rho_prime) -
-                self._dirac_component_rho_prime(w) * self._dirac_component_rho_double_prime(w)
-            )
+            self._eval_channel_contribution('dirac_isoscalar', t),
+            self._eval_channel_contribution('dirac_isovector', t),
+            self._eval_channel_contribution('pauli_isoscalar', t),
+            self._eval_channel_contribution('pauli_isovector', t),
         )
 
-    def _eval_pauli_isoscalar_contribution(self, t: complex) -> complex:
-        w = self._t_to_W_pauli_isoscalar(t)
+    def combine_contributions(
+            self,
+            t: complex,
+            contributions: Tuple[complex, complex, complex, complex],
+            proton: bool,
+    ) -> Tuple[complex, complex]:
+        """
+        Combine the contributions of the channels (see eval_contributions) into the electric and
+        the magnetic form factor of the proton or the neutron.
+
+        """
+        dirac_isoscalar_contribution, dirac_isovector_contribution, \
+            pauli_isoscalar_contribution, pauli_isovector_contribution = contributions
+
+        if proton:
+            dirac_form_factor = dirac_isoscalar_contribution + dirac_isovector_contribution
+            pauli_form_factor = pauli_isoscalar_contribution + pauli_isovector_contribution
+        else:
+            dirac_form_factor = dirac_isoscalar_contribution - dirac_isovector_contribution
+            pauli_form_factor = pauli_isoscalar_contribution - pauli_isovector_contribution
 
-        c_omega = self._get_mass_term(scalar=True, dirac=False, resonance='omega')
-        c_omega_prime = self._get_mass_term(scalar=True, dirac=False, resonance='omega_prime')
-        c_omega_double_prime = self._get_mass_term(scalar=True, dirac=False, resonance='omega_double_prime')
-        c_phi = self._get_mass_term(scalar=True, dirac=False, resonance='phi')
-        c_phi_prime = self._get_mass_term(scalar=True, dirac=False, resonance='phi_prime')
-        c_phi_double_prime = self._get_mass_term(scalar=True, dirac=False, resonance='phi_double_prime')
+        electric_form_factor = dirac_form_factor + (t / (4 * self.nucleon_mass ** 2)) * pauli_form_factor
+        magnetic_form_factor = dirac_form_factor + pauli_form_factor
+        return electric_form_factor, magnetic_form_factor
+
+    def eval_channel_terms(self, channel: str, w: Union[complex, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the terms of the contribution of a channel (e.g. 'dirac_isoscalar') at the images w of the values
+        of t in the W-plane of the channel, without their weights (see get_channel_weights).
+
+        Each term is a product of the same number of components, the asymptotic factor shared by all the components
+        of the channel is therefore factored out (squared for the Dirac, cubed for the Pauli contributions).
+        The terms depend only on the branch points of the channel and on the masses and the decay rates
+        of its resonances, not on the coupling constants.
+
+        Returns:
+            np.ndarray: the terms along the first axis (followed by the shape of w)
+
+        """
+        asymptotic = asymptotic_factor(w) / self.__getattribute__(f'_asymptotic_factor_denominator_{channel}')
+        components, indices, _ = self._channel_terms[channel]
+        resonant_factors = np.array([component.eval_resonant_factor(w) for component in components])
+        return asymptotic ** indices.shape[1] * np.prod(resonant_factors[indices], axis=1)
+
+    def get_channel_weights(self, channel: str) -> np.ndarray:
+        """
+        Return the weights of the terms of the contribution of a channel (see eval_channel_terms).
+
+        """
+        return self._channel_terms[channel][2]
+
+    def _eval_channel_contribution(self, channel: str, t: Union[complex, np.ndarray]) -> Union[complex, np.ndarray]:
+        """
+        Evaluate the contribution of a channel (e.g. 'dirac_isoscalar') as the sum of the products
+        of the resonant factors of its components with the weights precomputed by _compile_terms.
+        Works for numpy arrays of t as well.
+
+        """
+        t_to_w = self.__getattribute__(f'_t_to_W_{channel}')
+        w = t_to_w.evaluate_array(t) if isinstance(t, np.ndarray) else t_to_w(t)
+        return self.get_channel_weights(channel) @ self.eval_channel_terms(channel, w)
+
+    def _initialize_channel_terms(self) -> None:
+        """
+        Precompute the weights of the products of the resonant factors in the contributions of the channels.
+
+        The weights depend on the couplings and on the mass terms of the resonances (see _calculate_mass_term),
+        but not on t.
+
+        """
+        self._channel_terms = {}
+        for name in ['dirac', 'pauli']:
+            for channel_type, resonances in [('isoscalar', self.ISOSCALAR_RESONANCES),
+                                             ('isovector', self.ISOVECTOR_RESONANCES)]:
+                channel = f'{name}_{channel_type}'
+                mass_terms = {
+                    resonance: self._calculate_mass_term(channel_type == 'isoscalar', name == 'dirac', resonance)
+                    for resonance in resonances
+                }
+                terms = self.__getattribute__(f'_get_{channel}_terms')(mass_terms)
+                components = [self.__getattribute__(f'_{name}_component_{resonance}') for resonance in resonances]
+                self._channel_terms[channel] = (components, *self._compile_terms(terms, resonances))
 
+    @staticmethod
+    def _compile_terms(
+            terms: List[Tuple[complex, Tuple[str, ...]]],
+            resonances: Tuple[str, ...],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # the weights of the terms with the same product of the components are summed up
+        merged_terms = {}
+        for weight, product in terms:
+            key = tuple(sorted(resonances.index(resonance) for resonance in product))
+            merged_terms[key] = merged_terms.get(key, 0.0) + weight
+        indices = np.array(list(merged_terms.keys()), dtype=int)
+        weights = np.array(list(merged_terms.values()), dtype=complex)
+        return indices, weights
+
+    def _get_dirac_isoscalar_terms(self, c: Dict[str, complex]) -> List[Tuple[complex, Tuple[str, ...]]]:
+        terms = [(0.5, ('omega_double_prime', 'phi_double_prime'))]
+        for resonance, coupling in [('omega_prime', self.a_dirac_omega_prime), ('phi_prime', self.a_dirac_phi_prime),
+                                    ('omega', self.a_dirac_omega), ('phi', self.a_dirac_phi)]:
+            c_r = c[resonance]
+            terms.extend([
+                (coupling * (c['phi_double_prime'] - c_r) / (c['phi_double_prime'] - c['omega_double_prime']),
+                 ('phi_double_prime', resonance)),
+                (coupling * (c['omega_double_prime'] - c_r) / (c['omega_double_prime'] - c['phi_double_prime']),
+                 ('omega_double_prime', resonance)),
+                (-coupling, ('omega_double_prime', 'phi_double_prime')),
+            ])
+        return terms
+
+    def _get_dirac_isovector_terms(self, c: Dict[str, complex]) -> List[Tuple[complex, Tuple[str, ...]]]:
+        coupling = self.a_dirac_rho
+        return [
+            (0.5, ('rho_prime', 'rho_double_prime')),
+            (coupling * (c['rho_prime'] - c['rho']) / (c['rho_prime'] - c['rho_double_prime']),
+             ('rho', 'rho_prime')),
+            (coupling * (c['rho_double_prime'] - c['rho']) / (c['rho_double_prime'] - c['rho_prime']),
+             ('rho', 'rho_double_prime')),
+            (-coupling, ('rho_prime', 'rho_double_prime')),
+        ]
+
+    def _get_pauli_isoscalar_terms(self, c: Dict[str, complex]) -> List[Tuple[complex, Tuple[str, ...]]]:
         norm = 0.5 * (self.magnetic_moment_proton + self.magnetic_moment_neutron - 1.0)
-        return (
-            norm * self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-            self._pauli_component_omega_prime(w) +
-            self.a_pauli_phi_prime * (
-                self._pauli_component_phi_double_prime(w) * self._pauli_component_phi_prime(w) *
-                self._pauli_component_omega_prime(w) *
-                ((c_phi_double_prime - c_phi_prime) /
-                 (c_phi_double_prime - c_omega_double_prime)) *
-                ((c_omega_prime - c_phi_prime) /
-                 (c_omega_prime - c_omega_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_omega_prime(w) *
-                self._pauli_component_phi_prime(w) *
-                ((c_omega_double_prime - c_phi_prime) /
-                 (c_omega_double_prime - c_phi_double_prime)) *
-                ((c_omega_prime - c_phi_prime) /
-                 (c_omega_prime - c_phi_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_phi_prime(w) *
-                ((c_omega_double_prime - c_phi_prime) /
-                 (c_omega_double_prime - c_omega_prime)) *
-                ((c_phi_double_prime - c_phi_prime) /
-                 (c_phi_double_prime - c_omega_prime)) -
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_omega_prime(w)
-            ) +
-            self.a_pauli_omega * (
-                self._pauli_component_phi_double_prime(w) * self._pauli_component_omega_prime(w) *
-                self._pauli_component_omega(w) *
-                ((c_phi_double_prime - c_omega) /
-                 (c_phi_double_prime - c_omega_double_prime)) *
-                ((c_omega_prime - c_omega) /
-                 (c_omega_prime - c_omega_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_omega_prime(w) *
-                self._pauli_component_omega(w) *
-                ((c_omega_double_prime - c_omega) /
-                 (c_omega_double_prime - c_phi_double_prime)) *
-                ((c_omega_prime - c_omega) /
-                 (c_omega_prime - c_phi_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_omega(w) *
-                ((c_omega_double_prime - c_omega) /
-                 (c_omega_double_prime - c_omega_prime)) *
-                ((c_phi_double_prime - c_omega) /
-                 (c_phi_double_prime - c_omega_prime)) -
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_omega_prime(w)
-            ) +
-            self.a_pauli_phi * (
-                self._pauli_component_phi_double_prime(w) * self._pauli_component_omega_prime(w) *
-                self._pauli_component_phi(w) *
-                ((c_phi_double_prime - c_phi) /
-                 (c_phi_double_prime - c_omega_double_prime)) *
-                ((c_omega_prime - c_phi) /
-                 (c_omega_prime - c_omega_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_omega_prime(w) *
-                self._pauli_component_phi(w) *
-                ((c_omega_double_prime - c_phi) /
-                 (c_omega_double_prime - c_phi_double_prime)) *
-                ((c_omega_prime - c_phi) /
-                 (c_omega_prime - c_phi_double_prime)) +
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_phi(w) *
-                ((c_omega_double_prime - c_phi) /
-                 (c_omega_double_prime - c_omega_prime)) *
-                ((c_phi_double_prime - c_phi) /
-                 (c_phi_double_prime - c_omega_prime)) -
-                self._pauli_component_omega_double_prime(w) * self._pauli_component_phi_double_prime(w) *
-                self._pauli_component_omega_prime(w)
-            )
-        )
-
-    def _eval_pauli_isovector_contribution(self, t: complex) -> complex:
-        w = self._t_to_W_pauli_isovector(t)
+        c_o1, c_o2, c_p2 = c['omega_prime'], c['omega_double_prime'], c['phi_double_prime']
+        terms = [(norm, ('omega_double_prime', 'phi_double_prime', 'omega_prime'))]
+        for resonance, coupling in [('phi_prime', self.a_pauli_phi_prime), ('omega', self.a_pauli_omega),
+                                    ('phi', self.a_pauli_phi)]:
+            c_r = c[resonance]
+            terms.extend([
+                (coupling * ((c_p2 - c_r) / (c_p2 - c_o2)) * ((c_o1 - c_r) / (c_o1 - c_o2)),
+                 ('phi_double_prime', 'omega_prime', resonance)),
+                (coupling * ((c_o2 - c_r) / (c_o2 - c_p2)) * ((c_o1 - c_r) / (c_o1 - c_p2)),
+                 ('omega_double_prime', 'omega_prime', resonance)),
+                (coupling * ((c_o2 - c_r) / (c_o2 - c_o1)) * ((c_p2 - c_r) / (c_p2 - c_o1)),
+                 ('omega_double_prime', 'phi_double_prime', resonance)),
+                (-coupling, ('omega_double_prime', 'phi_double_prime', 'omega_prime')),
+            ])
+        return terms
+
+    def _get_pauli_isovector_terms(self, c: Dict[str, complex]) -> List[Tuple[complex, Tuple[str, ...]]]:
         norm = 0.5 * (self.magnetic_moment_proton - self.magnetic_moment_neutron - 1.0)
-        return (norm * self._pauli_component_rho(w) * self._pauli_component_rho_prime(w) *
-                self._pauli_component_rho_double_prime(w))
+        return [(norm, ('rho', 'rho_prime', 'rho_double_prime'))]
 
     def _initialize_isoscalar_components(self, name) -> None:
         # The construction below is perhaps a bit unfortunate, but it seems to me
         # less error-prone than explicitly repeating the same code section for each resonance.
-        for resonance_name in [
-            'omega', 'omega_prime', 'omega_double_prime',
-            'phi', 'phi_prime', 'phi_double_prime',
-        ]:
+        for resonance_name in self.ISOSCALAR_RESONANCES:
             mass = self.__getattribute__('mass_' + resonance_name)
             decay_rate = self.__getattribute__('decay_rate_' + resonance_name)
             t_0 = self.__getattribute__(f't_0_{name}_isoscalar')
@@ -337,7 +356,7 @@ class NucleonUAModel:
             self.__setattr__(f'_{name}_component_' + resonance_name, component)
 
     def _initialize_isovector_components(self, name) -> None:
-        for resonance_name in ['rho', 'rho_prime', 'rho_double_prime']:
+        for resonance_name in self.ISOVECTOR_RESONANCES:
             mass = self.__getattribute__('mass_' + resonance_name)
             decay_rate = self.__getattribute__('decay_rate_' + resonance_name)
             t_0 = self.__getattribute__(f't_0_{name}_isovector')
@@ -359,21 +378,6 @@ class NucleonUAModel:
         else:
             return UAComponentVariantB(w_n, w_meson)
 
-    def _get_mass_term(self, scalar: bool, dirac: bool, resonance: str) -> complex:
-        key = self._build_cache_key(scalar, dirac, resonance)
-        cached_val = self._mass_terms_cache.get(key, None)
-        if cached_val:
-            return cached_val
-        val = self._calculate_mass_term(scalar, dirac, resonance)
-        self._mass_terms_cache[key] = val
-        return val
-
-    @staticmethod
-    def _build_cache_key(scalar: bool, dirac: bool, resonance: str) -> str:
-        key = 'isoscalar_' if scalar else 'isovector_'
-        key += 'dirac_' if dirac else 'pauli_'
-        return key + resonance
-
     def _calculate_mass_term(self, scalar: bool, dirac: bool, resonance: str) -> complex:
         if scalar and dirac:
             t_to_w = self._t_to_W_dirac_isoscalar
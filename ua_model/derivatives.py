@@ -0,0 +1,176 @@
+"""
+This module contains the analytic derivatives of the kaon U&A models with respect to their parameters.
+
+The kaon models (the subclasses of KaonUAModelBase) share the same structure: in each channel
+(isoscalar, isovector) the contribution is the asymptotic factor times a linear combination of the resonant factors
+of the components. The coupling constant of the last resonance of a channel is fixed by the normalization
+(the couplings sum to a constant). The models differ only by the lists of resonances (the class attributes
+ISOSCALAR_RESONANCES and ISOVECTOR_RESONANCES), so the derivatives can be evaluated by a single function.
+
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from ua_model.functions import asymptotic_factor
+
+
+class _ChannelDerivatives:
+    """
+    The contribution of a single channel of a kaon model together with its derivatives.
+
+    """
+    def __init__(
+            self,
+            model,
+            channel: str,
+            resonances: Tuple[str, ...],
+            ws: np.ndarray,
+            dws: Tuple[np.ndarray, np.ndarray],
+    ) -> None:
+        self.model = model
+        self.channel = channel
+        self.resonances = resonances
+        self.ws = ws
+        self.dws_dt_0, self.dws_dt_in = dws
+
+        self._t_to_w = getattr(model, '_t_to_W_' + channel)
+        self.w_n = self._t_to_w(0)
+        _, dw_n_dt_0, dw_n_dt_in = self._t_to_w.evaluate_derivatives_array(np.array([0.0]))
+        self.dw_n_dt_0 = dw_n_dt_0[0]
+        self.dw_n_dt_in = dw_n_dt_in[0]
+
+        self.asymptotic = asymptotic_factor(ws) / asymptotic_factor(self.w_n)
+        self.couplings = {name: getattr(model, 'a_' + name) for name in resonances}
+        self.components = {name: getattr(model, '_component_' + name) for name in resonances}
+        self.resonant_factors = {name: self.components[name].eval_resonant_factor(ws) for name in resonances}
+
+    def value(self) -> np.ndarray:
+        return self.asymptotic * sum(
+            self.couplings[name] * self.resonant_factors[name] for name in self.resonances
+        )
+
+    def derivative(self, parameter_name: str) -> np.ndarray:
+        if parameter_name == 't_0_' + self.channel:
+            return self._derivative_branch_point(self.dws_dt_0, self.dw_n_dt_0, index=1)
+        if parameter_name == 't_in_' + self.channel:
+            return self._derivative_branch_point(self.dws_dt_in, self.dw_n_dt_in, index=2)
+        for name in self.resonances:
+            if parameter_name == 'a_' + name and name != self.resonances[-1]:
+                last_resonant_factor = self.resonant_factors[self.resonances[-1]]
+                return self.asymptotic * (self.resonant_factors[name] - last_resonant_factor)
+            if parameter_name == 'mass_' + name:
+                return self._derivative_pole_position(name, 2 * self._get_pole(name))
+            if parameter_name == 'decay_rate_' + name:
+                return self._derivative_pole_position(name, -1j * self._get_pole(name))
+        # a parameter of the other channel (the names are validated by eval_kaon_channels_with_jacobian)
+        return np.zeros_like(self.ws)
+
+    def _get_pole(self, name: str) -> complex:
+        # the pole is at t = (mass - i * decay_rate / 2)^2
+        return getattr(self.model, 'mass_' + name) - 0.5j * getattr(self.model, 'decay_rate_' + name)
+
+    def _eval_map_derivatives_at_pole(self, name: str) -> Tuple[complex, complex, complex]:
+        derivatives = self._t_to_w.evaluate_derivatives_array(np.array([self._get_pole(name) ** 2]))
+        return derivatives[0][0], derivatives[1][0], derivatives[2][0]
+
+    def _derivative_pole_position(self, name: str, d_pole_squared: complex) -> np.ndarray:
+        dw_meson = self._eval_map_derivatives_at_pole(name)[0] * d_pole_squared
+        log_derivative = self.components[name].eval_log_derivative_of_resonant_factor(self.ws, 0, 0, dw_meson)
+        return self.asymptotic * self.couplings[name] * self.resonant_factors[name] * log_derivative
+
+    def _derivative_branch_point(self, dws: np.ndarray, dw_n: complex, index: int) -> np.ndarray:
+        # The branch point moves the images of all the points: the datapoints, w_n and all the poles.
+        asymptotic_log_derivative = (
+            -4 * self.ws * dws / (1 - self.ws ** 2) + 4 * self.w_n * dw_n / (1 - self.w_n ** 2)
+        )
+        result = 0
+        for name in self.resonances:
+            dw_meson = self._eval_map_derivatives_at_pole(name)[index]
+            log_derivative = self.components[name].eval_log_derivative_of_resonant_factor(
+                self.ws, dws, dw_n, dw_meson,
+            )
+            result = result + self.couplings[name] * self.resonant_factors[name] * (
+                asymptotic_log_derivative + log_derivative
+            )
+        return self.asymptotic * result
+
+
+def eval_kaon_channels_with_jacobian(
+        model,
+        ws_isoscalar: np.ndarray,
+        ws_isovector: np.ndarray,
+        dws_isoscalar: Tuple[np.ndarray, np.ndarray],
+        dws_isovector: Tuple[np.ndarray, np.ndarray],
+        parameter_names: List[str],
+) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    """
+    Evaluate the contributions of the isoscalar and the isovector channel of a kaon model and their derivatives
+    with respect to the given parameters.
+
+    The contributions do not depend on the variant (charged or neutral) of the model, the form factor is their
+    sum for the charged and their difference for the neutral kaons. The arguments are the same as
+    for eval_kaon_model_with_jacobian.
+
+    Returns:
+        tuple: the pairs (values, Jacobian) of the isoscalar and of the isovector channel
+
+    Raises:
+        ValueError: if a name is not a (free) parameter of the model, e.g. the dependent coupling constant
+            of the last resonance of a channel
+
+    """
+    known_names = set(model.get_parameter_names())
+    unknown_names = [name for name in parameter_names if name not in known_names]
+    if unknown_names:
+        raise ValueError(f'Unknown parameters: {", ".join(unknown_names)}')
+
+    channels = [
+        _ChannelDerivatives(model, 'isoscalar', model.ISOSCALAR_RESONANCES, ws_isoscalar, dws_isoscalar),
+        _ChannelDerivatives(model, 'isovector', model.ISOVECTOR_RESONANCES, ws_isovector, dws_isovector),
+    ]
+    results = []
+    for channel in channels:
+        values = channel.value()
+        jacobian = np.empty((len(values), len(parameter_names)), dtype=complex)
+        for column, parameter_name in enumerate(parameter_names):
+            jacobian[:, column] = channel.derivative(parameter_name)
+        results.append((values, jacobian))
+    return results[0], results[1]
+
+
+def eval_kaon_model_with_jacobian(
+        model,
+        ws_isoscalar: np.ndarray,
+        ws_isovector: np.ndarray,
+        dws_isoscalar: Tuple[np.ndarray, np.ndarray],
+        dws_isovector: Tuple[np.ndarray, np.ndarray],
+        parameter_names: List[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate a kaon model and its derivatives with respect to the given parameters.
+
+    The points of the evaluation are given by their images in the W-planes of both channels, together
+    with the derivatives of the images with respect to t_0 and t_in of the channel
+    (see MapFromTtoW.evaluate_derivatives_array).
+
+    Args:
+        model: a kaon model (a subclass of KaonUAModelBase)
+        ws_isoscalar (np.ndarray): the images of the points under the isoscalar map from t to W
+        ws_isovector (np.ndarray): the images of the points under the isovector map from t to W
+        dws_isoscalar (tuple): the arrays dW/dt_0, dW/dt_in for the isoscalar map
+        dws_isovector (tuple): the arrays dW/dt_0, dW/dt_in for the isovector map
+        parameter_names (list): the names of the parameters, it determines the ordering of the columns
+
+    Returns:
+        tuple: the complex array of the values of the form factor (shape (N,))
+            and the complex Jacobian (shape (N, len(parameter_names)))
+
+    """
+    (isoscalar_values, isoscalar_jacobian), (isovector_values, isovector_jacobian) = eval_kaon_channels_with_jacobian(
+        model, ws_isoscalar, ws_isovector, dws_isoscalar, dws_isovector, parameter_names,
+    )
+    if model.charged_variant:
+        return isoscalar_values + isovector_values, isoscalar_jacobian + isovector_jacobian
+    else:
+        return isoscalar_values - isovector_values, isoscalar_jacobian - isovector_jacobian
@@ -5,6 +5,8 @@ This module contains some functions that will be useful in the construction of t
 import cmath
 import math
 
+import numpy as np
+
 
 def z_minus_its_reciprocal(z: complex) -> complex:
     """
@@ -25,6 +27,24 @@ def z_minus_its_reciprocal(z: complex) -> complex:
     return z - (1 / z)
 
 
+def asymptotic_factor(w: complex) -> complex:
+    """
+    The function (1 - W^2)^2.
+
+    Up to a normalization constant (its value at W = w_n, the image of t = 0), this is the asymptotic factor
+    of every U&A component. Both depend only on t_0 and t_in, so the factor is common to all the components
+    of a single channel (e.g. all the isoscalar components of a model). Works for numpy arrays as well.
+
+    Args:
+        w (complex):
+
+    Returns:
+        complex: The value of (1 - W^2)^2.
+
+    """
+    return (1 - w ** 2) ** 2
+
+
 def square_root(z: complex) -> complex:
     """
     A branch of the square root. The cut is on the positive real axis; continuous from above.
@@ -45,3 +65,23 @@ def square_root(z: complex) -> complex:
     if phi < 0:
         phi = 2 * cmath.pi + phi
     return math.sqrt(r) * cmath.exp(1j * phi / 2.0)
+
+
+def square_root_array(z: np.ndarray) -> np.ndarray:
+    """
+    The same branch of the square root as in 'square_root', evaluated elementwise on an array.
+
+    The principal square root (the one implemented by numpy) coincides with our branch on the closed upper half-plane.
+    For the arguments with 0 > arg z > -pi (i.e. pi < phi < 2pi in the notation of 'square_root') the two branches
+    differ only by sign.
+
+    Args:
+        z (np.ndarray): an array of complex numbers
+
+    Returns:
+        np.ndarray: An array of the square roots of the elements of z.
+
+    """
+    z = np.asarray(z, dtype=complex)
+    principal_root = np.sqrt(z)
+    return np.where(np.angle(z) < 0, -principal_root, principal_root)
@@ -11,6 +11,11 @@ at the time of the initialization of the model.
 
 """
 from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+import numpy as np
+
+from ua_model.functions import asymptotic_factor
 
 
 class UAComponent(ABC):
@@ -20,8 +25,12 @@ class UAComponent(ABC):
         self.w_meson = w_meson
 
         # evaluate some constants
-        self._asymptotic_factor_denominator = (1 - (self.w_n ** 2)) ** 2
+        self._asymptotic_factor_denominator = asymptotic_factor(self.w_n)
         self._resonant_factor_numerator = self._eval_resonant_factor_numerator()
+        self._resonant_factor_denominator_coefficients = self._eval_resonant_factor_denominator_coefficients()
+        # The same numerator, but evaluated in the factorized form of the denominator (see the method
+        # 'eval_resonant_factor'). This way the resonant factor equals exactly one at W = w_n.
+        self._factorized_resonant_factor_numerator = self._eval_factorized_resonant_factor_denominator(self.w_n)
 
     def __call__(self, w: complex) -> complex:
         """
@@ -36,9 +45,94 @@ class UAComponent(ABC):
         """
         return self._eval_asymptotic_factor(w) * self._eval_resonant_factor(w)
 
+    def evaluate_array(self, ws: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the component at each element of an array of values of W.
+
+        Args:
+            ws (np.ndarray): an array of complex numbers
+
+        Returns:
+            np.ndarray: a complex array of the same shape as ws
+
+        """
+        ws = np.asarray(ws, dtype=complex)
+        return (asymptotic_factor(ws) / self._asymptotic_factor_denominator) * self.eval_resonant_factor(ws)
+
+    def eval_resonant_factor(self, w: complex) -> complex:
+        """
+        Evaluate the resonant factor of the component, i.e. the component without the asymptotic factor.
+
+        The asymptotic factor (1 - W^2)^2 / (1 - w_n^2)^2 is the same for all the components of a channel
+        (they share the values of t_0 and t_in, hence also w_n). The models evaluate it only once per channel
+        (see 'ua_model.functions.asymptotic_factor') and multiply the combination of the resonant factors by it.
+
+        The denominator of the resonant factor is evaluated as a product of two quadratic polynomials
+        with real coefficients, that have been precomputed during the initialization.
+        Works for numpy arrays as well.
+
+        Args:
+            w (complex):
+
+        Returns:
+            complex
+
+        """
+        return self._factorized_resonant_factor_numerator / self._eval_factorized_resonant_factor_denominator(w)
+
+    def get_resonant_factor_numerator(self) -> complex:
+        """
+        Return the (constant) numerator of the resonant factor in the factorized form used by 'eval_resonant_factor'.
+
+        """
+        return self._factorized_resonant_factor_numerator
+
+    def get_resonant_factor_denominator_coefficients(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """
+        Return the coefficients ((b_1, c_1), (b_2, c_2)) of the denominator of the resonant factor,
+        which equals (W**2 + b_1 * W + c_1) * (W**2 + b_2 * W + c_2).
+
+        """
+        return self._resonant_factor_denominator_coefficients
+
+    def eval_log_derivative_of_resonant_factor(
+            self,
+            w: complex,
+            dw: complex,
+            dw_n: complex,
+            dw_meson: complex,
+    ) -> complex:
+        """
+        Evaluate the derivative of the logarithm of the resonant factor with respect to a real parameter.
+
+        The resonant factor equals D(w_n) / D(W), where D is the product of (W - root) over the four roots
+        of its denominator. The derivative of its logarithm is then the sum over the roots of
+        (dw_n - d_root) / (w_n - root) - (dW - d_root) / (W - root).
+        Works for numpy arrays (w, dw) as well.
+
+        Args:
+            w (complex): the point of the evaluation
+            dw (complex): the derivative of w with respect to the parameter
+            dw_n (complex): the derivative of w_n with respect to the parameter
+            dw_meson (complex): the derivative of w_meson with respect to the parameter
+
+        Returns:
+            complex
+
+        """
+        result = 0
+        for root, d_root in self._eval_resonant_factor_denominator_roots(dw_meson):
+            result = result + (dw_n - d_root) / (self.w_n - root) - (dw - d_root) / (w - root)
+        return result
+
+    def _eval_factorized_resonant_factor_denominator(self, w: complex) -> complex:
+        w_squared = w * w
+        (b_1, c_1), (b_2, c_2) = self._resonant_factor_denominator_coefficients
+        return (w_squared + b_1 * w + c_1) * (w_squared + b_2 * w + c_2)
+
     def _eval_asymptotic_factor(self, w: complex) -> complex:
-        # Note: This is shared by several components. Hence, it is not optimal to evaluate it here.
-        # If needed, we may consider making a change here.
+        # Note: The models do not call this; they evaluate the shared factor once per channel
+        # and use the method 'eval_resonant_factor'.
         return ((1 - w**2) ** 2) / self._asymptotic_factor_denominator
 
     @abstractmethod
@@ -71,3 +165,36 @@ class UAComponent(ABC):
 
         """
         pass
+
+    @abstractmethod
+    def _eval_resonant_factor_denominator_coefficients(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """
+        This method should return the coefficients ((b_1, c_1), (b_2, c_2)) such that the denominator
+        of the resonant factor equals (W**2 + b_1 * W + c_1) * (W**2 + b_2 * W + c_2).
+        It is called only during the initialization of the component.
+
+        The four roots of the denominator come in complex conjugate pairs, hence the coefficients are real.
+
+        Returns:
+            tuple
+
+        """
+        pass
+
+    @abstractmethod
+    def _eval_resonant_factor_denominator_roots(self, dw_meson: complex) -> List[Tuple[complex, complex]]:
+        """
+        This method should return the four roots of the denominator of the resonant factor, each paired
+        with its derivative with respect to a real parameter, given the derivative dw_meson of w_meson.
+
+        Note: The roots depend also on the complex conjugate of w_meson, whose derivative
+        with respect to a real parameter is the complex conjugate of dw_meson.
+
+        Args:
+            dw_meson (complex):
+
+        Returns:
+            list: the pairs (root, derivative of the root)
+
+        """
+        pass
@@ -1,3 +1,5 @@
+from typing import List, Tuple
+
 from ua_model.ua_components.UAComponent import UAComponent
 
 
@@ -30,3 +32,20 @@ class UAComponentVariantA(UAComponent):
             (self.w_n - 1 / self.w_meson) *
             (self.w_n - 1 / self.w_meson.conjugate())
         )
+
+    def _eval_resonant_factor_denominator_coefficients(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        inverse_w_meson = 1 / self.w_meson
+        return (
+            (-2 * self.w_meson.real, abs(self.w_meson) ** 2),
+            (-2 * inverse_w_meson.real, abs(inverse_w_meson) ** 2),
+        )
+
+    def _eval_resonant_factor_denominator_roots(self, dw_meson: complex) -> List[Tuple[complex, complex]]:
+        inverse_w_meson = 1 / self.w_meson
+        d_inverse_w_meson = -dw_meson * inverse_w_meson ** 2
+        return [
+            (self.w_meson, dw_meson),
+            (self.w_meson.conjugate(), dw_meson.conjugate()),
+            (inverse_w_meson, d_inverse_w_meson),
+            (inverse_w_meson.conjugate(), d_inverse_w_meson.conjugate()),
+        ]
@@ -1,3 +1,5 @@
+from typing import List, Tuple
+
 from ua_model.ua_components.UAComponent import UAComponent
 
 
@@ -29,3 +31,17 @@ class UAComponentVariantB(UAComponent):
             (self.w_n + self.w_meson) *
             (self.w_n + self.w_meson.conjugate())
         )
+
+    def _eval_resonant_factor_denominator_coefficients(self) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        return (
+            (-2 * self.w_meson.real, abs(self.w_meson) ** 2),
+            (2 * self.w_meson.real, abs(self.w_meson) ** 2),
+        )
+
+    def _eval_resonant_factor_denominator_roots(self, dw_meson: complex) -> List[Tuple[complex, complex]]:
+        return [
+            (self.w_meson, dw_meson),
+            (self.w_meson.conjugate(), dw_meson.conjugate()),
+            (-self.w_meson, -dw_meson),
+            (-self.w_meson.conjugate(), -dw_meson.conjugate()),
+        ]